@@ -0,0 +1,117 @@
+# benchmarks/auth_event_loop.py - 인증 의존성 sync vs async event loop 지연 비교
+"""
+동시에 N개의 인증 요청을 보내면서 event loop 지연(lag)과 요청 지연을 측정한다.
+
+- sync  : get_current_user        (pymysql Session, IO thread pool 에서 조회)
+- async : get_current_user_async  (aiomysql AsyncSession, event loop 에서 조회)
+
+identity 캐시를 끄고(USER_CACHE_TTL=0) 매 요청마다 실제 DB 조회가 일어나게 한다.
+JWT 캐시는 켜 둔다 (두 경로 모두 동일하게 적용됨).
+
+실행 (저장소 루트에서, .env 의 DB 설정 사용):
+    python -m benchmarks.auth_event_loop --login-id test01 --requests 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("USER_CACHE_TTL", "0")
+
+import httpx
+from fastapi import Depends, FastAPI
+from jose import jwt
+
+from server.auth_manager import (
+    CurrentUser, auth_manager, get_current_user, get_current_user_async,
+)
+
+app = FastAPI()
+
+
+@app.get("/sync")
+async def sync_auth(user: CurrentUser = Depends(get_current_user)):
+    return {"id": user.id}
+
+
+@app.get("/async")
+async def async_auth(user: CurrentUser = Depends(get_current_user_async)):
+    return {"id": user.id}
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[idx]
+
+
+async def _measure_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.005):
+    """interval 마다 깨어나서 예정 시각보다 얼마나 늦었는지 기록"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_case(path: str, token: str, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    lag_samples = []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 커넥션 풀 워밍업
+        await client.get(path, headers=headers)
+
+        async def one():
+            async with sem:
+                start = time.perf_counter()
+                res = await client.get(path, headers=headers)
+                res.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        lag_task = asyncio.create_task(_measure_loop_lag(stop, lag_samples))
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        wall = time.perf_counter() - wall_start
+        stop.set()
+        await lag_task
+
+    return {
+        "path": path,
+        "requests": total,
+        "wall_s": round(wall, 3),
+        "rps": round(total / wall, 1),
+        "latency_p50_ms": round(statistics.median(latencies), 2),
+        "latency_p95_ms": round(_percentile(latencies, 0.95), 2),
+        "loop_lag_p50_ms": round(statistics.median(lag_samples), 2) if lag_samples else 0.0,
+        "loop_lag_p99_ms": round(_percentile(lag_samples, 0.99), 2),
+        "loop_lag_max_ms": round(max(lag_samples), 2) if lag_samples else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--login-id", required=True, help="DB 에 존재하는 user.login_id")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    token = jwt.encode(
+        {"sub": args.login_id, "exp": int(time.time()) + 3600},
+        auth_manager.secret_key,
+        algorithm=auth_manager.algorithm,
+    )
+
+    for path in ("/sync", "/async"):
+        result = await run_case(path, token, args.requests, args.concurrency)
+        print(result)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+# benchmarks/cefr_backend_compare.py - CEFR 분류기 백엔드 비교 (pipeline vs ONNX int8)
+"""
+같은 문장 집합으로 각 백엔드의 로딩 시간, 단건 지연, 배치 처리량, 라벨 일치율을 비교한다.
+
+- pipeline  : transformers pipeline (PyTorch fp32, 기존)
+- onnx-int8 : ONNX export + dynamic int8 양자화 (onnxruntime)
+- onnx-fp32 : 양자화 전 ONNX (--fp32 옵션, 양자화로 인한 차이 확인용)
+
+라벨 일치율은 pipeline 결과를 기준으로 계산한다.
+ONNX export 는 처음 한 번만 수행되고 CEFR_ONNX_DIR 에 저장된다 (export 시간은 따로 표시).
+
+실행 (저장소 루트에서):
+    python -m benchmarks.cefr_backend_compare
+    python -m benchmarks.cefr_backend_compare --corpus sentences.txt --batch-size 32 --repeat 3 --fp32
+"""
+import argparse
+import statistics
+import time
+
+from server.chat.service.cefr_backends import (
+    CEFR_MAX_LENGTH, export_onnx, load_onnx_backend, load_pipeline_backend,
+)
+
+SAMPLE_CORPUS = [
+    "Hi!",
+    "Yes.",
+    "I don't know.",
+    "I like apples.",
+    "My name is Tom and I am ten.",
+    "I go to school by bus every day.",
+    "Yesterday I played soccer with my friends after school.",
+    "I have been learning English for three years.",
+    "If it rains tomorrow, we will stay at home and watch movies.",
+    "She told me that she had already finished her homework.",
+    "I'm thinking about changing my job because I want more free time.",
+    "The movie was boring, so I fell asleep in the middle of it.",
+    "Could you recommend a good restaurant near the station?",
+    "Although the weather was terrible, we decided to go hiking anyway.",
+    "Having lived abroad for several years, I find it easy to adapt to new cultures.",
+    "The government should invest more in renewable energy to tackle climate change.",
+    "Had I known about the traffic, I would have left much earlier.",
+    "Not only did he apologise, but he also offered to pay for the damage.",
+    "The proliferation of social media has fundamentally altered how we perceive privacy.",
+    "Her argument, while compelling at first glance, ultimately rests on a false premise.",
+    "It is imperative that policymakers reconcile economic growth with environmental sustainability.",
+    "The novel's fragmented narrative mirrors the protagonist's disintegrating sense of self.",
+    "Notwithstanding the committee's reservations, the proposal was ratified unanimously.",
+    "What do you usually do on weekends?",
+    "I'm so tired today because I stayed up late studying for my exam.",
+    "Do you think artificial intelligence will replace teachers in the future?",
+    "I prefer reading books to watching TV because it makes me use my imagination.",
+    "Honestly, I'm not sure whether I should take the job offer or continue my studies.",
+    "The lecture on quantum mechanics was far beyond my comprehension.",
+    "Let's talk about your favorite food.",
+]
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[idx]
+
+
+def run_backend(name: str, classifier, corpus, batch_size: int, repeat: int, max_length: int) -> dict:
+    # 워밍업 (첫 호출의 lazy 초기화 제외)
+    classifier(corpus[:2], batch_size=2, truncation=True, max_length=max_length)
+
+    # 단건 지연
+    single_ms = []
+    for _ in range(repeat):
+        for text in corpus:
+            start = time.perf_counter()
+            classifier([text], batch_size=1, truncation=True, max_length=max_length)
+            single_ms.append((time.perf_counter() - start) * 1000)
+
+    # 배치 처리량
+    labels = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = classifier(corpus, batch_size=batch_size, truncation=True, max_length=max_length)
+        labels = [out["label"] for out in outputs]
+    batch_s = time.perf_counter() - start
+
+    return {
+        "backend": name,
+        "single_p50_ms": round(_percentile(single_ms, 0.50), 2),
+        "single_p95_ms": round(_percentile(single_ms, 0.95), 2),
+        "single_avg_ms": round(statistics.mean(single_ms), 2),
+        "batch_size": batch_size,
+        "throughput_per_s": round(len(corpus) * repeat / batch_s, 1),
+        "labels": labels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="한 줄에 한 문장인 텍스트 파일 (없으면 내장 샘플)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-length", type=int, default=CEFR_MAX_LENGTH)
+    parser.add_argument("--fp32", action="store_true", help="양자화 전 ONNX 모델도 측정")
+    args = parser.parse_args()
+
+    corpus = SAMPLE_CORPUS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [line.strip() for line in f if line.strip()]
+
+    results = []
+
+    start = time.perf_counter()
+    classifier, version = load_pipeline_backend()
+    load_s = time.perf_counter() - start
+    results.append({**run_backend("pipeline", classifier, corpus, args.batch_size, args.repeat, args.max_length),
+                    "load_s": round(load_s, 2), "version": version})
+    del classifier
+
+    # export 는 최초 1회 (이미 있으면 바로 반환) → 로딩 시간과 분리해서 측정
+    start = time.perf_counter()
+    export_onnx()
+    export_s = time.perf_counter() - start
+
+    variants = [("onnx-int8", True)] + ([("onnx-fp32", False)] if args.fp32 else [])
+    for name, quantized in variants:
+        start = time.perf_counter()
+        classifier, version = load_onnx_backend(quantized=quantized)
+        load_s = time.perf_counter() - start
+        results.append({**run_backend(name, classifier, corpus, args.batch_size, args.repeat, args.max_length),
+                        "load_s": round(load_s, 2), "export_s": round(export_s, 2), "version": version})
+
+    baseline = results[0]["labels"]
+    print(f"corpus: {len(corpus)} sentences × {args.repeat} repeats")
+    for result in results:
+        labels = result.pop("labels")
+        agree = sum(a == b for a, b in zip(baseline, labels))
+        result["label_agreement"] = round(agree / len(baseline), 4)
+        print(result)
+
+    for result in results[1:]:
+        speedup = results[0]["single_p50_ms"] / result["single_p50_ms"] if result["single_p50_ms"] else 0.0
+        print(f"{result['backend']}: p50 speedup ×{speedup:.2f}, agreement {result['label_agreement']:.1%} vs pipeline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/chat_concurrency.py - /api/chat 동시 요청이 겹쳐서 처리되는지 확인
+"""
+단일 요청 지연(baseline)을 먼저 재고, N개의 /api/chat 요청을 동시에 보낸다.
+
+- serialization = (N개 동시 요청 wall time) / baseline
+    → N 근처면 직렬 처리 (event loop 가 막힘), 1 근처면 요청들이 서로 겹쳐서 처리됨
+
+실행 (서버 실행 중, 저장소 루트에서):
+    python -m benchmarks.chat_concurrency --base-url http://localhost:8000 --token <JWT> -n 8
+    # 토큰 없이 디버그 엔드포인트 사용 (user_id=1)
+    python -m benchmarks.chat_concurrency --base-url http://localhost:8000 --debug -n 8
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+async def one_request(client: httpx.AsyncClient, path: str, headers: dict, idx: int) -> float:
+    start = time.perf_counter()
+    res = await client.post(path, json={"message": f"Hi! How was your day? ({idx})", "initialChat": False},
+                            headers=headers)
+    res.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", help="Bearer JWT (없으면 --debug 필요)")
+    parser.add_argument("--debug", action="store_true", help="/api/chat/debug 사용 (JWT 불필요)")
+    parser.add_argument("-n", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    if not args.debug and not args.token:
+        parser.error("--token 또는 --debug 중 하나가 필요합니다")
+
+    path = "/api/chat/debug" if args.debug else "/api/chat"
+    headers = {} if args.debug else {"Authorization": f"Bearer {args.token}"}
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        baseline = await one_request(client, path, headers, -1)
+
+        t0 = time.perf_counter()
+        latencies = await asyncio.gather(*(one_request(client, path, headers, i) for i in range(args.n)))
+        wall = time.perf_counter() - t0
+
+    serialization = wall / baseline if baseline else 0.0
+    print({
+        "requests": args.n,
+        "baseline_s": round(baseline, 2),
+        "wall_s": round(wall, 2),
+        "latency_avg_s": round(sum(latencies) / len(latencies), 2),
+        "latency_max_s": round(max(latencies), 2),
+        "serialization": round(serialization, 2),
+    })
+    # 직렬 처리라면 serialization ≈ N → 절반 미만이면 겹쳐서 처리된 것으로 간주
+    if args.n > 1 and serialization >= args.n / 2:
+        print("❌ Requests did not overlap — event loop is likely blocked")
+        raise SystemExit(1)
+    print("✅ Requests overlapped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
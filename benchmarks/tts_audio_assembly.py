@@ -0,0 +1,112 @@
+# benchmarks/tts_audio_assembly.py - 팟캐스트 오디오 조립 비용 (기존 pydub += vs 미리 할당한 PCM 버퍼)
+"""
+줄 수(segment 수)를 늘려가며 조립 / 인코딩 시간을 비교한다. 네트워크(TTS 호출)는 포함하지 않는다.
+
+- legacy   : AudioSegment.from_file → final_audio += seg + silence (매번 누적 버퍼 복사) → mp3 export
+- assembly : wave 로 1회 디코딩 → 전체 길이만큼 한 번 할당 → 순서대로 복사 → 1회 인코딩
+
+각 segment 는 --seconds 길이의 합성 음성 대역 톤(24kHz mono 16bit WAV, Groq PlayAI 출력과 같은 형식).
+결과 열:
+    concat_ms : 디코딩 + 이어 붙이기 (인코딩 제외) → legacy 는 segment 수에 제곱, assembly 는 선형
+    encode_ms : 출력 형식 인코딩 1회
+    total_ms / size_kb
+
+실행 (저장소 루트에서, legacy / mp3 / ogg-opus 는 pydub + ffmpeg 필요):
+    python -m benchmarks.tts_audio_assembly
+    python -m benchmarks.tts_audio_assembly --segments 5 10 20 40 80 --seconds 4 --formats wav ogg-opus mp3
+    python -m benchmarks.tts_audio_assembly --no-legacy
+"""
+import argparse
+import io
+import time
+import wave
+
+import numpy as np
+
+from server.chat.service.audio_assembly import (
+    TTS_GAP_MS, TTS_LEAD_SILENCE_MS, assemble_pcm, decode_wav, encode,
+)
+
+
+def make_wav(seconds: float, rate: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    tone = np.sin(2 * np.pi * rng.uniform(120, 260) * t) * 0.3 + rng.normal(0, 0.02, len(t))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((tone * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def run_legacy(wavs):
+    from pydub import AudioSegment
+
+    start = time.perf_counter()
+    final_audio = AudioSegment.silent(duration=TTS_LEAD_SILENCE_MS)
+    for data in wavs:
+        seg = AudioSegment.from_file(io.BytesIO(data), format="wav")
+        final_audio += seg + AudioSegment.silent(duration=TTS_GAP_MS)
+    concat_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    final_audio.export(buffer, format="mp3")
+    encode_s = time.perf_counter() - start
+    return concat_s, encode_s, len(buffer.getvalue())
+
+
+def run_assembly(wavs, fmt: str):
+    start = time.perf_counter()
+    pcm = assemble_pcm([decode_wav(data) for data in wavs])
+    concat_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    audio = encode(pcm, fmt)
+    encode_s = time.perf_counter() - start
+    return concat_s, encode_s, len(audio)
+
+
+def _row(name: str, n: int, concat_s: float, encode_s: float, size: int) -> dict:
+    return {
+        "method": name,
+        "segments": n,
+        "concat_ms": round(concat_s * 1000, 1),
+        "encode_ms": round(encode_s * 1000, 1),
+        "total_ms": round((concat_s + encode_s) * 1000, 1),
+        "size_kb": size // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segments", type=int, nargs="+", default=[5, 10, 20, 40, 80])
+    parser.add_argument("--seconds", type=float, default=4.0, help="segment 하나의 길이 (초)")
+    parser.add_argument("--rate", type=int, default=24000)
+    parser.add_argument("--formats", nargs="+", default=["wav", "ogg-opus", "mp3"],
+                        choices=["wav", "ogg-opus", "mp3"])
+    parser.add_argument("--repeat", type=int, default=3, help="각 측정의 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--no-legacy", action="store_true", help="기존 pydub += 방식 생략")
+    args = parser.parse_args()
+
+    print(f"segment: {args.seconds}s @ {args.rate}Hz mono, gap {TTS_GAP_MS}ms, repeat {args.repeat} (min)")
+    for n in args.segments:
+        wavs = [make_wav(args.seconds, args.rate, seed=i) for i in range(n)]
+
+        runs = [] if args.no_legacy else [("legacy-mp3", run_legacy)]
+        runs += [(f"assembly-{fmt}", lambda w, fmt=fmt: run_assembly(w, fmt)) for fmt in args.formats]
+        for name, fn in runs:
+            try:
+                results = [fn(wavs) for _ in range(args.repeat)]
+            except (ImportError, FileNotFoundError, RuntimeError) as e:
+                print({"method": name, "segments": n, "skipped": f"{type(e).__name__}: {e}"})
+                continue
+            concat_s = min(r[0] for r in results)
+            encode_s = min(r[1] for r in results)
+            print(_row(name, n, concat_s, encode_s, results[0][2]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,53 @@
 import base64
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
 from jose import JWTError, jwt
-from fastapi import HTTPException, status, Request, Depends
-from sqlalchemy.orm import Session
-from server.database import get_db
+from fastapi import HTTPException, status, Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from server.database import SessionLocal, AsyncSessionLocal
 from server.models import User
+from server.core.cache import TTLCache, MISSING
+from server.core.executor import run_io_in_threadpool
 import os
 
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# ✅ JWT 검증 캐시 설정
+# ============================================================================
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_CACHE_MAX_TTL = float(os.getenv("JWT_CACHE_MAX_TTL", "3600"))      # exp 가 멀어도 최대 1시간
+JWT_NEGATIVE_CACHE_TTL = float(os.getenv("JWT_NEGATIVE_CACHE_TTL", "30"))  # 잘못된 토큰은 30초
+JWT_NEGATIVE_CACHE_SIZE = int(os.getenv("JWT_NEGATIVE_CACHE_SIZE", "1024"))  # 정상 토큰 캐시와 분리, 작게
+
+# ✅ 사용자 식별 정보 캐시 설정 (login_id → CurrentUser)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    컨트롤러가 실제로 사용하는 사용자 필드만 담은 캐시용 객체
+    (ORM User 를 캐시하면 세션이 닫힌 뒤 lazy load 가 깨지므로 값만 복사)
+    """
+    id: int
+    login_id: str
+    rank_title: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            login_id=user.login_id,
+            rank_title=user.ranks.title if user.ranks else None,
+        )
+
+
 class AuthManager:
     """
     JWT 관리 및 사용자 인증을 담당하는 클래스
@@ -16,6 +58,12 @@ class AuthManager:
         # ✅ Spring과 동일하게 base64 디코딩
         self.secret_key = base64.b64decode(secret_str)        
         self.algorithm = "HS256"
+        # sha256(token) → 검증된 payload (exp 까지 유지)
+        self.token_cache = TTLCache(maxsize=JWT_CACHE_SIZE, default_ttl=JWT_CACHE_MAX_TTL)
+        # sha256(token) → 검증 실패 표식 (임의 문자열이 정상 토큰 캐시를 밀어내지 못하도록 별도 캐시)
+        self.invalid_token_cache = TTLCache(maxsize=JWT_NEGATIVE_CACHE_SIZE, default_ttl=JWT_NEGATIVE_CACHE_TTL)
+        # login_id → CurrentUser (USER_CACHE_TTL 동안 유지, 랭크 변경 시 무효화)
+        self.identity_cache = TTLCache(maxsize=USER_CACHE_SIZE, default_ttl=USER_CACHE_TTL)
 
     # --------------------------------------------------
     # 1️⃣ JWT 유효성 검증
@@ -23,17 +71,52 @@ class AuthManager:
     def verify_token(self, token: str):
         """
         JWT 토큰이 유효한지 검증하고 payload 반환
+
+        ✅ 같은 토큰은 exp 까지 캐시된 payload 를 재사용 (HS256 재검증 생략)
+        ✅ 검증 실패한 토큰은 JWT_NEGATIVE_CACHE_TTL 동안 바로 401 처리 (invalid_token_cache, 별도 LRU)
         """
+        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        cached = self.token_cache.get(digest)
+        if cached is not MISSING:
+            return cached
+        if self.invalid_token_cache.get(digest) is not MISSING:
+            raise self._unauthorized()
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            print("✅ JWT decoded payload:", payload)  # ← 디버깅 로그 추가
-            return payload
         except Exception as e:
-            print("❌ JWT decode error:", type(e).__name__, str(e))  # ← 에러 구체적으로 출력
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired JWT token",
-            )
+            # 잘못된 토큰은 누구나 보낼 수 있음 → 요청마다 stdout 에 쓰지 않고 debug 로그로만
+            logger.debug("JWT decode error: %s %s", type(e).__name__, e)
+            self.invalid_token_cache.set(digest, True)
+            raise self._unauthorized()
+
+        # exp 가 있으면 exp 까지만, 없으면 최대 TTL 까지만 캐시
+        now = time.time()
+        expires_at = now + JWT_CACHE_MAX_TTL
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        self.token_cache.set(digest, payload, expires_at=expires_at)
+        return payload
+
+    @staticmethod
+    def _unauthorized() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired JWT token",
+        )
+
+    def cache_stats(self) -> dict:
+        """JWT 검증 캐시 hit/miss 통계"""
+        return self.token_cache.stats()
+
+    def negative_cache_stats(self) -> dict:
+        """검증 실패 토큰 캐시 hit/miss 통계"""
+        return self.invalid_token_cache.stats()
+
+    def identity_cache_stats(self) -> dict:
+        """사용자 식별 정보 캐시 hit/miss 통계"""
+        return self.identity_cache.stats()
 
 
     # --------------------------------------------------
@@ -69,18 +152,120 @@ class AuthManager:
         user = self.get_user_from_token(db, token)
         return user.id
 
+    # --------------------------------------------------
+    # 5️⃣ 캐시된 사용자 식별 정보 (id, login_id, rank)
+    # --------------------------------------------------
+    def get_cached_identity(self, login_id: str) -> Optional[CurrentUser]:
+        cached = self.identity_cache.get(login_id)
+        return None if cached is MISSING else cached
+
+    def load_identity(self, login_id: str, db: Optional[Session] = None) -> CurrentUser:
+        """
+        캐시 미스 시 DB 에서 조회 후 캐시에 저장
+        (db 가 없으면 직접 세션을 열고 닫음)
+        """
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            user = (
+                db.query(User)
+                .options(joinedload(User.ranks))
+                .filter(User.login_id == login_id)
+                .first()
+            )
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"User with login_id={login_id} not found",
+                )
+            identity = CurrentUser.from_user(user)
+        finally:
+            if own_session:
+                db.close()
+
+        self.identity_cache.set(login_id, identity)
+        return identity
+
+    async def load_identity_async(self, login_id: str, db: Optional[AsyncSession] = None) -> CurrentUser:
+        """
+        load_identity 의 AsyncSession 버전 (event loop 를 막지 않음)
+        (db 가 없으면 조회 한 번만 쓰는 짧은 세션을 열고 바로 반납)
+        """
+        query = (
+            select(User)
+            .options(joinedload(User.ranks))
+            .where(User.login_id == login_id)
+        )
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                user = (await session.execute(query)).scalars().first()
+        else:
+            user = (await db.execute(query)).scalars().first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with login_id={login_id} not found",
+            )
+        identity = CurrentUser.from_user(user)
+        self.identity_cache.set(login_id, identity)
+        return identity
+
+    def invalidate_user(self, login_id: Optional[str] = None, user_id: Optional[int] = None) -> None:
+        """
+        랭크 변경 등으로 사용자 정보가 바뀌었을 때 캐시 제거
+        (user_id 만 아는 경우 캐시 전체를 훑어서 제거 — 드문 작업)
+        """
+        if login_id is not None:
+            self.identity_cache.invalidate(login_id)
+        if user_id is not None:
+            self.identity_cache.invalidate_where(lambda _, identity: identity.id == user_id)
+
+
+# --------------------------------------------------
+# ✅ 모듈 전역 싱글톤 (요청마다 secret 디코딩/캐시 생성 방지)
+# --------------------------------------------------
+auth_manager = AuthManager()
+
 
 # --------------------------------------------------
 # FastAPI 의존성으로 사용할 수 있도록 래퍼 제공
 # --------------------------------------------------
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
-    """
-    Authorization 헤더에서 토큰을 읽고 user 객체 반환
-    """
+def _bearer_token(request: Request) -> str:
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing Authorization header")
+    return auth_header.split(" ")[1]
+
+
+async def get_current_user(request: Request) -> CurrentUser:
+    """
+    Authorization 헤더에서 토큰을 읽고 사용자 식별 정보 반환
+
+    ✅ JWT 캐시 + identity 캐시 hit 시 DB 세션도, threadpool 도 사용하지 않음
+    ✅ 미스일 때만 IO thread pool 에서 DB 조회
+    """
+    token = _bearer_token(request)
+    login_id = auth_manager.get_login_id_from_token(token)
+
+    identity = auth_manager.get_cached_identity(login_id)
+    if identity is not None:
+        return identity
+    return await run_io_in_threadpool(auth_manager.load_identity, login_id)
+
+
+async def get_current_user_async(request: Request) -> CurrentUser:
+    """
+    get_current_user 의 완전 비동기 버전
+
+    ✅ 캐시 미스 시 AsyncSession(aiomysql)으로 조회 → threadpool 도 사용하지 않음
+    ✅ 조회용 세션은 load_identity_async 안에서 열고 바로 닫음
+       → 요청 수명 세션(get_async_db)이 응답 끝까지 커넥션을 잡지 않음 (LLM 호출 중에도 풀 반납)
+    """
+    token = _bearer_token(request)
+    login_id = auth_manager.get_login_id_from_token(token)
 
-    token = auth_header.split(" ")[1]
-    manager = AuthManager()
-    return manager.get_user_from_token(db, token)
+    identity = auth_manager.get_cached_identity(login_id)
+    if identity is not None:
+        return identity
+    return await auth_manager.load_identity_async(login_id)
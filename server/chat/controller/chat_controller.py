@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from sqlalchemy.orm import Session
-from server.chat.service.chat_service import process_chat_message
-from server.chat.repository.chat_log_repository import get_recent_chat_logs
-from server.auth_manager import get_current_user
-from server.database import get_db
-from server.models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from server.chat.service.chat_service import process_chat_message, stream_chat_message
+from server.chat.service.audio_assembly import TTS_AUDIO_MIME
+from server.chat.repository.chat_log_repository_async import get_chat_logs_page
+from server.core.pagination import MAX_PAGE_SIZE, resolve_page_args
+from server.auth_manager import get_current_user_async, CurrentUser
+from server.database import get_async_db
 
 router = APIRouter()
 
@@ -18,7 +21,7 @@ class ChatRequest(BaseModel):
 @router.post("/chat")
 async def chat_endpoint(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user_async)
 ):
     """
     사용자 메시지를 받아 LangGraph로 처리
@@ -34,40 +37,94 @@ async def chat_endpoint(
     return {
         "response": result.get("output"),
         "audio": result.get("audio_base64"),
+        "audio_mime": TTS_AUDIO_MIME if result.get("audio_base64") else None,
         "chatNum": result.get("chatNum"),
         "chatOrder": result.get("chatOrder"),
-        "cefr_level": result.get("cefr_level")
+        "cefr_level": result.get("cefr_level"),
+        "prompt_tokens": result.get("prompt_tokens")
     }
 
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    """
+    /chat 의 SSE 스트리밍 버전 (text/event-stream)
+    - event: meta  → {"chatNum", "chatOrder", "cefr_level", "prompt_tokens"} (첫 토큰 전에 전송)
+    - event: token → {"text"} (모델 출력 조각)
+    - event: done  → /chat 응답과 같은 형태의 최종 결과 (저장 완료 후 전송)
+    - event: error → {"detail"}
+    - podcast 로 분기되면 done 이벤트 하나만 전송
+    """
+    async def event_source():
+        try:
+            async for event, data in stream_chat_message(
+                message=request.message,
+                user_id=current_user.id,
+                initial_chat=request.initialChat
+            ):
+                yield _sse(event, data)
+        except Exception as e:
+            print(f"❌ [Chat Stream] {type(e).__name__}: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/chat/logs")
 async def get_chat_logs(
     chat_order: Optional[int] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    대화 로그를 가져옵니다.
-    - chat_order 파라미터 있음: 해당 chat_order의 최근 10개 로그
-    - chat_order 파라미터 없음: 모든 chat_order의 최근 10개 로그
+    대화 로그를 가져옵니다. (id 기준 커서 페이지네이션)
+    - chat_order 파라미터 있음: 해당 chat_order의 로그
+    - chat_order 파라미터 없음: 모든 chat_order의 로그 (chat_order 순 → 대화 안에서는 id 순)
+    - cursor: 이전 응답의 next_cursor (before_id/after_id 보다 우선)
+    - before_id / after_id: 해당 id 이전/이후 로그
+    - 아무것도 없으면 최근 size개
     """
-    logs = get_recent_chat_logs(
+    try:
+        before_id, after_id = resolve_page_args(cursor, before_id, after_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logs, next_cursor = await get_chat_logs_page(
         db=db,
         user_id=current_user.id,
         chat_order=chat_order,
-        limit=10
+        before_id=before_id,
+        after_id=after_id,
+        limit=size
     )
 
     return {
         "logs": [
             {
+                "id": log.id,
                 "chatNum": log.chatNum,
                 "userChat": log.userChat,
                 "aiChat": log.aiChat,
                 "createdAt": log.createdAt.isoformat() if log.createdAt else None
             }
             for log in logs
-        ]
+        ],
+        "next_cursor": next_cursor
     }
 
 
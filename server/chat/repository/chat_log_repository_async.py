@@ -0,0 +1,130 @@
+# chat repository module (AsyncSession 버전)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from server.models import ChatLog, ChatOrder
+from server.core.pagination import build_page
+
+async def get_recent_chat_logs(db: AsyncSession, user_id: int, chat_order: Optional[int] = None, limit: int = 10):
+    """
+    특정 유저의 chat logs를 가져옵니다. (비동기)
+    - chat_order가 있으면: 해당 chat_order의 최근 로그
+    - chat_order가 없으면: 모든 chat_order의 최근 로그
+    """
+    if chat_order is not None:
+        # 특정 chat_order의 로그 조회
+        result = await db.execute(
+            select(ChatOrder.id)
+            .where(ChatOrder.user_id == user_id, ChatOrder.chat_order == chat_order)
+            .limit(1)
+        )
+        chat_order_id = result.scalar_one_or_none()
+
+        if chat_order_id is None:
+            return []
+
+        stmt = (
+            select(ChatLog)
+            .where(ChatLog.chat_order_id == chat_order_id)
+            .order_by(ChatLog.createdAt.desc())
+            .limit(limit)
+        )
+    else:
+        # 모든 chat_order의 최근 로그 조회
+        stmt = (
+            select(ChatLog)
+            .join(ChatOrder, ChatLog.chat_order_id == ChatOrder.id)
+            .where(ChatOrder.user_id == user_id)
+            .order_by(ChatLog.createdAt.desc())
+            .limit(limit)
+        )
+
+    result = await db.execute(stmt)
+    logs = list(result.scalars().all())
+
+    # 시간 순서대로 정렬 (오래된 것부터)
+    logs.reverse()
+    return logs
+
+
+async def get_chat_logs_page(db: AsyncSession, user_id: int, chat_order: Optional[int] = None,
+                             before_id: Optional[int] = None, after_id: Optional[int] = None,
+                             limit: int = 10):
+    """
+    chat logs 키셋 페이지 조회 (PK 기준, OFFSET 없음)
+    - before_id: 해당 id 보다 과거 로그 (히스토리 위로 스크롤)
+    - after_id: 해당 id 보다 최신 로그 (새 로그 따라잡기)
+    - 둘 다 없으면: 가장 최근 페이지
+    - chat_order 가 없으면: 유저의 대화를 chat_order 순으로 이어서 페이지 구성 (대화 안에서는 id 순)
+
+    Returns:
+        (오래된 것부터 정렬된 logs, next_cursor | None)
+    """
+    if chat_order is None:
+        return await _get_user_chat_logs_page(db, user_id, before_id, after_id, limit)
+
+    result = await db.execute(
+        select(ChatOrder.id)
+        .where(ChatOrder.user_id == user_id, ChatOrder.chat_order == chat_order)
+        .limit(1)
+    )
+    chat_order_id = result.scalar_one_or_none()
+    if chat_order_id is None:
+        return [], None
+
+    # 한 개 더 가져와서 다음 페이지 존재 여부 판단
+    newer = after_id is not None
+    rows = await _order_logs(db, chat_order_id, newer, after_id if newer else before_id, limit + 1)
+    return build_page(rows, limit, after_id)
+
+
+async def _order_logs(db: AsyncSession, chat_order_id: int, newer: bool,
+                      bound_id: Optional[int], n: int) -> list:
+    """
+    한 대화의 로그 n 개 (ix_chat_log_order_id 범위 스캔, filesort 없음)
+    - newer=True: bound_id 보다 최신, id 오름차순 / False: bound_id 보다 과거, id 내림차순
+    """
+    stmt = select(ChatLog).where(ChatLog.chat_order_id == chat_order_id)
+    if newer:
+        if bound_id is not None:
+            stmt = stmt.where(ChatLog.id > bound_id)
+        stmt = stmt.order_by(ChatLog.id.asc())
+    else:
+        if bound_id is not None:
+            stmt = stmt.where(ChatLog.id < bound_id)
+        stmt = stmt.order_by(ChatLog.id.desc())
+    result = await db.execute(stmt.limit(n))
+    return list(result.scalars().all())
+
+
+async def _get_user_chat_logs_page(db: AsyncSession, user_id: int, before_id: Optional[int],
+                                   after_id: Optional[int], limit: int):
+    """
+    유저 전체 로그 페이지: 대화별로 (chat_order, id) 인덱스 범위만 읽고 limit + 1 개가 찰 때까지 이어 붙임
+
+    ⚠️ join + ORDER BY chat_log.id 는 유저의 모든 로그를 읽고 정렬해야 하므로 사용하지 않음
+    - 대화 목록: uq_user_chat_order (user_id, chat_order) 범위 스캔
+    - 커서 id 가 속한 대화부터 시작 (그 대화 안에서만 id 조건 적용)
+    """
+    newer = after_id is not None
+    cursor_id = after_id if newer else before_id
+    orders = select(ChatOrder.id, ChatOrder.chat_order).where(ChatOrder.user_id == user_id)
+    anchor = None
+    if cursor_id is not None:
+        anchor = (await db.execute(
+            select(ChatOrder.chat_order)
+            .join(ChatLog, ChatLog.chat_order_id == ChatOrder.id)
+            .where(ChatLog.id == cursor_id, ChatOrder.user_id == user_id)
+        )).scalar_one_or_none()
+        if anchor is None:
+            return [], None
+        orders = orders.where(ChatOrder.chat_order >= anchor if newer else ChatOrder.chat_order <= anchor)
+    orders = orders.order_by(ChatOrder.chat_order.asc() if newer else ChatOrder.chat_order.desc())
+
+    rows = []
+    for chat_order_id, order_num in (await db.execute(orders)).all():
+        bound_id = cursor_id if order_num == anchor else None
+        rows += await _order_logs(db, chat_order_id, newer, bound_id, limit + 1 - len(rows))
+        if len(rows) > limit:
+            break
+    return build_page(rows, limit, after_id)
@@ -0,0 +1,92 @@
+# chat write-behind 저장소 (ChatLog / ChatSummary / ChatAnalysis)
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from server.core.write_behind import PendingRow, WriteBehindQueue
+from server.database import AsyncSessionLocal, is_duplicate_key
+from server.models import ChatLog
+from server.chat.service.conversation_state import conversation_states
+
+# ============================================================================
+# ✅ 설정 (기본 비활성: CHAT_WRITE_BEHIND=true 일 때만 큐 사용)
+# ============================================================================
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "false").lower() == "true"
+CHAT_WRITE_BEHIND_INTERVAL_MS = int(os.getenv("CHAT_WRITE_BEHIND_INTERVAL_MS", "200"))
+CHAT_WRITE_BEHIND_BATCH = int(os.getenv("CHAT_WRITE_BEHIND_BATCH", "200"))
+CHAT_WRITE_BEHIND_RETRIES = int(os.getenv("CHAT_WRITE_BEHIND_RETRIES", "5"))
+
+
+async def _reassign_chat_num(row: PendingRow, error: Exception) -> Optional[Dict[str, Any]]:
+    """
+    다른 워커가 같은 (chat_order, chatNum) 을 먼저 저장한 ChatLog row → DB / 큐 기준 다음 번호로 재시도
+
+    + 그 대화의 상태 캐시를 버림 → 다음 요청은 DB (+ 대기 row) 에서 next_chat_num 을 다시 읽음
+    """
+    if row.model is not ChatLog or not is_duplicate_key(error):
+        return None
+    chat_order_id = row.values["chat_order_id"]
+    async with AsyncSessionLocal() as db:
+        last = (await db.execute(
+            select(func.max(ChatLog.chatNum)).where(ChatLog.chat_order_id == chat_order_id)
+        )).scalar() or 0
+    queued = max(
+        (values["chatNum"] for model, values in chat_write_behind.pending_rows()
+         if model is ChatLog and values["chat_order_id"] == chat_order_id),
+        default=0,
+    )
+    conversation_states.invalidate_order(chat_order_id)
+    chat_num = max(last, queued) + 1
+    print(f"🔁 [WriteBehind:chat] chatNum {row.values['chatNum']} taken in chat_order id={chat_order_id} → {chat_num}")
+    return {**row.values, "chatNum": chat_num}
+
+
+chat_write_behind = WriteBehindQueue(
+    session_factory=AsyncSessionLocal,
+    name="chat",
+    flush_interval=CHAT_WRITE_BEHIND_INTERVAL_MS / 1000,
+    max_batch=CHAT_WRITE_BEHIND_BATCH,
+    max_retries=CHAT_WRITE_BEHIND_RETRIES,
+    conflict_handler=_reassign_chat_num,
+)
+
+Row = Tuple[Type[Any], Dict[str, Any]]
+
+
+def _group_by_model(rows: Iterable[Row]) -> Dict[Type[Any], List[Dict[str, Any]]]:
+    """모델별 값 리스트 (처음 등장한 순서 유지) → 모델당 multi-row INSERT 1회"""
+    grouped: Dict[Type[Any], List[Dict[str, Any]]] = {}
+    for model, values in rows:
+        grouped.setdefault(model, []).append(values)
+    return grouped
+
+
+def persist_chat_rows(db: Session, rows: Iterable[Row]) -> None:
+    """
+    chat 관련 row 저장
+    - write-behind 가 켜져 있고 실행 중이면: 큐에 적재 (응답은 DB 를 기다리지 않음)
+    - 아니면: 모델별 bulk INSERT 후 한 번만 commit
+    """
+    rows = list(rows)
+    if CHAT_WRITE_BEHIND and chat_write_behind.running:
+        for model, values in rows:
+            chat_write_behind.enqueue(model, values)
+        return
+
+    for model, values in _group_by_model(rows).items():
+        db.execute(insert(model), values)
+    db.commit()
+
+
+async def persist_chat_rows_async(db: AsyncSession, rows: Iterable[Row]) -> None:
+    """persist_chat_rows 의 AsyncSession 버전"""
+    rows = list(rows)
+    if CHAT_WRITE_BEHIND and chat_write_behind.running:
+        for model, values in rows:
+            chat_write_behind.enqueue(model, values)
+        return
+
+    for model, values in _group_by_model(rows).items():
+        await db.execute(insert(model), values)
+    await db.commit()
@@ -0,0 +1,174 @@
+# server/chat/service/audio_assembly.py - TTS 오디오 조립 (WAV 1회 디코딩 → 미리 할당한 PCM 버퍼 → 1회 인코딩)
+import io
+import os
+import wave
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+# ============================================================================
+# ✅ 설정
+# ============================================================================
+# mp3: 기존과 같은 형식 (ffmpeg 1회) / wav: 인코딩 없음 / ogg-opus: mp3 보다 가볍고 작음
+TTS_AUDIO_FORMAT = os.getenv("TTS_AUDIO_FORMAT", "mp3").lower()
+TTS_LEAD_SILENCE_MS = int(os.getenv("TTS_LEAD_SILENCE_MS", "500"))   # 맨 앞 무음
+TTS_GAP_MS = int(os.getenv("TTS_GAP_MS", "250"))                     # 줄 뒤 무음
+
+AUDIO_MIME = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "ogg-opus": "audio/ogg; codecs=opus",
+}
+if TTS_AUDIO_FORMAT not in AUDIO_MIME:
+    print(f"⚠️ Unknown TTS_AUDIO_FORMAT={TTS_AUDIO_FORMAT!r} → using mp3")
+    TTS_AUDIO_FORMAT = "mp3"
+TTS_AUDIO_MIME = AUDIO_MIME[TTS_AUDIO_FORMAT]
+
+
+@dataclass
+class PcmClip:
+    samples: np.ndarray   # int16, shape (frames, channels)
+    rate: int
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+
+# ============================================================================
+# ✅ 디코딩 (wave 모듈, 줄마다 1회 → 읽지 못하는 형식만 pydub)
+# ============================================================================
+def _to_int16(raw: bytes, width: int) -> np.ndarray:
+    if width == 2:
+        return np.frombuffer(raw, dtype="<i2")
+    if width == 1:      # unsigned 8-bit
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8
+    if width == 3:      # 24-bit → 상위 16 bit
+        return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)[:, 1:].copy().view("<i2").reshape(-1)
+    if width == 4:
+        return (np.frombuffer(raw, dtype="<i4") >> 16).astype(np.int16)
+    raise ValueError(f"Unsupported WAV sample width: {width * 8} bit")
+
+
+def _decode_pydub(data: bytes) -> PcmClip:
+    """기존 방식 (AudioSegment.from_file): WAVE_FORMAT_EXTENSIBLE 헤더 등은 pydub 파서, 그 외는 ffmpeg"""
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(io.BytesIO(data), format="wav").set_sample_width(2)
+    samples = np.frombuffer(segment.raw_data, dtype="<i2").reshape(-1, segment.channels)
+    return PcmClip(samples, segment.frame_rate)
+
+
+def decode_wav(data: bytes) -> PcmClip:
+    """
+    WAV bytes → int16 PCM
+
+    ⚠️ wave 모듈은 WAVE_FORMAT_EXTENSIBLE(0xFFFE) 헤더를 거부 → 그 줄만 pydub(→ ffmpeg) 로 디코딩
+    """
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            rate, channels, width = wav.getframerate(), wav.getnchannels(), wav.getsampwidth()
+            raw = wav.readframes(wav.getnframes())
+        return PcmClip(_to_int16(raw, width).reshape(-1, channels), rate)
+    except (wave.Error, ValueError) as e:
+        print(f"⚠️ [TTS] wave decode failed ({e}) → pydub")
+        return _decode_pydub(data)
+
+
+def _conform(clip: PcmClip, rate: int, channels: int) -> np.ndarray:
+    """첫 줄과 형식이 다른 경우에만 채널 / 샘플레이트 맞춤 (보통은 그대로 반환)"""
+    samples = clip.samples
+    if clip.channels != channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = np.repeat(mono, channels, axis=1).astype(np.int16)
+    if clip.rate != rate:
+        frames = len(samples)
+        target = int(round(frames * rate / clip.rate))
+        src = np.arange(frames)
+        dst = np.linspace(0, frames - 1, target) if frames else np.zeros(0)
+        samples = np.stack(
+            [np.interp(dst, src, samples[:, c]) for c in range(channels)], axis=1
+        ).astype(np.int16)
+    return samples
+
+
+# ============================================================================
+# ✅ 조립 (전체 길이 계산 → 한 번 할당 → 순서대로 복사)
+# ============================================================================
+def assemble_pcm(clips: Sequence[PcmClip], lead_ms: int = TTS_LEAD_SILENCE_MS,
+                 gap_ms: int = TTS_GAP_MS) -> PcmClip:
+    """
+    [lead 무음] clip0 [gap] clip1 [gap] ... clipN [gap]
+
+    ✅ 누적 버퍼를 매번 복사하지 않으므로 줄 수에 선형 (기존 += 방식은 제곱)
+    """
+    if not clips:
+        raise ValueError("⚠️ No audio clips to assemble")
+    rate, channels = clips[0].rate, clips[0].channels
+    parts: List[np.ndarray] = [_conform(clip, rate, channels) for clip in clips]
+
+    lead = rate * lead_ms // 1000
+    gap = rate * gap_ms // 1000
+    total = lead + sum(len(p) for p in parts) + gap * len(parts)
+
+    out = np.zeros((total, channels), dtype=np.int16)   # 무음 구간은 0 그대로
+    pos = lead
+    for part in parts:
+        out[pos:pos + len(part)] = part
+        pos += len(part) + gap
+    return PcmClip(out, rate)
+
+
+# ============================================================================
+# ✅ 인코딩 (1회)
+# ============================================================================
+def _encode_wav(pcm: PcmClip) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(pcm.channels)
+        wav.setsampwidth(2)
+        wav.setframerate(pcm.rate)
+        wav.writeframes(pcm.samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _encode_ffmpeg(pcm: PcmClip, fmt: str, **export_kwargs) -> bytes:
+    from pydub import AudioSegment
+
+    segment = AudioSegment(
+        pcm.samples.astype("<i2").tobytes(), frame_rate=pcm.rate, sample_width=2, channels=pcm.channels
+    )
+    buffer = io.BytesIO()
+    segment.export(buffer, format=fmt, **export_kwargs)
+    return buffer.getvalue()
+
+
+_OPUS_RATES = (48000, 24000, 16000, 12000, 8000)
+
+
+def _encode_opus(pcm: PcmClip) -> bytes:
+    """libsndfile(soundfile) 로 프로세스 안에서 인코딩, 없거나 지원하지 않는 샘플레이트면 ffmpeg"""
+    if pcm.rate in _OPUS_RATES:
+        try:
+            import soundfile as sf
+
+            buffer = io.BytesIO()
+            sf.write(buffer, pcm.samples, pcm.rate, format="OGG", subtype="OPUS")
+            return buffer.getvalue()
+        except (ImportError, RuntimeError, TypeError) as e:
+            print(f"⚠️ [TTS] soundfile Opus encode unavailable ({type(e).__name__}: {e}) → ffmpeg")
+    return _encode_ffmpeg(pcm, "ogg", codec="libopus")
+
+
+def encode(pcm: PcmClip, fmt: str = TTS_AUDIO_FORMAT) -> bytes:
+    if fmt == "wav":
+        return _encode_wav(pcm)
+    if fmt == "ogg-opus":
+        return _encode_opus(pcm)
+    return _encode_ffmpeg(pcm, "mp3")
+
+
+def assemble_wavs(wavs: Sequence[bytes], fmt: str = TTS_AUDIO_FORMAT) -> bytes:
+    """WAV bytes 목록 (재생 순서) → 하나로 이어 붙여 fmt 로 인코딩한 bytes"""
+    return encode(assemble_pcm([decode_wav(data) for data in wavs]), fmt)
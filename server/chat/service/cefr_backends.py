@@ -0,0 +1,170 @@
+# server/chat/service/cefr_backends.py - CEFR 분류기 백엔드 (transformers pipeline / 양자화 ONNX)
+import json
+import os
+from typing import List, Optional, Tuple
+
+# ============================================================================
+# ✅ 설정
+# ============================================================================
+CEFR_MODEL = os.getenv("CEFR_MODEL", "dksysd/cefr-classifier")
+CEFR_MODEL_REVISION = os.getenv("CEFR_MODEL_REVISION", "main")
+CEFR_BACKEND = os.getenv("CEFR_BACKEND", "pipeline").lower()       # "pipeline" | "onnx"
+CEFR_ONNX_DIR = os.getenv("CEFR_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "cefr-onnx"))
+CEFR_ONNX_THREADS = int(os.getenv("CEFR_ONNX_THREADS", "0"))       # 0 이면 onnxruntime 기본값
+CEFR_MAX_LENGTH = int(os.getenv("CEFR_MAX_LENGTH", "128"))         # 토큰 기준 최대 길이 (초과분 truncation)
+
+_ONNX_FP32 = "model.onnx"
+_ONNX_INT8 = "model.int8.onnx"
+_ONNX_META = "export_meta.json"
+
+
+# ============================================================================
+# ✅ pipeline 백엔드 (기존)
+# ============================================================================
+def load_pipeline_backend(model: str = CEFR_MODEL, revision: str = CEFR_MODEL_REVISION):
+    """→ (pipeline, 모델 버전 문자열)"""
+    from transformers import pipeline
+
+    classifier = pipeline(
+        "text-classification",
+        model=model,
+        tokenizer=model,
+        revision=revision
+    )
+    # 허브에서 받은 경우 실제 commit hash
+    commit = getattr(classifier.model.config, "_commit_hash", None) or revision
+    return classifier, f"{model}@{commit}"
+
+
+# ============================================================================
+# ✅ ONNX 백엔드 (1회 export → dynamic int8 양자화 → onnxruntime 추론)
+# ============================================================================
+def _export_dir(model: str, revision: str) -> str:
+    return os.path.join(CEFR_ONNX_DIR, f"{model.replace('/', '--')}@{revision}")
+
+
+def export_onnx(model: str = CEFR_MODEL, revision: str = CEFR_MODEL_REVISION,
+                out_dir: Optional[str] = None) -> str:
+    """
+    HuggingFace 모델을 ONNX 로 export 후 dynamic int8 양자화
+
+    - 이미 export 되어 있으면 그대로 사용 (torch 를 import 하지 않음)
+    - 결과 디렉터리: model.onnx / model.int8.onnx / 토크나이저 / export_meta.json
+    """
+    out_dir = out_dir or _export_dir(model, revision)
+    if os.path.exists(os.path.join(out_dir, _ONNX_INT8)) and os.path.exists(os.path.join(out_dir, _ONNX_META)):
+        return out_dir
+
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    print(f"🔄 Exporting CEFR classifier to ONNX ({model}@{revision}) → {out_dir}")
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model, revision=revision)
+    hf_model = AutoModelForSequenceClassification.from_pretrained(model, revision=revision)
+    hf_model.eval()
+
+    sample = tokenizer(["This is a sample sentence."], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = os.path.join(out_dir, _ONNX_FP32)
+    with torch.no_grad():
+        torch.onnx.export(
+            hf_model,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    quantize_dynamic(fp32_path, os.path.join(out_dir, _ONNX_INT8), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(out_dir)
+    commit = getattr(hf_model.config, "_commit_hash", None) or revision
+    with open(os.path.join(out_dir, _ONNX_META), "w") as f:
+        json.dump({
+            "model": model,
+            "revision": commit,
+            "input_names": input_names,
+            "id2label": {str(k): v for k, v in hf_model.config.id2label.items()},
+        }, f)
+    print(f"✅ ONNX export done: {out_dir}")
+    return out_dir
+
+
+class OnnxCefrClassifier:
+    """
+    onnxruntime 세션 + 토크나이저를 pipeline 과 같은 호출 형태로 감싼 분류기
+
+        classifier(["text", ...], batch_size=N, truncation=True, max_length=128)
+        → [{"label": "B1", "score": 0.93}, ...]
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = True):
+        import numpy as np
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self._np = np
+        with open(os.path.join(model_dir, _ONNX_META)) as f:
+            meta = json.load(f)
+        self.input_names: List[str] = meta["input_names"]
+        self.id2label = {int(k): v for k, v in meta["id2label"].items()}
+        self.revision = meta["revision"]
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        options = ort.SessionOptions()
+        if CEFR_ONNX_THREADS > 0:
+            options.intra_op_num_threads = CEFR_ONNX_THREADS
+        path = os.path.join(model_dir, _ONNX_INT8 if quantized else _ONNX_FP32)
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, texts: List[str], batch_size: Optional[int] = None,
+                 truncation: bool = True, max_length: Optional[int] = None):
+        if isinstance(texts, str):
+            texts = [texts]
+        batch_size = batch_size or len(texts)
+        np = self._np
+
+        results = []
+        for i in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[i:i + batch_size], padding=True, truncation=truncation,
+                max_length=max_length, return_tensors="np",
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            logits = self.session.run(["logits"], feeds)[0]
+
+            # softmax
+            exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+            probs = exp / exp.sum(axis=-1, keepdims=True)
+            for row in probs:
+                idx = int(row.argmax())
+                results.append({"label": self.id2label[idx], "score": float(row[idx])})
+        return results
+
+
+def load_onnx_backend(model: str = CEFR_MODEL, revision: str = CEFR_MODEL_REVISION, quantized: bool = True):
+    """→ (OnnxCefrClassifier, 모델 버전 문자열)"""
+    classifier = OnnxCefrClassifier(export_onnx(model, revision), quantized=quantized)
+    # 양자화 결과는 원본과 라벨이 다를 수 있으므로 캐시 키에 백엔드까지 포함
+    suffix = "onnx-int8" if quantized else "onnx-fp32"
+    return classifier, f"{model}@{classifier.revision}+{suffix}"
+
+
+# ============================================================================
+# ✅ 설정에 따라 백엔드 선택 (ONNX 실패 시 pipeline 으로 fallback)
+# ============================================================================
+def load_classifier(backend: str = CEFR_BACKEND) -> Tuple[object, str]:
+    if backend == "onnx":
+        try:
+            return load_onnx_backend()
+        except Exception as e:
+            print(f"⚠️ [CEFR] ONNX backend unavailable ({type(e).__name__}: {e}) → falling back to pipeline")
+    elif backend != "pipeline":
+        print(f"⚠️ [CEFR] Unknown CEFR_BACKEND={backend!r} → using pipeline")
+    return load_pipeline_backend()
@@ -0,0 +1,437 @@
+# server/chat/service/cefr_service.py - CEFR 분류 micro-batching 워커 (동기/비동기 graph 공용)
+import asyncio
+import hashlib
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from server.chat.service.cefr_backends import CEFR_BACKEND, CEFR_MAX_LENGTH, load_classifier
+from server.core.cache import TTLCache, MISSING
+from server.core.metrics import registry
+
+# ============================================================================
+# ✅ 설정
+# ============================================================================
+CEFR_BATCH_SIZE = int(os.getenv("CEFR_BATCH_SIZE", "16"))          # 한 번의 forward pass 최대 문장 수
+CEFR_BATCH_WAIT_MS = float(os.getenv("CEFR_BATCH_WAIT_MS", "5"))   # 첫 요청 이후 배치를 모으는 최대 시간
+CEFR_TORCH_THREADS = int(os.getenv("CEFR_TORCH_THREADS", "0"))     # 0 이면 torch 기본값
+CEFR_PREDICT_TIMEOUT = float(os.getenv("CEFR_PREDICT_TIMEOUT", "10"))  # 초과하면 UNKNOWN 으로 진행
+
+# 예측 캐시 (메모리 LRU + 선택적 sqlite 디스크 계층)
+CEFR_CACHE_ENABLED = os.getenv("CEFR_CACHE_ENABLED", "true").lower() == "true"
+CEFR_CACHE_SIZE = int(os.getenv("CEFR_CACHE_SIZE", "100000"))
+CEFR_CACHE_MAX_BYTES = int(os.getenv("CEFR_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CEFR_CACHE_TTL = float(os.getenv("CEFR_CACHE_TTL", str(7 * 24 * 3600)))
+CEFR_CACHE_DB = os.getenv("CEFR_CACHE_DB", "")                     # 비어 있으면 디스크 계층 없음
+CEFR_CACHE_DB_MAX_ROWS = int(os.getenv("CEFR_CACHE_DB_MAX_ROWS", "500000"))  # 초과분은 오래된 것부터 삭제
+CEFR_CACHE_DB_PRUNE_EVERY = int(os.getenv("CEFR_CACHE_DB_PRUNE_EVERY", "200"))  # put_many 몇 번마다 정리할지
+
+UNKNOWN_LEVEL = "UNKNOWN"
+
+# ============================================================================
+# ✅ 모델 전역 로딩 (서버 시작 시 한 번만)
+# ============================================================================
+# CEFR_BACKEND: "pipeline" (transformers, 기본) | "onnx" (int8 양자화 onnxruntime, 실패 시 pipeline)
+print(f"🔄 Loading CEFR classifier model (backend={CEFR_BACKEND})...")
+# MODEL_VERSION: 캐시 키에 들어가는 모델 버전 (commit hash + 백엔드)
+cefr_classifier, MODEL_VERSION = load_classifier()
+print(f"✅ CEFR classifier loaded ({MODEL_VERSION})")
+
+
+def normalize_text(text: str) -> str:
+    """공백 정리 (모델 입력과 캐시 키 모두 이 결과 사용)"""
+    return " ".join(text.split())
+
+
+# ============================================================================
+# ✅ 예측 캐시
+# ============================================================================
+def _entry_sizeof(key: str, value: dict) -> int:
+    # key + label + score(float) + 값 dict / OrderedDict 노드 대략치
+    return sys.getsizeof(key) + sys.getsizeof(value["label"]) + 24 + 400
+
+
+class CefrPredictionCache:
+    """
+    (모델 버전, 정규화된 입력) → {"label", "score"}
+
+    - 키: sha256(모델 버전 + 입력) → 입력 길이와 무관하게 고정 크기, 모델이 바뀌면 자동으로 다른 키
+    - 1차: 메모리 LRU (항목 수 + max_bytes 제한)
+    - 2차 (선택): sqlite 파일 → 재시작 후에도, 같은 호스트의 다른 워커와도 공유
+      (디스크 조회/저장은 배치 워커 스레드에서만 → event loop 차단 없음)
+      - 조회 시 ttl 이 지난 row 는 무시, 열 때와 put_many 몇 번마다 만료/초과 row 삭제
+    """
+
+    def __init__(self, model_version: str, maxsize: int = CEFR_CACHE_SIZE,
+                 max_bytes: int = CEFR_CACHE_MAX_BYTES, ttl: float = CEFR_CACHE_TTL,
+                 db_path: str = CEFR_CACHE_DB, db_max_rows: int = CEFR_CACHE_DB_MAX_ROWS,
+                 db_prune_every: int = CEFR_CACHE_DB_PRUNE_EVERY):
+        self.model_version = model_version
+        self.memory = TTLCache(maxsize=maxsize, default_ttl=ttl, max_bytes=max_bytes, sizeof=_entry_sizeof)
+        self.ttl = ttl
+        self.db_path = db_path
+        self.db_max_rows = db_max_rows
+        self.db_prune_every = db_prune_every
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._puts_since_prune = 0
+
+        self._memory_hits = registry.counter("cefr.cache.memory_hits")
+        self._disk_hits = registry.counter("cefr.cache.disk_hits")
+        self._misses = registry.counter("cefr.cache.misses")
+        self._disk_errors = registry.counter("cefr.cache.disk_errors")
+        self._disk_pruned = registry.counter("cefr.cache.disk_pruned")
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_version}\0{text}".encode("utf-8")).hexdigest()
+
+    # --------------------------------------------------
+    # 메모리 계층
+    # --------------------------------------------------
+    def get_memory(self, key: str) -> Optional[dict]:
+        value = self.memory.get(key)
+        if value is MISSING:
+            return None
+        self._memory_hits.inc()
+        return value
+
+    # --------------------------------------------------
+    # 디스크 계층 (sqlite)
+    # --------------------------------------------------
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cefr_prediction ("
+                " key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cefr_prediction_created_at ON cefr_prediction (created_at)"
+            )
+            self._conn.commit()
+            # 재시작 사이에 쌓인 만료/초과 row 정리
+            self._prune(self._conn)
+        return self._conn
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """ttl 이 지난 row 삭제 + db_max_rows 초과분은 오래된 것부터 삭제 (_db_lock 안에서 호출)"""
+        deleted = conn.execute(
+            "DELETE FROM cefr_prediction WHERE created_at <= ?", (time.time() - self.ttl,)
+        ).rowcount
+        if self.db_max_rows > 0:
+            excess = conn.execute("SELECT COUNT(*) FROM cefr_prediction").fetchone()[0] - self.db_max_rows
+            if excess > 0:
+                deleted += conn.execute(
+                    "DELETE FROM cefr_prediction WHERE key IN ("
+                    " SELECT key FROM cefr_prediction ORDER BY created_at ASC LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        conn.commit()
+        self._puts_since_prune = 0
+        if deleted > 0:
+            self._disk_pruned.inc(deleted)
+            print(f"🧹 [CEFR Cache] pruned {deleted} disk row(s)")
+
+    def get_disk_many(self, keys: List[str]) -> Dict[str, dict]:
+        """메모리 미스 키들을 디스크에서 조회 (찾은 항목은 메모리로 올림)"""
+        if not self.db_path or not keys:
+            return {}
+        try:
+            with self._db_lock:
+                placeholders = ",".join("?" * len(keys))
+                rows = self._db().execute(
+                    f"SELECT key, label, score, created_at FROM cefr_prediction"
+                    f" WHERE key IN ({placeholders}) AND created_at > ?",
+                    [*keys, time.time() - self.ttl],
+                ).fetchall()
+        except sqlite3.Error as e:
+            self._disk_errors.inc()
+            print(f"⚠️ [CEFR Cache] disk read failed: {e}")
+            return {}
+
+        found = {}
+        for key, label, score, created_at in rows:
+            found[key] = {"label": label, "score": score}
+            # 메모리에서도 디스크 row 의 남은 수명만큼만 유지
+            self.memory.set(key, found[key], expires_at=created_at + self.ttl)
+        self._disk_hits.inc(len(found))
+        return found
+
+    # --------------------------------------------------
+    # 저장
+    # --------------------------------------------------
+    def record_misses(self, n: int) -> None:
+        self._misses.inc(n)
+
+    def put_many(self, items: Dict[str, dict]) -> None:
+        for key, value in items.items():
+            self.memory.set(key, value)
+        if not self.db_path or not items:
+            return
+        now = time.time()
+        try:
+            with self._db_lock:
+                conn = self._db()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cefr_prediction (key, label, score, created_at) VALUES (?, ?, ?, ?)",
+                    [(key, v["label"], v["score"], now) for key, v in items.items()],
+                )
+                conn.commit()
+                self._puts_since_prune += 1
+                if self.db_prune_every > 0 and self._puts_since_prune >= self.db_prune_every:
+                    self._prune(conn)
+        except sqlite3.Error as e:
+            self._disk_errors.inc()
+            print(f"⚠️ [CEFR Cache] disk write failed: {e}")
+
+    def stats(self) -> dict:
+        memory_hits = self._memory_hits.value
+        disk_hits = self._disk_hits.value
+        misses = self._misses.value
+        total = memory_hits + disk_hits + misses
+        return {
+            "model_version": self.model_version,
+            "memory_hits": memory_hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "hit_rate": round((memory_hits + disk_hits) / total, 4) if total else 0.0,
+            "disk": self.db_path or None,
+            "disk_errors": self._disk_errors.value,
+            "disk_pruned": self._disk_pruned.value,
+            "memory": self.memory.stats(),
+        }
+
+
+# ============================================================================
+# ✅ 배치 워커
+# ============================================================================
+@dataclass
+class _Pending:
+    text: str
+    future: Future
+    key: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class CefrBatcher:
+    """
+    CEFR 분류 요청을 모아서 한 번의 padded batch forward pass 로 처리하는 전용 워커
+
+    - 워커 스레드는 하나 → forward pass 가 서로 torch 스레드를 뺏지 않음
+      (이전: CPU_EXECUTOR 8개 스레드에서 1문장짜리 forward pass 8개가 동시에 실행)
+    - 첫 요청이 들어오면 최대 wait_ms 동안 또는 batch_size 개가 찰 때까지 모은 뒤 실행
+    - submit() 은 thread-safe, concurrent.futures.Future 반환 → 동기/비동기 어디서든 사용
+    - cache 가 있으면 메모리 hit 은 큐를 거치지 않고 즉시 완료,
+      디스크 조회와 배치 안 중복 입력 제거는 워커에서 forward pass 전에 처리
+    - 이미 취소된 요청은 건너뛰고, 배치 처리 중 예외는 그 배치의 Future 만 실패시킴 (워커는 계속 실행)
+    """
+
+    def __init__(self, classifier, batch_size: int = CEFR_BATCH_SIZE,
+                 wait_ms: float = CEFR_BATCH_WAIT_MS, max_length: int = CEFR_MAX_LENGTH,
+                 cache: Optional[CefrPredictionCache] = None):
+        self.classifier = classifier
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.wait_s = max(0.0, wait_ms) / 1000
+        self.max_length = max_length
+
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._started_at = None
+
+        self._batch_items = registry.histogram("cefr.batch_items", buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+        self._queue_wait_ms = registry.histogram("cefr.queue_wait_ms")
+        self._forward_ms = registry.histogram("cefr.forward_ms")
+        self._items = registry.counter("cefr.items")
+        self._errors = registry.counter("cefr.errors")
+        registry.gauge("cefr.queue_depth", self._queue.qsize)
+
+    # --------------------------------------------------
+    # 요청 적재
+    # --------------------------------------------------
+    def submit(self, text: str) -> Future:
+        """→ Future[{"label": "B1", "score": 0.93}]"""
+        text = normalize_text(text)
+        future: Future = Future()
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(text)
+            cached = self.cache.get_memory(key)
+            if cached is not None:
+                future.set_result(cached)
+                return future
+
+        self._ensure_started()
+        self._queue.put(_Pending(text, future, key))
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is not None:
+                    print("⚠️ [CEFR] batch worker was not running → restarting")
+                self._started_at = self._started_at or time.perf_counter()
+                self._thread = threading.Thread(target=self._run, name="cefr_batcher", daemon=True)
+                self._thread.start()
+
+    # --------------------------------------------------
+    # 워커
+    # --------------------------------------------------
+    def _collect(self) -> List[_Pending]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        if CEFR_TORCH_THREADS > 0:
+            try:
+                import torch
+                torch.set_num_threads(CEFR_TORCH_THREADS)
+            except Exception as e:
+                print(f"⚠️ [CEFR] torch.set_num_threads failed: {e}")
+
+        while True:
+            # 이미 취소된 요청 제외 (speculative 작업 취소 / 클라이언트 연결 끊김 / 타임아웃)
+            # → 남은 Future 는 RUNNING 상태라 더 이상 취소되지 않으므로 set_result 가 실패하지 않음
+            batch = [item for item in self._collect() if item.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._process(batch)
+            except Exception as e:
+                self._errors.inc()
+                print(f"❌ [CEFR] batch of {len(batch)} failed: {type(e).__name__} {e}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+
+    def _process(self, batch: List[_Pending]) -> None:
+        """한 배치 처리 (디스크 캐시 → 중복 제거 → forward pass → 결과 / 캐시 저장)"""
+        start = time.perf_counter()
+        for item in batch:
+            self._queue_wait_ms.observe((start - item.enqueued_at) * 1000)
+
+        # 디스크 계층 hit 은 forward pass 없이 완료
+        if self.cache is not None:
+            found = self.cache.get_disk_many(list({item.key for item in batch}))
+            remaining = []
+            for item in batch:
+                if item.key in found:
+                    item.future.set_result(found[item.key])
+                else:
+                    remaining.append(item)
+            batch = remaining
+            if not batch:
+                return
+
+        # 같은 입력은 한 번만 forward
+        texts = list(dict.fromkeys(item.text for item in batch))
+        if self.cache is not None:
+            self.cache.record_misses(len(texts))
+
+        start = time.perf_counter()
+        outputs = self.classifier(
+            texts,
+            batch_size=len(texts),
+            truncation=True,
+            max_length=self.max_length,
+        )
+        self._forward_ms.observe((time.perf_counter() - start) * 1000)
+        self._batch_items.observe(len(texts))
+        self._items.inc(len(texts))
+
+        results = {
+            text: {"label": out["label"], "score": float(out["score"])}
+            for text, out in zip(texts, outputs)
+        }
+        for item in batch:
+            item.future.set_result(results[item.text])
+        if self.cache is not None:
+            self.cache.put_many({item.key: results[item.text] for item in batch})
+
+    def stats(self) -> dict:
+        forward = self._forward_ms.snapshot()
+        cache = self.cache.stats() if self.cache is not None else None
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "batch_size": self.batch_size,
+            "wait_ms": self.wait_s * 1000,
+            "max_length": self.max_length,
+            "queue_depth": self._queue.qsize(),
+            "items": self._items.value,
+            "errors": self._errors.value,
+            # forward pass 시간 기준 처리량 / 서버 가동 시간 기준 처리량
+            "throughput_per_s": round(self._items.value / (forward["sum"] / 1000), 1) if forward["sum"] else 0.0,
+            "items_per_s_uptime": round(self._items.value / uptime, 2) if uptime else 0.0,
+            "batch_items": self._batch_items.snapshot(),
+            "queue_wait_ms": self._queue_wait_ms.snapshot(),
+            "forward_ms": forward,
+            "cache": cache,
+        }
+
+
+# 모듈 전역 워커 (동기/비동기 supervisor graph 공용)
+cefr_batcher = CefrBatcher(
+    cefr_classifier,
+    cache=CefrPredictionCache(MODEL_VERSION) if CEFR_CACHE_ENABLED else None,
+)
+
+
+# ============================================================================
+# ✅ 예측 API
+# ============================================================================
+def predict_cefr_level(user_input: str) -> str:
+    """
+    HuggingFace CEFR 분류 모델로 문장의 CEFR 레벨을 예측한다. (동기, 배치 워커 결과를 기다림)
+    return 예: "A2", "B1", "C1" 등
+    """
+    future = cefr_batcher.submit(user_input)
+    try:
+        label = future.result(timeout=CEFR_PREDICT_TIMEOUT)["label"]
+        return label  # "A1" ~ "C2"
+    except FutureTimeoutError:
+        future.cancel()   # 아직 큐에 있으면 워커가 건너뜀
+        print(f"CEFR 분석 타임아웃 ({CEFR_PREDICT_TIMEOUT}s) → {UNKNOWN_LEVEL}")
+        return UNKNOWN_LEVEL
+    except Exception as e:
+        print("CEFR 분석 오류:", e)
+        return UNKNOWN_LEVEL
+
+
+async def predict_cefr_level_async(user_input: str) -> str:
+    """
+    predict_cefr_level 의 비동기 버전
+
+    ✅ forward pass 는 배치 워커 스레드에서 실행, event loop 는 Future 만 기다림
+    ✅ CEFR_PREDICT_TIMEOUT 안에 결과가 없으면 UNKNOWN (wait_for 가 Future 를 취소 → 워커가 건너뜀)
+    """
+    try:
+        result = await asyncio.wait_for(
+            asyncio.wrap_future(cefr_batcher.submit(user_input)), timeout=CEFR_PREDICT_TIMEOUT
+        )
+        label = result["label"]
+        print(f"[CEFR] 📊 Predicted: {label}")
+        return label  # "A1" ~ "C2"
+    except asyncio.TimeoutError:
+        print(f"[CEFR] ⏱ Timed out after {CEFR_PREDICT_TIMEOUT}s → {UNKNOWN_LEVEL}")
+        return UNKNOWN_LEVEL
+    except Exception as e:
+        print(f"[CEFR] ❌ Error: {e}")
+        return UNKNOWN_LEVEL
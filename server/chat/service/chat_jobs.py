@@ -0,0 +1,29 @@
+# server/chat/service/chat_jobs.py - chat 백그라운드 작업 큐 (10턴 요약 / 관심사 분석 / 요약 rollup)
+import os
+from server.core.background_jobs import BackgroundJobQueue
+
+# ============================================================================
+# ✅ 설정 (기본 활성: CHAT_ANALYSIS_BACKGROUND=false 면 기존처럼 응답 전에 실행)
+# ============================================================================
+CHAT_ANALYSIS_BACKGROUND = os.getenv("CHAT_ANALYSIS_BACKGROUND", "true").lower() == "true"
+CHAT_JOB_WORKERS = int(os.getenv("CHAT_JOB_WORKERS", "4"))
+CHAT_JOB_RETRIES = int(os.getenv("CHAT_JOB_RETRIES", "3"))
+CHAT_JOB_RETRY_BACKOFF = float(os.getenv("CHAT_JOB_RETRY_BACKOFF", "1.0"))
+
+# key = chat_order_id → 같은 대화의 요약은 순서대로, 다른 대화끼리는 병렬
+chat_jobs = BackgroundJobQueue(
+    name="chat_analysis",
+    workers=CHAT_JOB_WORKERS,
+    max_retries=CHAT_JOB_RETRIES,
+    retry_backoff=CHAT_JOB_RETRY_BACKOFF,
+)
+
+
+def analysis_job_id(chat_order_id: int, chat_num: int):
+    """같은 대화의 같은 10턴 경계 작업은 한 번만"""
+    return ("analysis", chat_order_id, chat_num // 10)
+
+
+def rollup_job_id(chat_order_id: int, upto: int):
+    """같은 대화에서 같은 요약 번호까지의 rollup 은 한 번만"""
+    return ("rollup", chat_order_id, upto)
@@ -1,11 +1,32 @@
+import os
 from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from langchain_core.messages import SystemMessage, HumanMessage
-from server.database import SessionLocal
+from server.database import SessionLocal, is_duplicate_key
 from server.models import ChatOrder, ChatLog, ChatSummary, ChatAnalysis
+from server.chat.service.conversation_state import (
+    ConversationState, conversation_states, load_state_for_order, RECENT_TURNS_MAX,
+    SUMMARY_LEVEL_RAW, SUMMARY_LEVEL_ROLLUP,
+)
+from server.chat.repository.chat_write_behind import chat_write_behind, persist_chat_rows
+from server.chat.service.chat_jobs import CHAT_ANALYSIS_BACKGROUND, chat_jobs, analysis_job_id, rollup_job_id
+from server.chat.service.prompt_builder import build_sections, count_message_tokens, record_prompt_tokens
+from server.core.executor import run_io_in_threadpool
 import json
 
+# ============================================================================
+# ✅ 10턴 요약/분석 방식
+#    combined: 구조화 출력 LLM 호출 1회로 요약 + 관심사 (기본)
+#    separate: 기존처럼 요약 / 관심사 LLM 호출 2회
+# ============================================================================
+CHAT_ANALYSIS_MODE = os.getenv("CHAT_ANALYSIS_MODE", "combined").lower()
+
+# 다른 워커가 같은 chatNum 을 먼저 저장했을 때 (UNIQUE 중복) 상태를 다시 읽고 재시도하는 횟수
+CHAT_NUM_CONFLICT_RETRIES = int(os.getenv("CHAT_NUM_CONFLICT_RETRIES", "3"))
+
 
 def handle_chat_flow(state, chat_llm, summary_llm, analysis_llm):
     """
@@ -17,181 +38,344 @@ def handle_chat_flow(state, chat_llm, summary_llm, analysis_llm):
         initial_chat = bool(state.get("initialChat", False))
 
         # --------------------------------------------------
-        # 1️⃣ ChatOrder 결정 (유저별 마지막 chat_order + 1)
+        # 1️⃣ 대화 상태 결정 (캐시 → 없으면 DB)
         # --------------------------------------------------
         if initial_chat:
-            last_order_num = (
-                db.query(func.max(ChatOrder.chat_order))
-                .filter(ChatOrder.user_id == user_id)
-                .scalar()
-            )
-            next_chat_order_num = 1 if last_order_num is None else last_order_num + 1
-
-            new_order = ChatOrder(chat_order=next_chat_order_num, user_id=user_id)
-            db.add(new_order)
-            db.commit()
-            db.refresh(new_order)
-
-            chat_order_id = new_order.id
-            chat_order_num = new_order.chat_order  # ✅ 유저별 세션 번호
-            next_chat_num = 1
-
-            print(f"🆕 [New Session] user_id={user_id}, chat_order={chat_order_num}, id={chat_order_id}")
+            conv = _create_conversation(db, user_id)
+            print(f"🆕 [New Session] user_id={user_id}, chat_order={conv.chat_order_num}, id={conv.chat_order_id}")
         else:
-            # ✅ 유저별 최신 세션 가져오기
-            last_order = (
-                db.query(ChatOrder)
-                .filter(ChatOrder.user_id == user_id)
-                .order_by(ChatOrder.chat_order.desc())
-                .first()
-            )
-
-            if last_order is None:
-                new_order = ChatOrder(chat_order=1, user_id=user_id)
-                db.add(new_order)
-                db.commit()
-                db.refresh(new_order)
-                chat_order_id = new_order.id
-                chat_order_num = new_order.chat_order
-                next_chat_num = 1
-                print(f"🆕 [Fallback New Session] user_id={user_id}, chat_order=1, id={chat_order_id}")
-            else:
-                chat_order_id = last_order.id
-                chat_order_num = last_order.chat_order  # ✅ 여기!
-                last_log = (
-                    db.query(ChatLog)
-                    .filter(ChatLog.chat_order_id == chat_order_id)
-                    .order_by(ChatLog.chatNum.desc())
-                    .first()
-                )
-                next_chat_num = 1 if last_log is None else last_log.chatNum + 1
-                print(f"💬 [Continue Chat] user_id={user_id}, chat_order={chat_order_num}, chatNum={next_chat_num}")
+            # ✅ 유저별 최신 세션: 캐시 hit 이면 DB 조회 없음
+            conv = conversation_states.get_latest(user_id) or _load_latest(db, user_id)
+            if conv is None:
+                conv = _create_conversation(db, user_id)
+                print(f"🆕 [Fallback New Session] user_id={user_id}, chat_order=1, id={conv.chat_order_id}")
+            print(f"💬 [Continue Chat] user_id={user_id}, chat_order={conv.chat_order_num}, chatNum={conv.next_chat_num}")
 
-        # --------------------------------------------------
-        # 2️⃣ 히스토리 & 요약 로드
-        # --------------------------------------------------
-        summaries = (
-            db.query(ChatSummary)
-            .filter(ChatSummary.chat_order_id == chat_order_id)
-            .order_by(ChatSummary.id.desc())
-            .limit(10)
-            .all()
-        )
-        summary_text = "\n".join(s.detail for s in reversed(summaries)) if summaries else ""
-
-        take_n = next_chat_num % 10 if next_chat_num > 1 else 0
-        logs = (
-            db.query(ChatLog)
-            .filter(ChatLog.chat_order_id == chat_order_id)
-            .order_by(ChatLog.id.desc())
-            .limit(take_n)
-            .all()
-        )
-        history_text = "\n".join(
-            f"User: {l.userChat}\nAI: {l.aiChat}" for l in reversed(logs)
-        ) if logs else ""
+        chat_order_num = conv.chat_order_num  # ✅ 유저별 세션 번호
+        # ✅ LLM 호출 전에 번호 예약 (같은 대화의 동시 요청이 같은 chatNum 을 받지 않도록)
+        next_chat_num = conv.reserve_chat_num()
+        try:
+            # --------------------------------------------------
+            # 2️⃣ 히스토리 & 요약 (상태 캐시에서) + 3️⃣ LLM 응답 생성
+            # --------------------------------------------------
+            messages, prompt_tokens = build_chat_messages(state, conv, next_chat_num)
+            ai_text = chat_llm.invoke(messages).content
+        except BaseException:
+            conv.release_chat_num(next_chat_num)
+            raise
 
         # --------------------------------------------------
-        # 3️⃣ LLM 응답 생성
+        # 4️⃣ 로그 row + 5️⃣ 저장 (write-behind 켜져 있으면 큐, 아니면 commit 1회)
+        #    다른 워커가 같은 chatNum 을 먼저 저장했으면 상태를 다시 읽고 새 번호로 저장
         # --------------------------------------------------
-        messages = [
-            SystemMessage(f"""You are a friendly and intelligent friend.
-            You respond empathetically, briefly (3 sentences max), and naturally.
-            Use the provided summaries and recent chats as context.
-
-            - The user's CEFR level is provided in state["cefr_level"].
-            - Respond using vocabulary, grammar, and sentence complexity appropriate for that CEFR level.
-            - If the CEFR level is very low (A1–A2), use simpler words and shorter sentences.
-            - If the CEFR level is high (B2–C2), use more natural and complex English expressions.
-            """),
-            HumanMessage(
-                f"[Summaries(last 10)]\n{summary_text}\n\n"
-                f"[Recent chats(last {take_n})]\n{history_text}\n\n"
-                f"[User]\n{state.get('user_input','')}"
-                f"[CEFR Level]\n{state.get('cefr_level', 'UNKNOWN')}"
-            ),
-        ]
-        ai_text = chat_llm.invoke(messages).content
+        user_text = state.get("user_input", "")
+        conv, next_chat_num = _persist_turn(db, conv, next_chat_num, user_text, ai_text)
 
-        # --------------------------------------------------
-        # 4️⃣ 로그 저장
-        # --------------------------------------------------
-        db.add(ChatLog(
-            chat_order_id=chat_order_id,
-            chatNum=next_chat_num,
-            userChat=state.get("user_input", ""),
-            aiChat=ai_text,
-            createdAt=datetime.utcnow()
-        ))
+        # ✅ 저장(또는 큐 적재) 후 상태 캐시 갱신 (다음 턴은 DB 조회 없이 진행)
+        conv.record_turn(next_chat_num, user_text, ai_text)
 
         # --------------------------------------------------
-        # 5️⃣ 요약 / 분석 트리거
+        # 6️⃣ 요약 / 분석 트리거 (상태 캐시의 최근 턴 사용)
+        #    백그라운드 작업 큐가 실행 중이면 넘기고 응답은 기다리지 않음
         # --------------------------------------------------
         if next_chat_num % 10 == 0:
-            s_detail = _summarize_recent_chats(db, chat_order_id, summary_llm, limit=10)
-            db.add(ChatSummary(chat_order_id=chat_order_id, summary_num=next_chat_num // 10, detail=s_detail))
-            print(f"🧠 Summary created for chat_order={chat_order_num}")
-            _analyze_interests(db, chat_order_id, analysis_llm, limit=20)
-            print(f"🔍 Analysis created for chat_order={chat_order_num}")
-
-        db.commit()
+            window = conv.recent_window(RECENT_TURNS_MAX)
+            args = (conv, next_chat_num, window, summary_llm, analysis_llm)
+            if CHAT_ANALYSIS_BACKGROUND and chat_jobs.submit(
+                key=conv.chat_order_id,
+                job_id=analysis_job_id(conv.chat_order_id, next_chat_num),
+                fn=lambda: run_io_in_threadpool(run_turn_analysis, *args),
+            ):
+                print(f"📮 Summary/analysis queued for chat_order={chat_order_num}")
+            else:
+                run_turn_analysis(*args)
 
         # ✅ 응답 시 chat_order_id 대신 chat_order_num 반환
         return {
             "output": ai_text,
             "chatNum": next_chat_num,
             "chatOrder": chat_order_num,  # ✅ 세션 번호
+            "prompt_tokens": prompt_tokens["total"],
         }
 
     finally:
         db.close()
 
 
+def _load_latest(db: Session, user_id: int) -> Optional[ConversationState]:
+    """
+    DB 에서 유저의 최신 ChatOrder 상태를 읽어 캐시에 등록 (세션이 없으면 None)
+
+    - user_id 별 single-flight: 동시에 미스가 나도 한 요청만 읽고 나머지는 그 결과 사용
+    - 아직 저장되지 않은 write-behind row 도 합침 (DB 보다 앞선 chatNum / 턴)
+    """
+    with conversation_states.loading(user_id):
+        conv = conversation_states.get_latest(user_id)
+        if conv is not None:
+            return conv
+        pending = chat_write_behind.pending_rows()
+        last_order = (
+            db.query(ChatOrder)
+            .filter(ChatOrder.user_id == user_id)
+            .order_by(ChatOrder.chat_order.desc())
+            .first()
+        )
+        if last_order is None:
+            return None
+        conv = load_state_for_order(db, last_order, pending)
+        conversation_states.put(conv)
+        return conv
+
+
+def _reload_conversation(db: Session, conv: ConversationState) -> ConversationState:
+    """다른 워커가 이 대화에 저장한 것이 확인됨 → 캐시를 버리고 같은 ChatOrder 상태를 DB 에서 다시 읽음"""
+    with conversation_states.loading(conv.user_id):
+        conversation_states.invalidate_order(conv.chat_order_id)
+        pending = chat_write_behind.pending_rows()
+        order = db.get(ChatOrder, conv.chat_order_id)
+        fresh = load_state_for_order(db, order, pending)
+        conversation_states.put(fresh)
+        return fresh
+
+
+def _persist_turn(db: Session, conv: ConversationState, chat_num: int,
+                  user_text: str, ai_text: str):
+    """
+    이번 턴 저장 → 실제로 저장된 (conv, chat_num)
+
+    - (chat_order, chatNum) UNIQUE 중복이면 상태를 다시 읽고 새 번호를 예약해 재시도
+    - 최종 실패 시 예약한 번호는 반납
+    """
+    for attempt in range(CHAT_NUM_CONFLICT_RETRIES + 1):
+        try:
+            persist_chat_rows(db, build_turn_rows(conv, chat_num, user_text, ai_text, datetime.utcnow()))
+            return conv, chat_num
+        except BaseException as e:
+            conv.release_chat_num(chat_num)
+            if not is_duplicate_key(e) or attempt == CHAT_NUM_CONFLICT_RETRIES:
+                raise
+            db.rollback()
+            print(f"🔁 [Chat] chatNum {chat_num} already saved in chat_order={conv.chat_order_num} → reload + retry")
+            conv = _reload_conversation(db, conv)
+            chat_num = conv.reserve_chat_num()
+
+
+def run_turn_analysis(conv: ConversationState, chat_num: int, window, summary_llm, analysis_llm) -> None:
+    """10턴 경계 요약(최근 10턴) + 관심사 분석(최근 20턴) → 저장 → 상태 캐시에 요약 반영"""
+    if CHAT_ANALYSIS_MODE == "combined":
+        s_detail, interests = _analyze_turns_combined(window, analysis_llm)
+        print(f"🧠 Summary + 🔍 Analysis created (1 call) for chat_order={conv.chat_order_num}")
+    else:
+        s_detail = _summarize_recent_chats(window[-10:], summary_llm)
+        print(f"🧠 Summary created for chat_order={conv.chat_order_num}")
+        interests = _analyze_interests(window[-20:], analysis_llm)
+        print(f"🔍 Analysis created for chat_order={conv.chat_order_num}")
+
+    db: Session = SessionLocal()
+    try:
+        persist_chat_rows(db, build_analysis_rows(conv, chat_num, s_detail, interests, datetime.utcnow()))
+    finally:
+        db.close()
+    conv.record_summary(chat_num // 10, s_detail)
+    _schedule_rollup(conv, summary_llm)
+
+
+def _schedule_rollup(conv: ConversationState, summary_llm) -> None:
+    """rollup 이후 요약이 CHAT_ROLLUP_EVERY 개 쌓였으면 rollup 작업 제출 (같은 대화 작업 뒤에 순서대로 실행)"""
+    candidates = conv.rollup_candidates()
+    if candidates is None:
+        return
+    upto = candidates[-1][0]
+    # 이전 rollup 은 작업 실행 시점에 읽음 (큐에 있는 동안 다른 rollup 이 끝날 수 있음)
+    args = (conv, candidates, summary_llm)
+    if CHAT_ANALYSIS_BACKGROUND and chat_jobs.submit(
+        key=conv.chat_order_id,
+        job_id=rollup_job_id(conv.chat_order_id, upto),
+        fn=lambda: run_io_in_threadpool(run_summary_rollup, *args),
+    ):
+        print(f"📮 Summary rollup queued for chat_order={conv.chat_order_num} (upto #{upto})")
+    else:
+        run_summary_rollup(*args)
+
+
+def run_summary_rollup(conv: ConversationState, summaries, summary_llm) -> None:
+    """현재 rollup + 그 이후 요약들 → 새 rollup 한 건 저장 → 상태 캐시 갱신"""
+    previous, summaries = _rollup_inputs(conv, summaries)
+    if not summaries:
+        return
+    upto = summaries[-1][0]
+    detail = summary_llm.invoke(_rollup_messages(previous, summaries)).content
+    print(f"🗜️ Summary rollup created for chat_order={conv.chat_order_num} (upto #{upto})")
+
+    db: Session = SessionLocal()
+    try:
+        persist_chat_rows(db, build_rollup_rows(conv, upto, detail))
+    finally:
+        db.close()
+    conv.record_rollup(upto, detail)
+
+
 # --------------------------------------------------
-# 🧠 Helper: 요약 생성
+# 💬 Helper: 채팅 프롬프트 (동기/비동기 flow 공용)
 # --------------------------------------------------
-def _summarize_recent_chats(db: Session, chat_order_id: int, llm, limit: int = 10) -> str:
-    logs = (
-        db.query(ChatLog)
-        .filter(ChatLog.chat_order_id == chat_order_id)
-        .order_by(ChatLog.id.desc())
-        .limit(limit)
-        .all()
+def build_chat_messages(state, conv: ConversationState, next_chat_num: int):
+    """
+    → (messages, 섹션별 프롬프트 토큰 수)
+
+    ✅ 요약 / 최근 턴 / 사용자 입력 섹션마다 토큰 예산 적용 (prompt_builder)
+       최근 턴과 최신 요약을 우선, 오래된 요약은 압축하거나 제외
+    """
+    take_n = next_chat_num % 10 if next_chat_num > 1 else 0
+    sections = build_sections(
+        conv.summary_texts(), conv.recent_window(take_n), state.get("user_input", ""),
+        rollup=conv.rollup_text(),
     )
-    text = "\n".join(f"User: {l.userChat}\nAI: {l.aiChat}" for l in reversed(logs)) if logs else ""
-    if not text:
-        return "No content to summarize."
-    msg = [
-        SystemMessage("Summarize the following conversation into concise bullet points (max 10)."),
-        HumanMessage(text)
+
+    messages = [
+        SystemMessage(f"""You are a friendly and intelligent friend.
+        You respond empathetically, briefly (3 sentences max), and naturally.
+        Use the provided summaries and recent chats as context.
+
+        - The user's CEFR level is provided in state["cefr_level"].
+        - Respond using vocabulary, grammar, and sentence complexity appropriate for that CEFR level.
+        - If the CEFR level is very low (A1–A2), use simpler words and shorter sentences.
+        - If the CEFR level is high (B2–C2), use more natural and complex English expressions.
+        """),
+        HumanMessage(
+            (f"[Long-term summary]\n{sections.rollup_text}\n\n" if sections.rollup_text else "")
+            + f"[Summaries(last {sections.summaries_used})]\n{sections.summary_text}\n\n"
+            f"[Recent chats(last {sections.turns_used})]\n{sections.history_text}\n\n"
+            f"[User]\n{sections.user_text}"
+            f"[CEFR Level]\n{state.get('cefr_level', 'UNKNOWN')}"
+        ),
     ]
-    return llm.invoke(msg).content
+
+    tokens = {**sections.tokens, "total": count_message_tokens(messages)}
+    record_prompt_tokens(tokens)
+    print(f"📏 Prompt tokens: {tokens}")
+    return messages, tokens
+
+
+def build_turn_rows(conv: ConversationState, chat_num: int, user_text: str, ai_text: str, now: datetime):
+    """이번 턴의 ChatLog row"""
+    return [(ChatLog, {
+        "chat_order_id": conv.chat_order_id,
+        "chatNum": chat_num,
+        "userChat": user_text,
+        "aiChat": ai_text,
+        "createdAt": now,
+    })]
+
+
+def build_analysis_rows(conv: ConversationState, chat_num: int, s_detail: str, interests, now: datetime):
+    """10턴 경계의 ChatSummary + ChatAnalysis rows"""
+    rows = [(ChatSummary, {
+        "chat_order_id": conv.chat_order_id,
+        "summary_num": chat_num // 10,
+        "detail": s_detail,
+        "level": SUMMARY_LEVEL_RAW,
+    })]
+    for detail in interests:
+        rows.append((ChatAnalysis, {
+            "chat_order_id": conv.chat_order_id,
+            "detail": detail,     # 🔥 여기! "AI", "다이어트", "FastAPI", "Flutter"만 저장됨
+            "createdAt": now,
+        }))
+    return rows
+
+
+def build_rollup_rows(conv: ConversationState, upto: int, detail: str):
+    """rollup ChatSummary row (summary_num = 포함된 마지막 요약 번호)"""
+    return [(ChatSummary, {
+        "chat_order_id": conv.chat_order_id,
+        "summary_num": upto,
+        "detail": detail[:4000],
+        "level": SUMMARY_LEVEL_ROLLUP,
+    })]
 
 
 # --------------------------------------------------
-# 🔍 Helper: 관심사 분석
+# 🆕 Helper: 새 ChatOrder 생성 + 빈 상태 캐시 등록
 # --------------------------------------------------
-def _analyze_interests(db: Session, chat_order_id: int, llm, limit: int = 20):
-    logs = (
-        db.query(ChatLog)
-        .filter(ChatLog.chat_order_id == chat_order_id)
-        .order_by(ChatLog.id.desc())
-        .limit(limit)
-        .all()
+def _create_conversation(db: Session, user_id: int) -> ConversationState:
+    # ⚠️ 다른 워커가 만든 세션이 있을 수 있으므로 번호 할당은 항상 DB 기준
+    last_order_num = (
+        db.query(func.max(ChatOrder.chat_order))
+        .filter(ChatOrder.user_id == user_id)
+        .scalar()
+    )
+    next_chat_order_num = 1 if last_order_num is None else last_order_num + 1
+
+    new_order = ChatOrder(chat_order=next_chat_order_num, user_id=user_id)
+    db.add(new_order)
+    db.commit()
+    db.refresh(new_order)
+
+    conv = ConversationState(
+        user_id=user_id,
+        chat_order_id=new_order.id,
+        chat_order_num=new_order.chat_order,
+        next_chat_num=1,
     )
+    conversation_states.put(conv)
+    return conv
+
+
+# --------------------------------------------------
+# 🧠 Helper: 요약 생성
+# --------------------------------------------------
+def _format_turns(turns) -> str:
+    return "\n".join(f"User: {u}\nAI: {a}" for u, a in turns) if turns else ""
 
-    text = "\n".join(
-        f"User: {l.userChat}\nAI: {l.aiChat}"
-        for l in reversed(logs)
-    ) if logs else ""
 
+def _summary_messages(text: str):
+    return [
+        SystemMessage("Summarize the following conversation into concise bullet points (max 10)."),
+        HumanMessage(text)
+    ]
+
+
+def _summarize_recent_chats(turns, llm) -> str:
+    """turns: 최근 (userChat, aiChat) 목록 (오래된 것 → 최신)"""
+    text = _format_turns(turns)
     if not text:
-        return "No content to analyze."
+        return "No content to summarize."
+    return llm.invoke(_summary_messages(text)).content
+
+
+# --------------------------------------------------
+# 🗜️ Helper: 요약 rollup
+# --------------------------------------------------
+def _rollup_inputs(conv: ConversationState, summaries):
+    """실행 시점의 (이전 rollup, 아직 포함되지 않은 요약들) → 이미 더 새 rollup 에 들어간 요약은 제외"""
+    previous, covered = conv.rollup_base()
+    pending = [(n, d) for n, d in summaries if n > covered]
+    if not pending:
+        print(f"⏭️ Summary rollup skipped for chat_order={conv.chat_order_num} (already covered up to #{covered})")
+    return previous, pending
+
+
+def _rollup_messages(previous: Optional[str], summaries):
+    parts = []
+    if previous:
+        parts.append(f"[Previous long-term summary]\n{previous}")
+    parts.append("[Newer summaries]\n" + "\n\n".join(f"#{n}\n{d}" for n, d in summaries))
+    return [
+        SystemMessage(
+            "You maintain the long-term memory of an ongoing conversation.\n"
+            "Merge the previous long-term summary (if any) and the newer summaries into ONE concise summary "
+            "of at most 15 bullet points. Keep lasting facts about the user (interests, plans, preferences, "
+            "recurring topics) and drop small talk. Prefer newer information when they conflict."
+        ),
+        HumanMessage("\n\n".join(parts)),
+    ]
 
-    # ------------------------
-    # 1) LLM 호출
-    # ------------------------
-    msg = [
+
+# --------------------------------------------------
+# 🔍 Helper: 관심사 분석
+# --------------------------------------------------
+def _analysis_messages(text: str):
+    return [
         SystemMessage(
             "From the dialogue, extract user's interests as a JSON:\n"
             '{"interests": [...]}'
@@ -199,39 +383,71 @@ def _analyze_interests(db: Session, chat_order_id: int, llm, limit: int = 20):
         HumanMessage(text)
     ]
 
-    result = llm.invoke(msg).content
 
-    # ------------------------
-    # 2) JSON 파싱
-    # ------------------------
+def _parse_interests(result: str) -> list:
+    """
+    LLM 응답 → 저장할 ChatAnalysis.detail 목록
+    - JSON 파싱 실패: 원본 통째로 하나만 저장
+    - interests 가 없으면 저장 안 함
+    """
     try:
         data = json.loads(result)
     except:
-        # 실패했으면 원본 통째로 하나만 저장
-        db.add(ChatAnalysis(
-            chat_order_id=chat_order_id,
-            detail=result,
-            createdAt=datetime.utcnow(),
-        ))
-        db.commit()
-        return result
-
-    # ------------------------
-    # 3) 오직 interests[]만 저장
-    # ------------------------
-    interests = data.get("interests", [])
-
-    # interests가 없으면 저장 안 함
-    if not interests:
-        return result
-
-    for item in interests:
-        db.add(ChatAnalysis(
-            chat_order_id=chat_order_id,
-            detail=item,     # 🔥 여기! "AI", "다이어트", "FastAPI", "Flutter"만 저장됨
-            createdAt=datetime.utcnow()
-        ))
+        return [result]
+    return list(data.get("interests", []))
+
+
+def _analyze_interests(turns, llm) -> list:
+    """
+    관심사 분석 → 저장할 ChatAnalysis.detail 목록 반환 (저장은 호출 측에서 한 번에)
+    """
+    text = _format_turns(turns)
+    if not text:
+        return []
+    return _parse_interests(llm.invoke(_analysis_messages(text)).content)
+
+
+# --------------------------------------------------
+# 🧠🔍 Helper: 요약 + 관심사 구조화 출력 (LLM 호출 1회)
+# --------------------------------------------------
+class TurnAnalysis(BaseModel):
+    summary: List[str] = Field(
+        description="Concise bullet points (max 10) summarizing ONLY the [Last 10 turns] section."
+    )
+    interests: List[str] = Field(
+        description="Short topics the user is interested in, taken from the whole dialogue "
+                    "(e.g. \"AI\", \"diet\", \"FastAPI\"). Empty list if none."
+    )
+
+
+def _combined_messages(turns):
+    """최근 20턴 중 앞 10턴은 관심사 분석에만, 마지막 10턴은 요약 + 관심사에 사용"""
+    earlier, last = turns[:-10], turns[-10:]
+    parts = []
+    if earlier:
+        parts.append(f"[Earlier turns]\n{_format_turns(earlier)}")
+    parts.append(f"[Last 10 turns]\n{_format_turns(last)}")
+    return [
+        SystemMessage(
+            "Analyze the dialogue below.\n"
+            "- summary: summarize only the [Last 10 turns] into concise bullet points (max 10).\n"
+            "- interests: extract the user's interests from the whole dialogue."
+        ),
+        HumanMessage("\n\n".join(parts)),
+    ]
+
+
+def _from_turn_analysis(result: TurnAnalysis):
+    """→ (ChatSummary.detail, ChatAnalysis.detail 목록)"""
+    s_detail = "\n".join(f"- {point.strip().lstrip('-• ').strip()}" for point in result.summary if point.strip())
+    interests = list(dict.fromkeys(i.strip() for i in result.interests if i.strip()))
+    return s_detail or "No content to summarize.", interests
 
-    db.commit()
 
-    return result
+def _analyze_turns_combined(turns, llm):
+    """turns: 최근 (userChat, aiChat) 최대 20개 (오래된 것 → 최신)"""
+    turns = list(turns)[-20:]
+    if not turns:
+        return "No content to summarize.", []
+    result = llm.with_structured_output(TurnAnalysis).invoke(_combined_messages(turns))
+    return _from_turn_analysis(result)
@@ -0,0 +1,390 @@
+# server/chat/service/chat_logic_service_async.py - 비동기 chat flow (AsyncSession + ainvoke)
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from server.database import AsyncSessionLocal, is_duplicate_key
+from server.models import ChatOrder
+from server.chat.service.conversation_state import (
+    ConversationState, conversation_states, load_state_for_order_async, RECENT_TURNS_MAX,
+)
+from server.chat.service.chat_logic_service import (
+    build_chat_messages, build_turn_rows, build_analysis_rows, build_rollup_rows, CHAT_ANALYSIS_MODE,
+    CHAT_NUM_CONFLICT_RETRIES, TurnAnalysis,
+    _format_turns, _summary_messages, _analysis_messages, _parse_interests,
+    _combined_messages, _from_turn_analysis, _rollup_inputs, _rollup_messages,
+)
+from server.chat.repository.chat_write_behind import chat_write_behind, persist_chat_rows_async
+from server.chat.service.chat_jobs import CHAT_ANALYSIS_BACKGROUND, chat_jobs, analysis_job_id, rollup_job_id
+
+
+async def handle_chat_flow_async(state, chat_llm, summary_llm, analysis_llm,
+                                 conv: Optional[ConversationState] = None):
+    """
+    handle_chat_flow 의 비동기 버전
+
+    ✅ DB: AsyncSession (event loop 차단 없음)
+    ✅ LLM: ainvoke (gpt-4o 응답 대기 중에도 다른 요청 처리)
+    ✅ 상태 캐시 / write-behind 는 동기 버전과 공유
+    ✅ conv: load_conversation_async 로 미리 읽어둔 상태 (있으면 조회 생략)
+    ✅ LLM 응답 대기 중에는 DB 커넥션을 잡고 있지 않음 (조회/저장 세션 분리)
+    """
+    user_id = int(state.get("userId", 0))
+    initial_chat = bool(state.get("initialChat", False))
+
+    # --------------------------------------------------
+    # 1️⃣ 대화 상태 결정 (캐시 → 없으면 DB, 짧은 세션)
+    # --------------------------------------------------
+    async with AsyncSessionLocal() as db:
+        conv = await resolve_conversation_async(db, user_id, initial_chat, conv)
+    chat_order_num = conv.chat_order_num
+    next_chat_num = conv.reserve_chat_num()
+
+    # --------------------------------------------------
+    # 2️⃣ 프롬프트 + 3️⃣ LLM 응답 생성 (세션 없음)
+    # --------------------------------------------------
+    try:
+        messages, prompt_tokens = build_chat_messages(state, conv, next_chat_num)
+        ai_text = (await chat_llm.ainvoke(messages)).content
+    except BaseException:
+        conv.release_chat_num(next_chat_num)
+        raise
+
+    # --------------------------------------------------
+    # 4️⃣ ~ 6️⃣ 저장 + 요약/분석 (짧은 세션)
+    # --------------------------------------------------
+    async with AsyncSessionLocal() as db:
+        conv, next_chat_num = await finalize_chat_turn_async(
+            db, conv, next_chat_num, state.get("user_input", ""), ai_text,
+            summary_llm, analysis_llm,
+        )
+
+    return {
+        "output": ai_text,
+        "chatNum": next_chat_num,
+        "chatOrder": chat_order_num,  # ✅ 세션 번호
+        "prompt_tokens": prompt_tokens["total"],
+    }
+
+
+@dataclass
+class ChatDraft:
+    """
+    커밋 전 채팅 응답 (speculative 실행용)
+
+    DB / 상태 캐시 / 백그라운드 작업에는 아무것도 쓰지 않은 상태 → 버려도 부작용 없음
+    """
+    conv: Optional[ConversationState] = None
+    cefr_level: Optional[str] = None        # 설정되어 있으면 CEFR 분류까지 끝난 것 (응답 생성이 실패해도 재사용)
+    prompt_tokens: Optional[dict] = None    # 설정되어 있으면 LLM 요청을 보낸 것
+    text: Optional[str] = None              # 설정되어 있으면 응답까지 받은 것
+
+
+async def draft_chat_reply_async(state, conv: Optional[ConversationState], chat_llm,
+                                 draft: Optional[ChatDraft] = None) -> ChatDraft:
+    """
+    저장 없이 응답만 생성
+
+    - conv 가 없으면 (새 세션 / 세션 없음) 빈 상태로 프롬프트 구성, ChatOrder 생성은 커밋 때
+    - draft 를 넘기면 진행 상황을 채워 넣음 (중간에 취소돼도 어디까지 갔는지 확인 가능)
+    """
+    draft = draft or ChatDraft()
+    draft.conv = conv
+    base = conv or ConversationState(user_id=int(state.get("userId", 0)), chat_order_id=0, chat_order_num=0)
+
+    messages, draft.prompt_tokens = build_chat_messages(state, base, base.next_chat_num)
+    draft.text = (await chat_llm.ainvoke(messages)).content
+    return draft
+
+
+async def commit_chat_draft_async(state, draft: ChatDraft, summary_llm, analysis_llm):
+    """draft_chat_reply_async 결과를 handle_chat_flow_async 와 같은 방식으로 저장 → 같은 형태의 결과"""
+    async with AsyncSessionLocal() as db:
+        conv = await resolve_conversation_async(
+            db, int(state.get("userId", 0)), bool(state.get("initialChat", False)), draft.conv
+        )
+        next_chat_num = conv.reserve_chat_num()
+        conv, next_chat_num = await finalize_chat_turn_async(
+            db, conv, next_chat_num, state.get("user_input", ""), draft.text,
+            summary_llm, analysis_llm,
+        )
+
+    return {
+        "output": draft.text,
+        "chatNum": next_chat_num,
+        "chatOrder": conv.chat_order_num,
+        "prompt_tokens": draft.prompt_tokens["total"],
+    }
+
+
+async def stream_chat_flow_async(state, chat_llm, summary_llm, analysis_llm,
+                                 conv: Optional[ConversationState] = None):
+    """
+    handle_chat_flow_async 의 스트리밍 버전 (SSE 용)
+
+    ✅ ("meta", {...}) → ("token", {"text": ...}) 반복 → ("done", {...}) 순서로 yield
+    ✅ LLM 스트리밍 동안에는 DB 커넥션을 잡고 있지 않음 (조회/저장 세션 분리)
+    ✅ 스트림이 끝까지 완료된 경우에만 저장 (클라이언트가 중간에 끊으면 이번 턴은 버림)
+    """
+    user_id = int(state.get("userId", 0))
+    initial_chat = bool(state.get("initialChat", False))
+
+    # 1️⃣ 대화 상태 결정
+    async with AsyncSessionLocal() as db:
+        conv = await resolve_conversation_async(db, user_id, initial_chat, conv)
+    chat_order_num = conv.chat_order_num
+    next_chat_num = conv.reserve_chat_num()
+
+    try:
+        # 2️⃣ 프롬프트
+        messages, prompt_tokens = build_chat_messages(state, conv, next_chat_num)
+
+        yield "meta", {
+            "chatNum": next_chat_num,
+            "chatOrder": chat_order_num,
+            "cefr_level": state.get("cefr_level"),
+            "prompt_tokens": prompt_tokens["total"],
+        }
+
+        # 3️⃣ 토큰 스트리밍
+        parts = []
+        async for chunk in chat_llm.astream(messages):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield "token", {"text": chunk.content}
+        ai_text = "".join(parts)
+    except BaseException:
+        # 클라이언트가 끊거나 LLM 이 실패하면 이번 턴은 저장하지 않으므로 번호 반납
+        conv.release_chat_num(next_chat_num)
+        raise
+
+    # 4️⃣ ~ 6️⃣ 저장 + 요약/분석
+    async with AsyncSessionLocal() as db:
+        conv, next_chat_num = await finalize_chat_turn_async(
+            db, conv, next_chat_num, state.get("user_input", ""), ai_text,
+            summary_llm, analysis_llm,
+        )
+
+    yield "done", {
+        "response": ai_text,
+        "audio": None,
+        "audio_mime": None,
+        "chatNum": next_chat_num,
+        "chatOrder": chat_order_num,
+        "cefr_level": state.get("cefr_level"),
+        "prompt_tokens": prompt_tokens["total"],
+    }
+
+
+async def load_conversation_async(user_id: int, initial_chat: bool) -> Optional[ConversationState]:
+    """
+    읽기 전용 대화 상태 로드 (라우팅 / CEFR 분류와 동시에 실행하는 fan-out 단계용)
+
+    - initialChat=True 이거나 세션이 아직 없으면 None → ChatOrder 생성은 chat 분기에서
+    """
+    if initial_chat:
+        return None
+    conv = conversation_states.get_latest(user_id)
+    if conv is not None:
+        return conv
+    async with AsyncSessionLocal() as db:
+        return await _load_latest_async(db, user_id)
+
+
+async def resolve_conversation_async(db: AsyncSession, user_id: int, initial_chat: bool,
+                                     conv: Optional[ConversationState] = None) -> ConversationState:
+    """initialChat 여부에 따라 새 세션 생성 또는 최신 세션 상태 반환"""
+    if initial_chat:
+        conv = await _create_conversation_async(db, user_id)
+        print(f"🆕 [New Session] user_id={user_id}, chat_order={conv.chat_order_num}, id={conv.chat_order_id}")
+        return conv
+
+    # ✅ 유저별 최신 세션: 미리 읽어둔 상태 / 캐시 hit 이면 DB 조회 없음
+    if conv is None:
+        conv = conversation_states.get_latest(user_id)
+    if conv is None:
+        conv = await _load_latest_async(db, user_id)
+    if conv is None:
+        conv = await _create_conversation_async(db, user_id)
+        print(f"🆕 [Fallback New Session] user_id={user_id}, chat_order=1, id={conv.chat_order_id}")
+        return conv
+
+    print(f"💬 [Continue Chat] user_id={user_id}, chat_order={conv.chat_order_num}, chatNum={conv.next_chat_num}")
+    return conv
+
+
+async def _load_latest_async(db: AsyncSession, user_id: int) -> Optional[ConversationState]:
+    """
+    DB 에서 유저의 최신 ChatOrder 상태를 읽어 캐시에 등록 (세션이 없으면 None)
+
+    - user_id 별 single-flight: 동시에 미스가 나도 한 요청만 읽고 나머지는 그 결과 사용
+    - 아직 저장되지 않은 write-behind row 도 합침 (DB 보다 앞선 chatNum / 턴)
+    """
+    async with conversation_states.loading_async(user_id):
+        conv = conversation_states.get_latest(user_id)
+        if conv is not None:
+            return conv
+        pending = chat_write_behind.pending_rows()
+        result = await db.execute(
+            select(ChatOrder)
+            .where(ChatOrder.user_id == user_id)
+            .order_by(ChatOrder.chat_order.desc())
+            .limit(1)
+        )
+        last_order = result.scalars().first()
+        if last_order is None:
+            return None
+        conv = await load_state_for_order_async(db, last_order, pending)
+        conversation_states.put(conv)
+        return conv
+
+
+async def _reload_conversation_async(db: AsyncSession, conv: ConversationState) -> ConversationState:
+    """다른 워커가 이 대화에 저장한 것이 확인됨 → 캐시를 버리고 같은 ChatOrder 상태를 DB 에서 다시 읽음"""
+    async with conversation_states.loading_async(conv.user_id):
+        conversation_states.invalidate_order(conv.chat_order_id)
+        pending = chat_write_behind.pending_rows()
+        order = await db.get(ChatOrder, conv.chat_order_id)
+        fresh = await load_state_for_order_async(db, order, pending)
+        conversation_states.put(fresh)
+        return fresh
+
+
+async def finalize_chat_turn_async(db: AsyncSession, conv: ConversationState, chat_num: int,
+                                   user_text: str, ai_text: str, summary_llm, analysis_llm):
+    """
+    이번 턴 저장 후 상태 캐시 갱신 → 실제로 저장된 (conv, chat_num)
+
+    ✅ chat_num 은 conv.reserve_chat_num() 으로 예약한 번호 (저장 실패 시 여기서 반납)
+    ✅ 다른 워커가 같은 chatNum 을 먼저 저장했으면 (UNIQUE 중복) 상태를 다시 읽고 새 번호로 재시도
+    ✅ 10턴 경계의 요약/분석은 백그라운드 작업 큐로 넘김 (응답은 기다리지 않음)
+       큐가 꺼져 있거나 가득 차면 기존처럼 여기서 실행
+    """
+    for attempt in range(CHAT_NUM_CONFLICT_RETRIES + 1):
+        try:
+            await persist_chat_rows_async(
+                db, build_turn_rows(conv, chat_num, user_text, ai_text, datetime.utcnow())
+            )
+            break
+        except BaseException as e:
+            conv.release_chat_num(chat_num)
+            if not is_duplicate_key(e) or attempt == CHAT_NUM_CONFLICT_RETRIES:
+                raise
+            await db.rollback()
+            print(f"🔁 [Chat] chatNum {chat_num} already saved in chat_order={conv.chat_order_num} → reload + retry")
+            conv = await _reload_conversation_async(db, conv)
+            chat_num = conv.reserve_chat_num()
+    conv.record_turn(chat_num, user_text, ai_text)
+
+    if chat_num % 10 == 0:
+        # 작업이 나중에 실행되므로 요약 대상 턴은 지금 시점으로 고정
+        window = conv.recent_window(RECENT_TURNS_MAX)
+        job = lambda: run_turn_analysis_async(conv, chat_num, window, summary_llm, analysis_llm)
+        if CHAT_ANALYSIS_BACKGROUND and chat_jobs.submit(
+            key=conv.chat_order_id, job_id=analysis_job_id(conv.chat_order_id, chat_num), fn=job
+        ):
+            print(f"📮 Summary/analysis queued for chat_order={conv.chat_order_num}")
+        else:
+            await job()
+    return conv, chat_num
+
+
+async def run_turn_analysis_async(conv: ConversationState, chat_num: int, window,
+                                  summary_llm, analysis_llm) -> None:
+    """10턴 경계 요약(최근 10턴) + 관심사 분석(최근 20턴) → 저장 → 상태 캐시에 요약 반영"""
+    if CHAT_ANALYSIS_MODE == "combined":
+        s_detail, interests = await _analyze_turns_combined_async(window, analysis_llm)
+        print(f"🧠 Summary + 🔍 Analysis created (1 call) for chat_order={conv.chat_order_num}")
+    else:
+        s_detail, interests = await asyncio.gather(
+            _summarize_recent_chats_async(window[-10:], summary_llm),
+            _analyze_interests_async(window[-20:], analysis_llm),
+        )
+        print(f"🧠 Summary / 🔍 Analysis created for chat_order={conv.chat_order_num}")
+
+    async with AsyncSessionLocal() as db:
+        await persist_chat_rows_async(db, build_analysis_rows(conv, chat_num, s_detail, interests, datetime.utcnow()))
+    conv.record_summary(chat_num // 10, s_detail)
+    await _schedule_rollup_async(conv, summary_llm)
+
+
+async def _schedule_rollup_async(conv: ConversationState, summary_llm) -> None:
+    """rollup 이후 요약이 CHAT_ROLLUP_EVERY 개 쌓였으면 rollup 작업 제출 (같은 대화 작업 뒤에 순서대로 실행)"""
+    candidates = conv.rollup_candidates()
+    if candidates is None:
+        return
+    upto = candidates[-1][0]
+    # 이전 rollup 은 작업 실행 시점에 읽음 (큐에 있는 동안 다른 rollup 이 끝날 수 있음)
+    job = lambda: run_summary_rollup_async(conv, candidates, summary_llm)
+    if CHAT_ANALYSIS_BACKGROUND and chat_jobs.submit(
+        key=conv.chat_order_id, job_id=rollup_job_id(conv.chat_order_id, upto), fn=job
+    ):
+        print(f"📮 Summary rollup queued for chat_order={conv.chat_order_num} (upto #{upto})")
+    else:
+        await job()
+
+
+async def run_summary_rollup_async(conv: ConversationState, summaries, summary_llm) -> None:
+    """현재 rollup + 그 이후 요약들 → 새 rollup 한 건 저장 → 상태 캐시 갱신"""
+    previous, summaries = _rollup_inputs(conv, summaries)
+    if not summaries:
+        return
+    upto = summaries[-1][0]
+    detail = (await summary_llm.ainvoke(_rollup_messages(previous, summaries))).content
+    print(f"🗜️ Summary rollup created for chat_order={conv.chat_order_num} (upto #{upto})")
+
+    async with AsyncSessionLocal() as db:
+        await persist_chat_rows_async(db, build_rollup_rows(conv, upto, detail))
+    conv.record_rollup(upto, detail)
+
+
+# --------------------------------------------------
+# 🆕 Helper: 새 ChatOrder 생성 + 빈 상태 캐시 등록
+# --------------------------------------------------
+async def _create_conversation_async(db: AsyncSession, user_id: int) -> ConversationState:
+    # ⚠️ 다른 워커가 만든 세션이 있을 수 있으므로 번호 할당은 항상 DB 기준
+    last_order_num = (await db.execute(
+        select(func.max(ChatOrder.chat_order)).where(ChatOrder.user_id == user_id)
+    )).scalar()
+    next_chat_order_num = 1 if last_order_num is None else last_order_num + 1
+
+    new_order = ChatOrder(chat_order=next_chat_order_num, user_id=user_id)
+    db.add(new_order)
+    await db.commit()
+    await db.refresh(new_order)
+
+    conv = ConversationState(
+        user_id=user_id,
+        chat_order_id=new_order.id,
+        chat_order_num=new_order.chat_order,
+        next_chat_num=1,
+    )
+    conversation_states.put(conv)
+    return conv
+
+
+# --------------------------------------------------
+# 🧠 Helper: 요약 / 🔍 관심사 분석 (ainvoke)
+# --------------------------------------------------
+async def _summarize_recent_chats_async(turns, llm) -> str:
+    text = _format_turns(turns)
+    if not text:
+        return "No content to summarize."
+    return (await llm.ainvoke(_summary_messages(text))).content
+
+
+async def _analyze_interests_async(turns, llm) -> list:
+    text = _format_turns(turns)
+    if not text:
+        return []
+    return _parse_interests((await llm.ainvoke(_analysis_messages(text))).content)
+
+
+async def _analyze_turns_combined_async(turns, llm):
+    turns = list(turns)[-20:]
+    if not turns:
+        return "No content to summarize.", []
+    result = await llm.with_structured_output(TurnAnalysis).ainvoke(_combined_messages(turns))
+    return _from_turn_analysis(result)
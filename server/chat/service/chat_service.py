@@ -1,14 +1,11 @@
-import server.chat.service.supervisor_graph as supervisor_graph
+import server.chat.service.supervisor_graph_async as supervisor_graph_async
 
-supervisor_app = supervisor_graph.build_supervisor_graph()
+# ✅ 비동기 그래프: 노드가 모두 async def → ainvoke 로 event loop 를 막지 않음
+supervisor_app = supervisor_graph_async.build_supervisor_graph()
 
-async def process_chat_message(message: str, user_id: int, initial_chat: bool):
-    """
-    LangGraph에 상태 전달.
-    - initial_chat=True → 새로운 chatOrder 생성
-    - initial_chat=False → 마지막 chatLog.chatNum 불러와서 +1
-    """
-    initial_state = {
+
+def _initial_state(message: str, user_id: int, initial_chat: bool):
+    return {
         "user_input": message,
         "route": "",
         "output": "",
@@ -20,4 +17,17 @@ async def process_chat_message(message: str, user_id: int, initial_chat: bool):
         "history": "",
         "history_summary": ""
     }
-    return supervisor_app.invoke(initial_state)
+
+
+async def process_chat_message(message: str, user_id: int, initial_chat: bool):
+    """
+    LangGraph에 상태 전달.
+    - initial_chat=True → 새로운 chatOrder 생성
+    - initial_chat=False → 마지막 chatLog.chatNum 불러와서 +1
+    """
+    return await supervisor_app.ainvoke(_initial_state(message, user_id, initial_chat))
+
+
+def stream_chat_message(message: str, user_id: int, initial_chat: bool):
+    """process_chat_message 의 스트리밍 버전 → (event, data) async generator"""
+    return supervisor_graph_async.stream_supervisor(_initial_state(message, user_id, initial_chat))
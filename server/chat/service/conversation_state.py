@@ -0,0 +1,311 @@
+# server/chat/service/conversation_state.py - 대화(chat_order)별 상태 캐시
+import asyncio
+import os
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.core.cache import TTLCache, MISSING
+from server.models import ChatOrder, ChatLog, ChatSummary
+
+# ============================================================================
+# ✅ 설정
+# ============================================================================
+# 사용 중인 대화는 접근할 때마다 TTL 연장 → 평소 턴은 DB 조회 없음
+# ⚠️ 프로세스 내 캐시이므로 같은 유저 요청이 여러 워커로 분산되면 워커별 next_chat_num 이 어긋날 수 있음
+#    → chat_log (chat_order, chatNum) UNIQUE 인덱스가 중복 저장을 막고,
+#      chat flow 는 중복 키 오류 시 상태를 다시 읽어 새 번호로 재시도
+CHAT_STATE_CACHE_SIZE = int(os.getenv("CHAT_STATE_CACHE_SIZE", "5000"))
+CHAT_STATE_TTL = float(os.getenv("CHAT_STATE_TTL", "1800"))
+
+RECENT_TURNS_MAX = 20   # 관심사 분석(최근 20개)까지 DB 없이 처리
+SUMMARIES_MAX = 10      # 프롬프트에 싣는 요약 개수
+
+# 10턴 요약(level 0)이 rollup 이후 이만큼 쌓이면 백그라운드에서 rollup(level 1) 하나로 압축
+CHAT_ROLLUP_EVERY = int(os.getenv("CHAT_ROLLUP_EVERY", "5"))
+# rollup 이 실패하거나 밀려도 아직 포함되지 않은 요약은 이 개수까지 상태에 유지 (다음 rollup 이 모두 포함)
+CHAT_SUMMARIES_PENDING_MAX = int(os.getenv("CHAT_SUMMARIES_PENDING_MAX", "50"))
+SUMMARY_LEVEL_RAW = 0
+SUMMARY_LEVEL_ROLLUP = 1
+
+
+@dataclass
+class ConversationState:
+    """
+    한 대화(chat_order)의 프롬프트 구성에 필요한 상태
+
+    - next_chat_num: 다음에 예약될 chatNum (reserve_chat_num 으로만 증가)
+    - summaries: rollup 에 아직 포함되지 않은 (summary_num, detail) (오래된 것 → 최신)
+      → 프롬프트에는 최근 SUMMARIES_MAX 개만, rollup 에는 전부
+    - rollup / rollup_upto: 최신 rollup detail 과 거기에 포함된 마지막 summary_num
+    - recent_turns: 최근 (userChat, aiChat) 링버퍼 (최대 RECENT_TURNS_MAX)
+    """
+    user_id: int
+    chat_order_id: int
+    chat_order_num: int
+    next_chat_num: int = 1
+    summaries: List[Tuple[int, str]] = field(default_factory=list)
+    rollup: Optional[str] = None
+    rollup_upto: int = 0
+    recent_turns: Deque[Tuple[str, str]] = field(
+        default_factory=lambda: deque(maxlen=RECENT_TURNS_MAX)
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def recent_window(self, n: int) -> List[Tuple[str, str]]:
+        """최근 n개 턴 (오래된 것 → 최신)"""
+        if n <= 0:
+            return []
+        with self.lock:
+            return list(self.recent_turns)[-n:]
+
+    def summary_texts(self) -> List[str]:
+        with self.lock:
+            return [detail for _, detail in self.summaries[-SUMMARIES_MAX:]]
+
+    def rollup_text(self) -> Optional[str]:
+        with self.lock:
+            return self.rollup
+
+    def rollup_base(self) -> Tuple[Optional[str], int]:
+        """(최신 rollup detail, 거기에 포함된 마지막 summary_num) → rollup 작업이 실행 시점에 읽음"""
+        with self.lock:
+            return self.rollup, self.rollup_upto
+
+    def reserve_chat_num(self) -> int:
+        """
+        LLM 호출 전에 이번 턴의 chatNum 예약
+        → 같은 대화에 동시에 들어온 요청이 같은 번호를 받지 않음
+        """
+        with self.lock:
+            chat_num = self.next_chat_num
+            self.next_chat_num += 1
+            return chat_num
+
+    def release_chat_num(self, chat_num: int) -> None:
+        """저장 전에 실패한 턴의 번호 반납 (그 뒤에 다른 예약이 없을 때만 → 번호 공백 방지)"""
+        with self.lock:
+            if self.next_chat_num == chat_num + 1:
+                self.next_chat_num = chat_num
+
+    def record_turn(self, chat_num: int, user_text: str, ai_text: str) -> None:
+        """턴 저장 후 호출 → 링버퍼 갱신 (chatNum 은 reserve_chat_num 에서 이미 증가)"""
+        with self.lock:
+            self.recent_turns.append((user_text, ai_text))
+            self.next_chat_num = max(self.next_chat_num, chat_num + 1)
+
+    def record_summary(self, summary_num: int, detail: str) -> None:
+        """요약 추가 (rollup 에 이미 포함된 것만 정리 → 아직 포함되지 않은 요약은 잃지 않음)"""
+        with self.lock:
+            self.summaries.append((summary_num, detail))
+            self.summaries = [(n, d) for n, d in self.summaries if n > self.rollup_upto]
+            # rollup 이 계속 실패할 때만 도달 (DB 에는 남아 있음)
+            overflow = len(self.summaries) - CHAT_SUMMARIES_PENDING_MAX
+            if overflow > 0:
+                print(f"⚠️ [Conversation State] {overflow} summary(ies) not rolled up dropped from "
+                      f"chat_order={self.chat_order_num}")
+                del self.summaries[:overflow]
+
+    def rollup_candidates(self, min_count: int = CHAT_ROLLUP_EVERY) -> Optional[List[Tuple[int, str]]]:
+        """rollup 이후 요약이 min_count 개 이상이면 그 목록, 아니면 None"""
+        with self.lock:
+            if min_count <= 0 or len(self.summaries) < min_count:
+                return None
+            return list(self.summaries)
+
+    def record_rollup(self, upto: int, detail: str) -> None:
+        """rollup 저장 후 호출 → 포함된 요약은 프롬프트에서 제외"""
+        with self.lock:
+            if upto < self.rollup_upto:
+                return
+            self.rollup = detail
+            self.rollup_upto = upto
+            self.summaries = [(n, d) for n, d in self.summaries if n > upto]
+
+
+class ConversationStateCache:
+    """
+    (user_id, chat_order) → ConversationState LRU 캐시
+    + user_id → 최신 chat_order 번호 (initialChat=False 요청이 "마지막 세션"을 찾을 때 사용)
+    + user_id 별 로드 lock (캐시 미스가 동시에 나도 DB 에서 한 번만 읽음 → 같은 next_chat_num 상태가 둘 생기지 않음)
+    """
+
+    def __init__(self, maxsize: int = CHAT_STATE_CACHE_SIZE, ttl: float = CHAT_STATE_TTL):
+        self.states = TTLCache(maxsize=maxsize, default_ttl=ttl, refresh_on_get=True)
+        self.latest_order = TTLCache(maxsize=maxsize, default_ttl=ttl, refresh_on_get=True)
+        # user_id → [lock, 사용 중인 요청 수] (마지막 요청이 끝나면 제거)
+        self._load_locks: Dict[int, list] = {}
+        self._async_load_locks: Dict[int, list] = {}
+        self._guard = threading.Lock()
+
+    def get(self, user_id: int, chat_order_num: int) -> Optional[ConversationState]:
+        state = self.states.get((user_id, chat_order_num))
+        return None if state is MISSING else state
+
+    def get_latest(self, user_id: int) -> Optional[ConversationState]:
+        chat_order_num = self.latest_order.get(user_id)
+        if chat_order_num is MISSING:
+            return None
+        return self.get(user_id, chat_order_num)
+
+    def put(self, state: ConversationState) -> None:
+        self.states.set((state.user_id, state.chat_order_num), state)
+        self.latest_order.set(state.user_id, state.chat_order_num)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.latest_order.invalidate(user_id)
+        self.states.invalidate_where(lambda key, _: key[0] == user_id)
+
+    def invalidate_order(self, chat_order_id: int) -> None:
+        """다른 워커가 같은 대화에 저장한 것이 확인되면 호출 → 다음 요청은 DB 에서 다시 읽음"""
+        self.states.invalidate_where(lambda _, state: state.chat_order_id == chat_order_id)
+
+    # --------------------------------------------------
+    # user_id 별 single-flight 로드
+    # --------------------------------------------------
+    def _checkout(self, table: Dict[int, list], user_id: int, factory) -> list:
+        with self._guard:
+            entry = table.get(user_id)
+            if entry is None:
+                entry = table[user_id] = [factory(), 0]
+            entry[1] += 1
+            return entry
+
+    def _checkin(self, table: Dict[int, list], user_id: int, entry: list) -> None:
+        with self._guard:
+            entry[1] -= 1
+            if entry[1] == 0 and table.get(user_id) is entry:
+                del table[user_id]
+
+    @contextmanager
+    def loading(self, user_id: int):
+        """동기 flow: 같은 user_id 의 상태 로드를 한 번에 하나만 (안에서 캐시를 다시 확인할 것)"""
+        entry = self._checkout(self._load_locks, user_id, threading.Lock)
+        try:
+            with entry[0]:
+                yield
+        finally:
+            self._checkin(self._load_locks, user_id, entry)
+
+    @asynccontextmanager
+    async def loading_async(self, user_id: int):
+        """loading 의 asyncio 버전 (event loop 를 막지 않고 대기)"""
+        entry = self._checkout(self._async_load_locks, user_id, asyncio.Lock)
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            self._checkin(self._async_load_locks, user_id, entry)
+
+    def stats(self) -> dict:
+        return self.states.stats()
+
+
+# 모듈 전역 캐시 (동기/비동기 chat flow 공용)
+conversation_states = ConversationStateCache()
+
+
+# ============================================================================
+# ✅ 캐시 미스 시 DB 에서 상태 복원
+# ============================================================================
+def _state_queries(order: ChatOrder):
+    last_chat_num = (
+        select(ChatLog.chatNum)
+        .where(ChatLog.chat_order_id == order.id)
+        .order_by(ChatLog.chatNum.desc())
+        .limit(1)
+    )
+    # 최신 rollup 에 포함되지 않은 요약 전부 (최근 SUMMARIES_MAX 개만이 아님 → 밀린 rollup 이 이어서 포함)
+    rolled = aliased(ChatSummary)
+    rollup_upto = (
+        select(func.coalesce(func.max(rolled.summary_num), 0))
+        .where(rolled.chat_order_id == order.id, rolled.level == SUMMARY_LEVEL_ROLLUP)
+        .scalar_subquery()
+    )
+    summaries = (
+        select(ChatSummary.summary_num, ChatSummary.detail)
+        .where(ChatSummary.chat_order_id == order.id, ChatSummary.level == SUMMARY_LEVEL_RAW,
+               ChatSummary.summary_num > rollup_upto)
+        .order_by(ChatSummary.id.desc())
+        .limit(CHAT_SUMMARIES_PENDING_MAX)
+    )
+    rollup = (
+        select(ChatSummary.summary_num, ChatSummary.detail)
+        .where(ChatSummary.chat_order_id == order.id, ChatSummary.level == SUMMARY_LEVEL_ROLLUP)
+        .order_by(ChatSummary.id.desc())
+        .limit(1)
+    )
+    logs = (
+        select(ChatLog.chatNum, ChatLog.userChat, ChatLog.aiChat)
+        .where(ChatLog.chat_order_id == order.id)
+        .order_by(ChatLog.id.desc())
+        .limit(RECENT_TURNS_MAX)
+    )
+    return last_chat_num, summaries, rollup, logs
+
+
+PendingRows = Iterable[Tuple[Type[Any], Dict[str, Any]]]
+
+
+def load_state_for_order(db: Session, order: ChatOrder, pending: PendingRows = ()) -> ConversationState:
+    """
+    ChatOrder 한 건의 마지막 chatNum / 최신 rollup / 최근 요약 / 최근 턴을 읽어서 상태 생성
+
+    pending: 아직 DB 에 없는 write-behind row (chat_write_behind.pending_rows(), DB 조회 전에 찍은 스냅샷)
+    """
+    q_last, q_summaries, q_rollup, q_logs = _state_queries(order)
+    last_chat_num = db.execute(q_last).scalar_one_or_none()
+    summaries = db.execute(q_summaries).all()
+    rollup = db.execute(q_rollup).first()
+    logs = db.execute(q_logs).all()
+    return _build_state(order, last_chat_num, summaries, rollup, logs, pending)
+
+
+async def load_state_for_order_async(db: AsyncSession, order: ChatOrder,
+                                     pending: PendingRows = ()) -> ConversationState:
+    """load_state_for_order 의 AsyncSession 버전"""
+    q_last, q_summaries, q_rollup, q_logs = _state_queries(order)
+    last_chat_num = (await db.execute(q_last)).scalar_one_or_none()
+    summaries = (await db.execute(q_summaries)).all()
+    rollup = (await db.execute(q_rollup)).first()
+    logs = (await db.execute(q_logs)).all()
+    return _build_state(order, last_chat_num, summaries, rollup, logs, pending)
+
+
+def _build_state(order: ChatOrder, last_chat_num, summaries, rollup, logs,
+                 pending: PendingRows = ()) -> ConversationState:
+    # DB 결과 + 아직 저장되지 않은 row (스냅샷 이후 커밋된 row 는 양쪽에 있을 수 있으므로 번호 기준으로 합침)
+    turns = {num: (u, a) for num, u, a in logs}
+    raw = {n: d for n, d in summaries}
+    rollup_upto, rollup_text = rollup if rollup is not None else (0, None)
+
+    for model, values in pending:
+        if values.get("chat_order_id") != order.id:
+            continue
+        if model is ChatLog:
+            turns.setdefault(values["chatNum"], (values["userChat"], values["aiChat"]))
+        elif model is ChatSummary and values.get("level", SUMMARY_LEVEL_RAW) == SUMMARY_LEVEL_RAW:
+            raw.setdefault(values["summary_num"], values["detail"])
+        elif model is ChatSummary and values["summary_num"] > rollup_upto:
+            rollup_upto, rollup_text = values["summary_num"], values["detail"]
+
+    if turns:
+        last_chat_num = max(last_chat_num or 0, max(turns))
+    state = ConversationState(
+        user_id=order.user_id,
+        chat_order_id=order.id,
+        chat_order_num=order.chat_order,
+        next_chat_num=1 if last_chat_num is None else last_chat_num + 1,
+        # rollup 에 이미 포함된 요약은 제외
+        summaries=sorted((n, d) for n, d in raw.items() if n > rollup_upto)[-CHAT_SUMMARIES_PENDING_MAX:],
+        rollup=rollup_text,
+        rollup_upto=rollup_upto,
+    )
+    state.recent_turns.extend(turns[num] for num in sorted(turns)[-RECENT_TURNS_MAX:])
+    return state
@@ -34,19 +34,15 @@ class State(TypedDict):
 # 
 
 # %%
-from langchain_openai import ChatOpenAI
-
-summary_llm = ChatOpenAI(model="gpt-4o-mini")
-agent_manager_llm = ChatOpenAI(model="gpt-4o")
-host_llm = ChatOpenAI(model="gpt-4o")
-guest_llm = ChatOpenAI(model="gpt-4o")
-history_summary_llm = ChatOpenAI(model="gpt-4o-mini")
-
-llm = ChatOpenAI(
-    model="qwen:4b",                     # Ollama 모델 이름
-    base_url="http://127.0.0.1:11434/v1",# Ollama 서버 주소
-    api_key="none"                       # 필요 없음, dummy 값
-)
+from server.core.llm_gateway import get_llm  # provider 별 공유 클라이언트 (타임아웃 / 동시성 / 재시도)
+
+summary_llm = get_llm("gpt-4o-mini", call_site="podcast.summarize")
+agent_manager_llm = get_llm("gpt-4o", call_site="podcast.agent_manager")
+host_llm = get_llm("gpt-4o", call_site="podcast.host_agent")
+guest_llm = get_llm("gpt-4o", call_site="podcast.guest_agent")
+history_summary_llm = get_llm("gpt-4o-mini", call_site="podcast.history_summarize")
+
+llm = get_llm("qwen:4b", provider="ollama", call_site="podcast.local")  # Ollama 서버 (OLLAMA_BASE_URL, 기본 127.0.0.1:11434)
 
 # 같은 LLM을 여러 역할에 재사용
 #summary_llm = llm
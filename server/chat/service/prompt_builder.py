@@ -0,0 +1,158 @@
+# server/chat/service/prompt_builder.py - 토큰 예산 기반 채팅 프롬프트 구성
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from server.core.metrics import registry
+
+# ============================================================================
+# ✅ 설정 (섹션별 토큰 예산)
+# ============================================================================
+PROMPT_MODEL = os.getenv("PROMPT_MODEL", "gpt-4o")
+PROMPT_ROLLUP_TOKENS = int(os.getenv("PROMPT_ROLLUP_TOKENS", "500"))          # 장기 요약(rollup)
+PROMPT_SUMMARY_TOKENS = int(os.getenv("PROMPT_SUMMARY_TOKENS", "800"))        # 요약 섹션 전체
+PROMPT_SUMMARY_ITEM_TOKENS = int(os.getenv("PROMPT_SUMMARY_ITEM_TOKENS", "250"))  # 최신 외 요약 1개당 상한
+PROMPT_HISTORY_TOKENS = int(os.getenv("PROMPT_HISTORY_TOKENS", "1200"))       # 최근 턴 섹션 전체
+PROMPT_USER_TOKENS = int(os.getenv("PROMPT_USER_TOKENS", "1000"))             # 이번 사용자 입력
+
+_ELLIPSIS = " …"
+
+# ============================================================================
+# ✅ 토크나이저 (tiktoken 없으면 글자 수 / 4 로 근사)
+# ============================================================================
+try:
+    import tiktoken
+
+    try:
+        _encoding = tiktoken.encoding_for_model(PROMPT_MODEL)
+    except KeyError:
+        _encoding = tiktoken.get_encoding("o200k_base")
+except ImportError:
+    _encoding = None
+    print("⚠️ tiktoken not installed → prompt token counts are approximated (chars / 4)")
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is None:
+        return (len(text) + 3) // 4
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """max_tokens 이하로 자르기 (keep="head": 앞부분 유지, "tail": 뒷부분 유지)"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max(1, max_tokens - count_tokens(_ELLIPSIS))
+    if _encoding is None:
+        chars = budget * 4
+        return text[:chars] + _ELLIPSIS if keep == "head" else _ELLIPSIS.lstrip() + " " + text[-chars:]
+
+    tokens = _encoding.encode(text, disallowed_special=())
+    if keep == "head":
+        return _encoding.decode(tokens[:budget]) + _ELLIPSIS
+    return _ELLIPSIS.lstrip() + " " + _encoding.decode(tokens[-budget:])
+
+
+# ============================================================================
+# ✅ 섹션 구성
+# ============================================================================
+@dataclass
+class PromptSections:
+    rollup_text: str
+    summary_text: str
+    history_text: str
+    user_text: str
+    summaries_used: int
+    turns_used: int
+    tokens: Dict[str, int] = field(default_factory=dict)   # 섹션별 토큰 수 (+ total)
+
+
+def fit_summaries(summaries: Sequence[str], budget: int = PROMPT_SUMMARY_TOKENS,
+                  item_budget: int = PROMPT_SUMMARY_ITEM_TOKENS) -> Tuple[List[str], int]:
+    """
+    최신 요약부터 채움 → (오래된 것 → 최신 순서의 요약 목록, 사용 토큰)
+
+    - 최신 요약: 남은 예산 전체까지 사용 가능
+    - 그 이전 요약: item_budget 까지만 (앞부분 유지로 압축)
+    - 예산이 부족하면 더 오래된 요약은 제외
+    """
+    picked: List[str] = []
+    used = 0
+    for i, detail in enumerate(reversed(summaries)):
+        remaining = budget - used
+        if remaining <= 0:
+            break
+        limit = remaining if i == 0 else min(remaining, item_budget)
+        text = truncate_tokens(detail, limit, keep="head")
+        if not text:
+            break
+        picked.append(text)
+        used += count_tokens(text)
+    picked.reverse()
+    return picked, used
+
+
+def fit_turns(turns: Sequence[Tuple[str, str]], budget: int = PROMPT_HISTORY_TOKENS) -> Tuple[List[str], int]:
+    """
+    최근 턴부터 채움 → (오래된 것 → 최신 순서의 "User/AI" 블록, 사용 토큰)
+
+    - 가장 최근 턴은 예산을 넘으면 잘라서라도 포함, 나머지는 통째로 들어갈 때만 포함
+    """
+    picked: List[str] = []
+    used = 0
+    for i, (u, a) in enumerate(reversed(turns)):
+        block = f"User: {u}\nAI: {a}"
+        tokens = count_tokens(block)
+        if used + tokens > budget:
+            if i == 0:
+                block = truncate_tokens(block, budget, keep="tail")
+                picked.append(block)
+                used += count_tokens(block)
+            break
+        picked.append(block)
+        used += tokens
+    picked.reverse()
+    return picked, used
+
+
+def build_sections(summaries: Sequence[str], turns: Sequence[Tuple[str, str]], user_text: str,
+                   rollup: Optional[str] = None) -> PromptSections:
+    rollup_text = truncate_tokens(rollup or "", PROMPT_ROLLUP_TOKENS, keep="head")
+    summary_items, summary_tokens = fit_summaries(summaries)
+    turn_blocks, history_tokens = fit_turns(turns)
+    user_text = truncate_tokens(user_text, PROMPT_USER_TOKENS, keep="tail")
+    return PromptSections(
+        rollup_text=rollup_text,
+        summary_text="\n".join(summary_items),
+        history_text="\n".join(turn_blocks),
+        user_text=user_text,
+        summaries_used=len(summary_items),
+        turns_used=len(turn_blocks),
+        tokens={
+            "rollup": count_tokens(rollup_text),
+            "summaries": summary_tokens,
+            "history": history_tokens,
+            "user": count_tokens(user_text),
+        },
+    )
+
+
+# ============================================================================
+# ✅ 요청별 프롬프트 토큰 기록
+# ============================================================================
+_TOKEN_BUCKETS = (100, 250, 500, 1000, 1500, 2000, 3000, 4000, 8000, 16000)
+
+
+def count_message_tokens(messages) -> int:
+    """메시지 content 토큰 + 메시지당 고정 오버헤드(약 4) + 응답 프라이밍(3)"""
+    return sum(count_tokens(m.content) + 4 for m in messages) + 3
+
+
+def record_prompt_tokens(tokens: Dict[str, int]) -> None:
+    for section, value in tokens.items():
+        registry.histogram(f"chat.prompt_tokens.{section}", buckets=_TOKEN_BUCKETS).observe(value)
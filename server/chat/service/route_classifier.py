@@ -0,0 +1,247 @@
+# server/chat/service/route_classifier.py - route_decision 앞단의 로컬 라우터 (규칙 + 경량 분류기)
+import math
+import os
+import re
+import threading
+from collections import Counter as WordCounter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from server.core.cache import TTLCache, MISSING
+from server.core.metrics import registry
+
+# ============================================================================
+# ✅ 설정
+# ============================================================================
+ROUTER_LOCAL_ENABLED = os.getenv("ROUTER_LOCAL_ENABLED", "true").lower() == "true"
+# 분류기는 "chat" 만 로컬에서 결정 (podcast 는 규칙 또는 LLM) → 잘못 보내도 비용이 작은 쪽
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.97"))
+ROUTER_CACHE_SIZE = int(os.getenv("ROUTER_CACHE_SIZE", "20000"))
+ROUTER_CACHE_TTL = float(os.getenv("ROUTER_CACHE_TTL", "86400"))
+ROUTER_MAX_VOCAB = int(os.getenv("ROUTER_MAX_VOCAB", "50000"))   # 사용자 입력으로 학습하는 어휘 상한
+
+ROUTES = ("podcast", "chat")
+
+# ============================================================================
+# ✅ 1단계: 요청 의도 규칙 (route_decision 프롬프트의 3가지 podcast 조건)
+#    "팟캐스트 만들어줘 / play a radio show" 처럼 명령·요청 형태만 podcast
+#    "I listened to a podcast yesterday" 같은 언급은 규칙에 걸리지 않음 → LLM
+# ============================================================================
+_REQUEST_PREFIX = (
+    r"^(?:(?:hey|ok|okay|so|now|then)[\s,]+)?"
+    r"(?:please\s+|(?:can|could|would|will)\s+you\s+(?:please\s+)?|let'?s\s+|"
+    r"i(?:\s+would|'?d)\s+like\s+you\s+to\s+|i\s+want\s+you\s+to\s+)?"
+)
+_PODCAST_THING = (
+    r"(?:podcast|radio\s+(?:show|program|programme)|audio\s+show|"
+    r"listening\s+(?:practice|activity|exercise|test|drill|session))s?"
+)
+_PODCAST_PATTERNS = [
+    # make a podcast about ... / can you play a short radio show / let's do a listening exercise
+    _REQUEST_PREFIX
+    + r"(?:make|create|generate|produce|play|start|record|give|do)\s+(?:me\s+|us\s+)?"
+    + r"(?:a|an|another|one|some|the|new)?\s*(?:[\w'-]+\s+){0,3}?" + _PODCAST_THING + r"\b",
+    # let's practice listening / can we practice my listening
+    r"^(?:let'?s|can\s+we|could\s+we|i\s+want\s+to|i'?d\s+like\s+to)\s+practice\s+(?:my\s+)?listening\b",
+    # 팟캐스트 만들어줘 / 라디오 틀어줘 / 듣기 연습 하자
+    r"(?:팟캐스트|라디오)\s*(?:를|좀|하나)?\s*(?:만들어|생성해|틀어|들려)\s*(?:줘|주세요|줄래|줄\s*수)",
+    r"(?:듣기|리스닝)\s*(?:연습|활동|훈련)\s*(?:을|좀)?\s*(?:하자|해\s*줘|시켜\s*줘|할래|하고\s*싶어)",
+]
+_PODCAST_RE = re.compile("|".join(_PODCAST_PATTERNS), re.IGNORECASE)
+
+# podcast 관련 단어가 들어 있는데 요청 규칙에 안 걸리면 로컬에서 결정하지 않음 (→ LLM)
+_PODCAST_HINT_RE = re.compile(
+    r"podcast|radio|listen|episode|audio|팟캐스트|라디오|듣기|리스닝|들려", re.IGNORECASE
+)
+
+# podcast 관련 단어 없는 짧은 입력 (인사, "yes", "I don't know" 등) 은 항상 chat
+_SHORT_CHAT_MAX_WORDS = 3
+
+# ============================================================================
+# ✅ 2단계: 나이브 베이즈 분류기 초기 학습 데이터 (LLM 판정 결과로 계속 보강됨)
+# ============================================================================
+_SEED_CORPUS = {
+    "podcast": [
+        "make a podcast about climate change",
+        "create a podcast on healthy eating",
+        "can you make a radio show about space travel",
+        "i want to practice listening",
+        "give me a listening activity about travel",
+        "let's do a listening exercise",
+        "play a radio show about football",
+        "generate an episode where two hosts discuss ai",
+        "i want to listen to a discussion about diet",
+        "make an audio show about history",
+        "create a talk show about movies for listening practice",
+        "can i hear a conversation between a host and a guest",
+    ],
+    "chat": [
+        "hi", "hello", "hey how are you", "good morning",
+        "yes", "no", "i don't know", "thank you", "okay",
+        "i had a great day today",
+        "what did you do yesterday",
+        "i like playing soccer with my friends",
+        "can you explain the present perfect tense",
+        "what is the difference between affect and effect",
+        "i am tired because i worked a lot",
+        "my favorite food is pizza",
+        "how do i improve my english speaking",
+        "tell me about yourself",
+        "i went to the park with my family",
+        "what should i eat for dinner",
+        "i started a diet recently",
+        "do you like music",
+        "why is the sky blue",
+        "i'm studying for an exam tomorrow",
+        "let's talk about movies",
+        "what do you think about ai",
+    ],
+}
+
+
+def normalize(text: str) -> str:
+    """캐시 키용 정규화: 소문자, 공백 정리, 끝 문장부호 제거"""
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.strip(" .!?~,")
+
+
+def _tokenize(text: str) -> List[str]:
+    words = re.findall(r"\w+", text.lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class NaiveBayesRouter:
+    """
+    단어 unigram + bigram 다항 나이브 베이즈 (라플라스 스무딩, 온라인 학습 가능)
+
+    ⚠️ 어휘는 max_vocab 까지만 늘어남 (이후 처음 보는 단어는 학습에서 제외)
+    """
+
+    def __init__(self, corpus: Dict[str, List[str]], max_vocab: int = ROUTER_MAX_VOCAB):
+        self._lock = threading.Lock()
+        self.max_vocab = max_vocab
+        self.doc_counts = {r: 0 for r in ROUTES}
+        self.word_counts = {r: WordCounter() for r in ROUTES}
+        self.total_words = {r: 0 for r in ROUTES}
+        self.vocab = set()
+        for route, texts in corpus.items():
+            for text in texts:
+                self.learn(text, route)
+
+    def learn(self, text: str, route: str) -> None:
+        tokens = _tokenize(text)
+        with self._lock:
+            self.doc_counts[route] += 1
+            for token in tokens:
+                if token not in self.vocab:
+                    if len(self.vocab) >= self.max_vocab:
+                        continue
+                    self.vocab.add(token)
+                self.word_counts[route][token] += 1
+                self.total_words[route] += 1
+
+    def predict(self, text: str):
+        """(route, 확률) 반환"""
+        tokens = _tokenize(text)
+        with self._lock:
+            total_docs = sum(self.doc_counts.values())
+            vocab_size = len(self.vocab) or 1
+            scores = {}
+            for route in ROUTES:
+                score = math.log(self.doc_counts[route] / total_docs)
+                denom = self.total_words[route] + vocab_size
+                for token in tokens:
+                    score += math.log((self.word_counts[route][token] + 1) / denom)
+                scores[route] = score
+
+        best = max(scores, key=scores.get)
+        # log-sum-exp 로 사후 확률 계산
+        top = scores[best]
+        norm = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / norm
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    confidence: float
+    source: str   # "cache" | "rule" | "model" | "llm"
+
+
+class LocalRouter:
+    """
+    캐시 → 규칙 → 분류기 순으로 판정하고, 로컬에서 확신할 수 없으면 None 반환 (→ LLM 호출)
+
+    - podcast 는 요청 규칙에 걸릴 때만 로컬 결정 (팟캐스트 생성 + TTS 는 비싸므로)
+    - 분류기는 podcast 관련 단어가 없는 입력에 대해 "chat" 만 결정
+    - LLM 판정 결과는 record_llm() 으로 캐시 + 분류기 학습에 반영
+    """
+
+    def __init__(self, threshold: float = ROUTER_CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self.model = NaiveBayesRouter(_SEED_CORPUS)
+        self.cache = TTLCache(maxsize=ROUTER_CACHE_SIZE, default_ttl=ROUTER_CACHE_TTL)
+        self._resolved = {
+            source: registry.counter(f"router.resolved.{source}")
+            for source in ("cache", "rule", "model", "llm")
+        }
+
+    def decide(self, text: str) -> Optional[RouteDecision]:
+        if not ROUTER_LOCAL_ENABLED:
+            return None
+
+        key = normalize(text)
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return self._resolve(RouteDecision(cached, 1.0, "cache"))
+
+        if _PODCAST_RE.search(key):
+            decision = RouteDecision("podcast", 1.0, "rule")
+            self.cache.set(key, decision.route)
+            return self._resolve(decision)
+
+        # podcast 를 언급만 한 입력 ("I listened to a podcast ...") 은 LLM 이 판단
+        if _PODCAST_HINT_RE.search(key):
+            return None
+
+        if len(key.split()) <= _SHORT_CHAT_MAX_WORDS:
+            decision = RouteDecision("chat", 1.0, "rule")
+            self.cache.set(key, decision.route)
+            return self._resolve(decision)
+
+        route, confidence = self.model.predict(key)
+        if route == "chat" and confidence >= self.threshold:
+            self.cache.set(key, route)
+            return self._resolve(RouteDecision(route, confidence, "model"))
+
+        return None
+
+    def record_llm(self, text: str, route: str) -> None:
+        """LLM 이 판정한 결과를 캐시하고 분류기에 학습"""
+        self._resolved["llm"].inc()
+        if not ROUTER_LOCAL_ENABLED:
+            return
+        key = normalize(text)
+        self.cache.set(key, route)
+        self.model.learn(key, route)
+
+    def _resolve(self, decision: RouteDecision) -> RouteDecision:
+        self._resolved[decision.source].inc()
+        return decision
+
+    def stats(self) -> dict:
+        resolved = {source: c.value for source, c in self._resolved.items()}
+        total = sum(resolved.values())
+        local = total - resolved["llm"]
+        return {
+            "enabled": ROUTER_LOCAL_ENABLED,
+            "threshold": self.threshold,
+            "resolved": resolved,
+            "local_rate": round(local / total, 4) if total else 0.0,
+            "vocab": len(self.model.vocab),
+            "cache": self.cache.stats(),
+        }
+
+
+# 모듈 전역 라우터 (동기/비동기 supervisor graph 공용)
+local_router = LocalRouter()
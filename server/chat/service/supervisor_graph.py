@@ -3,32 +3,25 @@ from typing import TypedDict, Optional
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
 from langchain_groq import ChatGroq
 
 import server.chat.service.groq_subgraph as groq_subgraph
 from server.chat.service.tts_service import generate_tts_audio
 from server.chat.service.chat_logic_service import handle_chat_flow  # ✅ DB/비즈니스 로직 분리
-
-from transformers import pipeline
-
-# CEFR 판별 모델 (로컬 캐시 자동 저장됨)
+from server.chat.service.route_classifier import local_router
+from server.chat.service.cefr_service import predict_cefr_level  # ✅ CEFR 판별 (배치 워커)
+from server.core.llm_gateway import get_llm  # ✅ 공유 LLM 클라이언트 (타임아웃 / 동시성 / 재시도)
 
 load_dotenv()
 
 # ▶️ 모델 분리 (요약/관심사/대응)
-cefr_classifier = pipeline(
-    "text-classification",
-    model="dksysd/cefr-classifier",
-    tokenizer="dksysd/cefr-classifier"
-)
-CHAT_GENERATE_LLM = ChatOpenAI(model="gpt-4o")
+CHAT_GENERATE_LLM = get_llm("gpt-4o", call_site="chat.generate")
 
-SUMMARY_LLM = ChatOpenAI(model="gpt-4o-mini")
-ANALYSIS_LLM = ChatOpenAI(model="gpt-4o-mini")
+SUMMARY_LLM = get_llm("gpt-4o-mini", call_site="chat.summary")
+ANALYSIS_LLM = get_llm("gpt-4o-mini", call_site="chat.analysis")
 
 # (기존) 라우팅/팟캐스트
-supervisor_llm = ChatOpenAI(model="gpt-4o")
+supervisor_llm = get_llm("gpt-4o", call_site="chat.route")
 podcast_app = groq_subgraph.build_podcast_graph()
 # 참고: 일반 챗용으로 Groq 모델을 쓰고 싶으면 handle_chat_flow 내부가 아닌 여기에서 교체하면 됨
 # chat_agent = ChatGroq(model="llama-3.3-70b-versatile")
@@ -50,10 +43,15 @@ class SupervisorState(TypedDict, total=False):
     history: str                # (옵션) 프롬프트용
     history_summary: str        # (옵션) 프롬프트용
     cefr_level : str
+    prompt_tokens: int          # 채팅 프롬프트 토큰 수 (prompt_builder 기준)
 
 
 def route_decision(state: SupervisorState) -> SupervisorState:
-    """podcast or chat 분기 결정"""
+    """podcast or chat 분기 결정 (로컬 라우터 확신도가 낮을 때만 LLM 호출)"""
+    decision = local_router.decide(state["user_input"])
+    if decision is not None:
+        return {**state, "route": decision.route}
+
     msg = [
         SystemMessage("""
             You are a routing assistant.
@@ -74,6 +72,7 @@ def route_decision(state: SupervisorState) -> SupervisorState:
     ]
     route_raw = supervisor_llm.invoke(msg).content.strip().lower()
     route = "podcast" if "podcast" in route_raw else "chat"
+    local_router.record_llm(state["user_input"], route)
     return {**state, "route": route}
 
 
@@ -90,20 +89,6 @@ def run_podcast(state: SupervisorState) -> SupervisorState:
     return {**state, "output": script, "audio_base64": audio, "route": "podcast"}
 
 
-def predict_cefr_level(user_input: str) -> str:
-    """
-    HuggingFace CEFR 분류 모델로 문장의 CEFR 레벨을 예측한다.
-    return 예: "A2", "B1", "C1" 등
-    """
-    try:
-        result = cefr_classifier(user_input)
-        label = result[0]["label"]
-        return label  # "A1" ~ "C2"
-    except Exception as e:
-        print("CEFR 분석 오류:", e)
-        return "UNKNOWN"
-
-
 def run_chat(state: SupervisorState) -> SupervisorState:
     """
     요구사항 수행 흐름 + CEFR 레벨 분석 추가
@@ -1,38 +1,42 @@
 # server/chat/service/supervisor_graph_async.py - 비동기 Supervisor Graph
-from typing import TypedDict, Optional
+from typing import Any, Dict, TypedDict, Optional
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
 from langchain_groq import ChatGroq
 import asyncio
+import os
+import time
 
 import server.chat.service.groq_subgraph as groq_subgraph
-from server.chat.service.tts_service import generate_tts_audio
-from server.chat.service.chat_logic_service_async import handle_chat_flow_async
+from server.chat.service.tts_service import generate_tts_audio_async
+from server.chat.service.audio_assembly import TTS_AUDIO_MIME
+from server.chat.service.chat_logic_service_async import (
+    handle_chat_flow_async, stream_chat_flow_async, load_conversation_async,
+    ChatDraft, draft_chat_reply_async, commit_chat_draft_async,
+)
+from server.chat.service.prompt_builder import count_tokens
+from server.chat.service.route_classifier import local_router
+from server.chat.service.cefr_service import predict_cefr_level_async  # ✅ CEFR 판별 (배치 워커)
 from server.core.executor import run_in_threadpool
-
-from transformers import pipeline
+from server.core.metrics import registry
+from server.core.llm_gateway import get_llm
 
 load_dotenv()
 
+# 라우팅과 동시에 채팅 응답을 미리 생성 (대부분 "chat" 이므로 라우팅 LLM 왕복만큼 단축)
+# podcast 로 분기되면 미리 만든 응답은 버림 → 그만큼 토큰 낭비
+CHAT_SPECULATIVE = os.getenv("CHAT_SPECULATIVE", "false").lower() == "true"
+
 # ============================================================================
-# ✅ 모델 전역 로딩 (서버 시작 시 한 번만)
+# ✅ 모델 전역 로딩 (서버 시작 시 한 번만, CEFR 분류기는 cefr_service 에서 로딩)
 # ============================================================================
-print("🔄 Loading CEFR classifier model...")
-cefr_classifier = pipeline(
-    "text-classification",
-    model="dksysd/cefr-classifier",
-    tokenizer="dksysd/cefr-classifier"
-)
-print("✅ CEFR classifier loaded")
-
 # LLM 모델 (비동기 사용 가능)
-CHAT_GENERATE_LLM = ChatOpenAI(model="gpt-4o")
-SUMMARY_LLM = ChatOpenAI(model="gpt-4o-mini")
-ANALYSIS_LLM = ChatOpenAI(model="gpt-4o-mini")
+CHAT_GENERATE_LLM = get_llm("gpt-4o", call_site="chat.generate")
+SUMMARY_LLM = get_llm("gpt-4o-mini", call_site="chat.summary")
+ANALYSIS_LLM = get_llm("gpt-4o-mini", call_site="chat.analysis")
 
-supervisor_llm = ChatOpenAI(model="gpt-4o")
+supervisor_llm = get_llm("gpt-4o", call_site="chat.route")
 podcast_app = groq_subgraph.build_podcast_graph()
 
 
@@ -48,13 +52,22 @@ class SupervisorState(TypedDict, total=False):
     history: str
     history_summary: str
     cefr_level: str
+    prompt_tokens: int              # 채팅 프롬프트 토큰 수 (prompt_builder 기준)
+    conversation: Any               # prepare 단계에서 미리 읽은 ConversationState (없으면 None)
+    draft: Any                      # speculative 모드에서 미리 생성한 ChatDraft (없으면 None)
+    timings: Dict[str, float]       # 단계별 소요 시간 (ms)
 
 
 # ============================================================================
 # ✅ 라우팅 결정 (비동기)
 # ============================================================================
 async def route_decision(state: SupervisorState) -> SupervisorState:
-    """podcast or chat 분기 결정 (비동기)"""
+    """podcast or chat 분기 결정 (비동기, 로컬 라우터 확신도가 낮을 때만 LLM 호출)"""
+    decision = local_router.decide(state["user_input"])
+    if decision is not None:
+        print(f"[ROUTE] ⚡ Local ({decision.source}, {decision.confidence:.2f}): {decision.route}")
+        return {**state, "route": decision.route}
+
     msg = [
         SystemMessage("""
             You are a routing assistant.
@@ -78,11 +91,159 @@ async def route_decision(state: SupervisorState) -> SupervisorState:
     response = await supervisor_llm.ainvoke(msg)
     route_raw = response.content.strip().lower()
     route = "podcast" if "podcast" in route_raw else "chat"
+    local_router.record_llm(state["user_input"], route)
 
     print(f"[ROUTE] 🔀 Decided: {route}")
     return {**state, "route": route}
 
 
+# ============================================================================
+# ✅ Fan-out: 라우팅 / CEFR 분류 / 대화 상태 로드를 동시에 실행
+# ============================================================================
+async def _timed(stage: str, coro, timings: Dict[str, float]):
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        timings[stage] = round(elapsed_ms, 1)
+        registry.histogram(f"chat.stage.{stage}_ms").observe(elapsed_ms)
+
+
+async def prepare(state: SupervisorState) -> SupervisorState:
+    """
+    서로 의존하지 않는 단계를 asyncio.gather 로 동시에 실행하고 join
+
+    - route: 로컬 라우터 → (필요하면) 라우팅 LLM
+    - cefr: CEFR 분류 (배치 워커)
+    - context_load: 최신 대화 상태 (캐시 → AsyncSession, 읽기 전용)
+
+    ✅ 임계 경로 = 세 단계 중 가장 긴 것 (이전: 세 단계의 합)
+    ⚠️ podcast 로 분기되면 CEFR / 대화 상태는 쓰이지 않음 (둘 다 읽기 전용이라 부작용 없음)
+    """
+    timings: Dict[str, float] = {}
+    user_input = state.get("user_input", "")
+
+    routed, cefr_level, conv = await _timed("fan_out", asyncio.gather(
+        _timed("route", route_decision(state), timings),
+        _timed("cefr", predict_cefr_level_async(user_input) if user_input else asyncio.sleep(0), timings),
+        _timed("context_load", load_conversation_async(
+            int(state.get("userId", 0)), bool(state.get("initialChat", False))
+        ), timings),
+    ), timings)
+
+    serial_ms = timings["route"] + timings["cefr"] + timings["context_load"]
+    print(
+        f"[FAN-OUT] ⏱ route={timings['route']}ms cefr={timings['cefr']}ms "
+        f"context_load={timings['context_load']}ms → wall={timings['fan_out']}ms (serial {serial_ms:.1f}ms)"
+    )
+
+    new_state = {**state, "route": routed["route"], "conversation": conv, "timings": timings}
+    if cefr_level is not None:
+        new_state["cefr_level"] = cefr_level
+    return new_state
+
+
+# ============================================================================
+# ✅ Speculative: 라우팅과 동시에 채팅 경로(CEFR + 대화 상태 → 응답 생성)를 실행
+# ============================================================================
+_spec_hits = registry.counter("chat.speculative.hits")
+_spec_misses = registry.counter("chat.speculative.misses")
+_spec_errors = registry.counter("chat.speculative.errors")
+_spec_wasted_prompt = registry.counter("chat.speculative.wasted_prompt_tokens")
+_spec_wasted_completion = registry.counter("chat.speculative.wasted_completion_tokens")
+
+
+async def _speculate_chat(state: SupervisorState, timings: Dict[str, float], draft: ChatDraft):
+    """CEFR / 대화 상태 fan-out → 응답 생성 (저장은 하지 않음)"""
+    user_input = state.get("user_input", "")
+    cefr_level, conv = await asyncio.gather(
+        _timed("cefr", predict_cefr_level_async(user_input) if user_input else asyncio.sleep(0), timings),
+        _timed("context_load", load_conversation_async(
+            int(state.get("userId", 0)), bool(state.get("initialChat", False))
+        ), timings),
+    )
+    draft.cefr_level = cefr_level
+    chat_state = {**state, "cefr_level": cefr_level} if cefr_level is not None else state
+    await _timed("chat_draft", draft_chat_reply_async(chat_state, conv, CHAT_GENERATE_LLM, draft), timings)
+    return cefr_level, conv
+
+
+async def _discard(task: asyncio.Future) -> None:
+    """speculative 작업 취소 후 끝날 때까지 대기 (pending task / 'exception never retrieved' 방지)"""
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+async def prepare_speculative(state: SupervisorState) -> SupervisorState:
+    """
+    prepare 의 speculative 버전 (CHAT_SPECULATIVE=true)
+
+    - chat: 미리 만든 응답을 그대로 사용 → run_chat 에서 저장만 (hit)
+    - podcast: 진행 중인 작업 취소, 응답은 버림 (miss, 낭비 토큰 집계)
+      draft 단계는 DB / 상태 캐시에 쓰지 않으므로 취소해도 정리할 것이 없음
+    - speculative 작업이 실패하면 기존 chat 경로로 다시 실행 (이미 끝난 CEFR 결과는 유지)
+    """
+    timings: Dict[str, float] = {}
+    draft = ChatDraft()
+    speculative = asyncio.ensure_future(_timed("speculative", _speculate_chat(state, timings, draft), timings))
+
+    try:
+        routed = await _timed("route", route_decision(state), timings)
+    except BaseException:
+        await _discard(speculative)
+        raise
+
+    if routed["route"] == "podcast":
+        await _discard(speculative)
+        _spec_misses.inc()
+        wasted_prompt = draft.prompt_tokens["total"] if draft.prompt_tokens else 0
+        wasted_completion = count_tokens(draft.text) if draft.text is not None else 0
+        _spec_wasted_prompt.inc(wasted_prompt)
+        _spec_wasted_completion.inc(wasted_completion)
+        print(f"[SPECULATIVE] ❌ miss (podcast) → discarded draft "
+              f"(prompt={wasted_prompt}, completion={wasted_completion} tokens)")
+        return {**state, "route": "podcast", "conversation": None, "draft": None, "timings": timings}
+
+    try:
+        cefr_level, conv = await speculative
+    except Exception as e:
+        _spec_errors.inc()
+        print(f"[SPECULATIVE] ⚠️ draft failed ({type(e).__name__}: {e}) → regular chat path")
+        new_state = {**state, "route": "chat", "conversation": None, "draft": None, "timings": timings}
+        cefr_level = draft.cefr_level
+        user_input = state.get("user_input", "")
+        if cefr_level is None and user_input:
+            # CEFR 단계 자체가 끝나지 않았으면 다시 분류 (예측 캐시가 있으면 바로 반환)
+            cefr_level = await _timed("cefr", predict_cefr_level_async(user_input), timings)
+        if cefr_level is not None:
+            new_state["cefr_level"] = cefr_level
+        return new_state
+
+    _spec_hits.inc()
+    print(f"[SPECULATIVE] ✅ hit → route={timings['route']}ms, draft ready at {timings['speculative']}ms")
+    new_state = {**state, "route": "chat", "conversation": conv, "draft": draft, "timings": timings}
+    if cefr_level is not None:
+        new_state["cefr_level"] = cefr_level
+    return new_state
+
+
+def speculation_stats() -> dict:
+    hits, misses = _spec_hits.value, _spec_misses.value
+    return {
+        "enabled": CHAT_SPECULATIVE,
+        "hits": hits,
+        "misses": misses,
+        "errors": _spec_errors.value,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        "wasted_prompt_tokens": _spec_wasted_prompt.value,
+        "wasted_completion_tokens": _spec_wasted_completion.value,
+    }
+
+
 # ============================================================================
 # ✅ 팟캐스트 실행 (동기 코드를 비동기로 래핑)
 # ============================================================================
@@ -101,32 +262,12 @@ async def run_podcast(state: SupervisorState) -> SupervisorState:
     )
     script = res.get("history", "")
 
-    # TTS는 동기이므로 thread pool에서 실행
-    audio = await run_in_threadpool(generate_tts_audio, script)
+    # TTS: 줄 단위 병렬 합성 (AsyncGroq)
+    audio = await generate_tts_audio_async(script)
 
     return {**state, "output": script, "audio_base64": audio, "route": "podcast"}
 
 
-# ============================================================================
-# ✅ CEFR 레벨 예측 (CPU 집약적, thread pool에서 실행)
-# ============================================================================
-async def predict_cefr_level_async(user_input: str) -> str:
-    """
-    HuggingFace CEFR 분류 모델로 문장의 CEFR 레벨을 예측 (비동기)
-
-    ✅ CPU 집약적 작업이므로 thread pool에서 실행
-    """
-    try:
-        # ✅ transformers.pipeline은 CPU 집약적이므로 thread pool에서 실행
-        result = await run_in_threadpool(cefr_classifier, user_input)
-        label = result[0]["label"]
-        print(f"[CEFR] 📊 Predicted: {label}")
-        return label  # "A1" ~ "C2"
-    except Exception as e:
-        print(f"[CEFR] ❌ Error: {e}")
-        return "UNKNOWN"
-
-
 # ============================================================================
 # ✅ 채팅 실행 (완전 비동기)
 # ============================================================================
@@ -134,34 +275,71 @@ async def run_chat(state: SupervisorState) -> SupervisorState:
     """
     채팅 플로우 (완전 비동기)
 
-    ✅ 최적화 포인트:
-    - CEFR 분류: Thread pool에서 실행
+    ✅ CEFR 레벨 / 대화 상태는 prepare 단계에서 이미 준비됨
+    ✅ speculative 모드에서 응답이 이미 생성되어 있으면 저장만
     - DB 쿼리: AsyncSession 사용
     - LLM 호출: ainvoke() 사용
     """
-    user_input = state.get("user_input", "")
-
-    # ✅ 1단계: CEFR 레벨 예측 (비동기)
-    if user_input:
-        cefr_level = await predict_cefr_level_async(user_input)
-        state["cefr_level"] = cefr_level
-
-    # ✅ 2단계: 채팅 플로우 실행 (비동기)
-    result = await handle_chat_flow_async(
-        state=state,
-        chat_llm=CHAT_GENERATE_LLM,
-        summary_llm=SUMMARY_LLM,
-        analysis_llm=ANALYSIS_LLM
-    )
+    timings = dict(state.get("timings") or {})
+    draft = state.get("draft")
+    if draft is not None:
+        result = await _timed("chat_commit", commit_chat_draft_async(
+            state, draft, summary_llm=SUMMARY_LLM, analysis_llm=ANALYSIS_LLM,
+        ), timings)
+    else:
+        result = await _timed("chat", handle_chat_flow_async(
+            state=state,
+            chat_llm=CHAT_GENERATE_LLM,
+            summary_llm=SUMMARY_LLM,
+            analysis_llm=ANALYSIS_LLM,
+            conv=state.get("conversation"),
+        ), timings)
 
     return {
         **state,
         **result,
         "route": "chat",
-        "cefr_level": state.get("cefr_level")
+        "cefr_level": state.get("cefr_level"),
+        "timings": timings,
     }
 
 
+# ============================================================================
+# ✅ 스트리밍 실행 (/api/chat/stream)
+# ============================================================================
+async def stream_supervisor(state: SupervisorState):
+    """
+    그래프와 같은 순서(라우팅 → podcast/chat)로 실행하되 (event, data) 를 yield
+
+    - chat: meta → token ... → done
+    - podcast: 스크립트/오디오가 한 번에 만들어지므로 done 이벤트 하나
+    ⚠️ speculative 모드는 적용하지 않음 (토큰을 미리 받아두면 스트리밍 의미가 없음)
+    """
+    state = await prepare(state)
+
+    if state["route"] == "podcast":
+        result = await run_podcast(state)
+        yield "done", {
+            "response": result.get("output"),
+            "audio": result.get("audio_base64"),
+            "audio_mime": TTS_AUDIO_MIME,
+            "chatNum": result.get("chatNum"),
+            "chatOrder": result.get("chatOrder"),
+            "cefr_level": result.get("cefr_level"),
+            "prompt_tokens": None,
+        }
+        return
+
+    async for event in stream_chat_flow_async(
+        state=state,
+        chat_llm=CHAT_GENERATE_LLM,
+        summary_llm=SUMMARY_LLM,
+        analysis_llm=ANALYSIS_LLM,
+        conv=state.get("conversation"),
+    ):
+        yield event
+
+
 # ============================================================================
 # ✅ Supervisor Graph 빌드
 # ============================================================================
@@ -173,12 +351,13 @@ def build_supervisor_graph():
        각 노드 함수를 async def로 정의해야 비동기로 실행됨
     """
     g = StateGraph(SupervisorState)
-    g.add_node("route_decision", route_decision)
+    # route / CEFR / 대화 상태 fan-out → join (speculative 모드면 채팅 응답 생성까지 동시에)
+    g.add_node("prepare", prepare_speculative if CHAT_SPECULATIVE else prepare)
     g.add_node("podcast", run_podcast)
     g.add_node("chat", run_chat)
 
-    g.set_entry_point("route_decision")
-    g.add_conditional_edges("route_decision", lambda s: s["route"], {
+    g.set_entry_point("prepare")
+    g.add_conditional_edges("prepare", lambda s: s["route"], {
         "podcast": "podcast",
         "chat": "chat"
     })
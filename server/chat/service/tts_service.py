@@ -1,59 +1,194 @@
 # app/chat/service/tts_service.py
+import asyncio
 import os
-from groq import Groq
-from pydub import AudioSegment
-from io import BytesIO
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+from groq import AsyncGroq, Groq
 import base64
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
+from server.chat.service.audio_assembly import TTS_AUDIO_FORMAT, assemble_wavs
+from server.core.executor import run_in_threadpool
+from server.core.llm_gateway import is_retryable
+from server.core.metrics import registry
+
+# ============================================================================
+# ✅ 설정 (줄 단위 병렬 합성)
+# ============================================================================
+TTS_MODEL = os.getenv("TTS_MODEL", "playai-tts")
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))          # 동시에 합성하는 줄 수
+TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", "2"))          # 줄마다 따로 재시도
+TTS_RETRY_BACKOFF = float(os.getenv("TTS_RETRY_BACKOFF", "0.5"))  # 초, 이후 2배씩 + jitter
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", "30"))               # 줄 1회 요청 타임아웃 (초)
+
+# SDK 자체 재시도는 끄고 줄 단위 재시도로 통일
+client = Groq(api_key=os.environ["GROQ_API_KEY"], timeout=TTS_TIMEOUT, max_retries=0)
+async_client = AsyncGroq(api_key=os.environ["GROQ_API_KEY"], timeout=TTS_TIMEOUT, max_retries=0)
 
 voice_map = {
     "Host": "Fritz-PlayAI",   # 낮고 차분한 남성
     "Guest": "Mason-PlayAI",  # 밝고 친근한 여성
 }
 
-def generate_tts_audio(script: str) -> str:
-    """
-    Host/Guest 구분하여 Groq TTS로 오디오 합성 후 base64로 반환
-    """
+_line_ms = registry.histogram("tts.line_ms")
+_total_ms = registry.histogram("tts.synthesis_ms")
+_assemble_ms = registry.histogram("tts.assemble_ms")
+_retries = registry.counter("tts.line_retries")
+_failures = registry.counter("tts.line_failures")
+
+
+@dataclass
+class TtsLine:
+    index: int                       # 스크립트 안에서의 순서 (합칠 때 이 순서 유지)
+    speaker: str
+    text: str
+    voice: str
+    audio: Optional[bytes] = None    # wav
+    latency_ms: float = 0.0          # 성공한 요청 1회의 소요 시간
+    attempts: int = 0
+
+
+def parse_script(script: str) -> List[TtsLine]:
+    """ "Speaker: text" 줄만 추출 (순서 유지) """
     if not script.strip():
         raise ValueError("⚠️ Empty script. Nothing to synthesize.")
 
-    lines = [line.strip() for line in script.split("\n") if line.strip()]
-    segments = []
-
-    for i, line in enumerate(lines):
+    lines = []
+    for line in (line.strip() for line in script.split("\n")):
         if ":" not in line:
             continue
-
         speaker, text = line.split(":", 1)
         speaker = speaker.strip()
-        text = text.strip()
-        voice = voice_map.get(speaker, "Fritz-PlayAI")
+        lines.append(TtsLine(len(lines), speaker, text.strip(), voice_map.get(speaker, "Fritz-PlayAI")))
 
-        print(f"[TTS] {speaker}: {text[:40]}... → {voice}")
+    if not lines:
+        raise ValueError("⚠️ No valid lines for TTS conversion")
+    return lines
 
-        response = client.audio.speech.create(
-            model="playai-tts",
-            voice=voice,
-            input=text,
-            response_format="wav"
-        )
 
-        seg = AudioSegment.from_file(BytesIO(response.read()), format="wav")
-        segments.append(seg + AudioSegment.silent(duration=250))
+def _retry_delay(line: TtsLine, e: Exception) -> Optional[float]:
+    """재시도하면 대기 시간, 아니면 None"""
+    if not is_retryable(e) or line.attempts > TTS_MAX_RETRIES:
+        _failures.inc()
+        print(f"❌ [TTS] #{line.index} {line.speaker} failed after {line.attempts} attempts: {type(e).__name__} {e}")
+        return None
+    _retries.inc()
+    delay = TTS_RETRY_BACKOFF * (2 ** (line.attempts - 1)) * random.uniform(0.5, 1.5)
+    print(f"⚠️ [TTS] #{line.index} {line.speaker} attempt {line.attempts} failed ({type(e).__name__} {e}) "
+          f"→ retry in {delay:.1f}s")
+    return delay
+
+
+def _record_line(line: TtsLine, start: float) -> None:
+    line.latency_ms = (time.perf_counter() - start) * 1000
+    _line_ms.observe(line.latency_ms)
+    print(f"[TTS] #{line.index} {line.speaker} ({line.voice}) {line.latency_ms:.0f}ms "
+          f"attempts={line.attempts}: {line.text[:40]}...")
+
+
+def _synthesize_line(line: TtsLine) -> TtsLine:
+    while True:
+        line.attempts += 1
+        start = time.perf_counter()
+        try:
+            response = client.audio.speech.create(
+                model=TTS_MODEL,
+                voice=line.voice,
+                input=line.text,
+                response_format="wav"
+            )
+            line.audio = response.read()
+        except Exception as e:
+            delay = _retry_delay(line, e)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        _record_line(line, start)
+        return line
 
-    if not segments:
-        raise ValueError("⚠️ No valid lines for TTS conversion")
 
-    final_audio = AudioSegment.silent(duration=500)
-    for seg in segments:
-        final_audio += seg
+async def _synthesize_line_async(line: TtsLine, semaphore: asyncio.Semaphore) -> TtsLine:
+    while True:
+        line.attempts += 1
+        # 재시도 대기 중에는 슬롯을 다른 줄에 양보
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await async_client.audio.speech.create(
+                    model=TTS_MODEL,
+                    voice=line.voice,
+                    input=line.text,
+                    response_format="wav"
+                )
+                line.audio = await response.read()
+            except Exception as e:
+                delay = _retry_delay(line, e)
+                if delay is None:
+                    raise
+            else:
+                _record_line(line, start)
+                return line
+        await asyncio.sleep(delay)
 
-    # mp3를 메모리에 바로 저장
-    buffer = BytesIO()
-    final_audio.export(buffer, format="mp3")
 
-    audio_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
+def _assemble(lines: List[TtsLine]) -> str:
+    """스크립트 순서대로 이어 붙여 TTS_AUDIO_FORMAT(기본 mp3) base64 로 반환"""
+    start = time.perf_counter()
+    audio = assemble_wavs([line.audio for line in sorted(lines, key=lambda l: l.index)])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    _assemble_ms.observe(elapsed_ms)
+    print(f"[TTS] 🎚 assembled {len(lines)} lines → {TTS_AUDIO_FORMAT} {len(audio) // 1024}KB in {elapsed_ms:.0f}ms")
+    return base64.b64encode(audio).decode("utf-8")
+
+
+def _report(lines: List[TtsLine], start: float) -> None:
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    _total_ms.observe(elapsed_ms)
+    serial_ms = sum(line.latency_ms for line in lines)
+    print(f"[TTS] ⏱ {len(lines)} lines in {elapsed_ms:.0f}ms (sum of lines {serial_ms:.0f}ms, "
+          f"concurrency {TTS_CONCURRENCY})")
+
+
+def generate_tts_audio(script: str) -> str:
+    """
+    Host/Guest 구분하여 Groq TTS로 오디오 합성 후 base64로 반환
+
+    ✅ 줄 단위로 최대 TTS_CONCURRENCY 개 동시 합성 (thread pool), 합칠 때는 스크립트 순서 유지
+    ✅ 실패한 줄만 따로 재시도, 재시도 후에도 실패하면 예외
+    """
+    lines = parse_script(script)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, TTS_CONCURRENCY), thread_name_prefix="tts") as pool:
+        list(pool.map(_synthesize_line, lines))
+    _report(lines, start)
+
+    audio_base64 = _assemble(lines)
+    print("✅ Generated podcast audio (base64, not file)")
+    return audio_base64
+
+
+async def generate_tts_audio_async(script: str) -> str:
+    """
+    generate_tts_audio 의 비동기 버전 (AsyncGroq + Semaphore)
+
+    ⚠️ 한 줄이라도 최종 실패하면 나머지 진행 중인 요청은 취소
+    """
+    lines = parse_script(script)
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, TTS_CONCURRENCY))
+    tasks = [asyncio.ensure_future(_synthesize_line_async(line, semaphore)) for line in lines]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    _report(lines, start)
+
+    # 디코딩 / mp3 인코딩은 CPU 작업 → event loop 밖에서
+    audio_base64 = await run_in_threadpool(_assemble, lines)
     print("✅ Generated podcast audio (base64, not file)")
     return audio_base64
@@ -0,0 +1,216 @@
+# server/core/background_jobs.py - 요청 경로 밖에서 실행하는 in-process 비동기 작업 큐
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+from server.core.metrics import registry
+
+
+@dataclass
+class Job:
+    key: Hashable                      # 같은 key 의 작업은 제출 순서대로 하나씩 실행
+    job_id: Hashable                   # 대기/실행 중인 같은 job_id 는 중복 제출 무시
+    fn: Callable[[], Awaitable[Any]]   # 재시도마다 새 coroutine 을 만들 수 있도록 factory
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    attempts: int = 0
+
+
+class BackgroundJobQueue:
+    """
+    asyncio 워커 풀 기반 백그라운드 작업 큐
+
+    - key 별 순서 보장: 같은 key 는 한 번에 하나만 실행, 제출 순서대로
+      (서로 다른 key 는 최대 workers 개까지 동시에 실행)
+    - job_id 중복 제거: 이미 대기/실행 중인 job_id 는 다시 넣지 않음
+    - 실패 시 지수 백오프(+jitter) 재시도, max_retries 초과 시 버리고 카운트
+    - submit() 은 thread-safe (동기 LangGraph 노드/threadpool 에서 호출 가능)
+    - stop() 은 대기 중인 작업을 모두 처리한 뒤 종료 (서버 shutdown 훅에서 호출)
+    """
+
+    def __init__(self, name: str, workers: int = 4, max_retries: int = 3,
+                 retry_backoff: float = 1.0, max_pending: int = 10000):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[Hashable, Deque[Job]] = {}     # key → 대기 중인 작업들
+        self._active: Set[Hashable] = set()              # 실행 중이거나 ready 큐에 있는 key
+        self._ids: Set[Hashable] = set()                 # 대기 + 실행 중 job_id
+        self._pending = 0
+        self._running_jobs = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        prefix = f"jobs.{name}"
+        self._lag_ms = registry.histogram(f"{prefix}.lag_ms")
+        self._run_ms = registry.histogram(f"{prefix}.run_ms")
+        self._submitted = registry.counter(f"{prefix}.submitted")
+        self._deduped = registry.counter(f"{prefix}.deduped")
+        self._rejected = registry.counter(f"{prefix}.rejected")
+        self._completed = registry.counter(f"{prefix}.completed")
+        self._retries = registry.counter(f"{prefix}.retries")
+        self._failed = registry.counter(f"{prefix}.failed")
+        registry.gauge(f"{prefix}.pending", self.pending)
+        registry.gauge(f"{prefix}.running", lambda: self._running_jobs)
+
+    # --------------------------------------------------
+    # 상태
+    # --------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    def pending(self) -> int:
+        return self._pending
+
+    # --------------------------------------------------
+    # 작업 제출 (thread-safe)
+    # --------------------------------------------------
+    def submit(self, key: Hashable, job_id: Hashable, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        작업 제출. 큐에 들어갔으면 True
+
+        ⚠️ 워커가 실행 중이 아니거나 큐가 가득 차면 False → 호출 측에서 직접 실행
+           (중복이라 무시된 경우는 True: 같은 작업이 이미 예정되어 있음)
+        """
+        if not self.running:
+            return False
+
+        with self._lock:
+            if job_id in self._ids:
+                self._deduped.inc()
+                return True
+            if self._pending >= self.max_pending:
+                self._rejected.inc()
+                return False
+
+            self._ids.add(job_id)
+            self._jobs.setdefault(key, deque()).append(Job(key, job_id, fn))
+            self._pending += 1
+            schedule = key not in self._active
+            if schedule:
+                self._active.add(key)
+        self._submitted.inc()
+
+        if schedule:
+            self._schedule(key)
+        return True
+
+    def _schedule(self, key: Hashable) -> None:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._ready.put_nowait(key)
+        else:
+            self._loop.call_soon_threadsafe(self._ready.put_nowait, key)
+
+    # --------------------------------------------------
+    # 라이프사이클
+    # --------------------------------------------------
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"jobs-{self.name}-{i}")
+            for i in range(self.workers)
+        ]
+        print(f"✅ Background jobs '{self.name}' started ({self.workers} workers)")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """대기 중인 작업을 처리한 뒤 워커 종료 (timeout 초과 시 남은 작업은 버림)"""
+        deadline = time.perf_counter() + timeout
+        while (self._pending or self._running_jobs) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        if self._pending:
+            print(f"⚠️ Background jobs '{self.name}' stopped with {self._pending} pending jobs")
+
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        print(f"✅ Background jobs '{self.name}' stopped")
+
+    # --------------------------------------------------
+    # 워커
+    # --------------------------------------------------
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            with self._lock:
+                job = self._jobs[key].popleft()
+                self._pending -= 1
+                self._running_jobs += 1
+
+            try:
+                await self._run(job)
+            finally:
+                with self._lock:
+                    self._running_jobs -= 1
+                    self._ids.discard(job.job_id)
+                    if self._jobs[key]:
+                        reschedule = True
+                    else:
+                        del self._jobs[key]
+                        self._active.discard(key)
+                        reschedule = False
+                if reschedule:
+                    self._ready.put_nowait(key)
+
+    async def _run(self, job: Job) -> None:
+        """한 작업 실행 (같은 key 의 다음 작업은 재시도까지 끝난 뒤 실행됨)"""
+        self._lag_ms.observe((time.perf_counter() - job.enqueued_at) * 1000)
+        while True:
+            job.attempts += 1
+            start = time.perf_counter()
+            try:
+                await job.fn()
+            except Exception as e:
+                if job.attempts > self.max_retries:
+                    self._failed.inc()
+                    print(f"❌ [Jobs:{self.name}] {job.job_id} failed after {job.attempts} attempts: "
+                          f"{type(e).__name__} {e}")
+                    return
+                self._retries.inc()
+                delay = self.retry_backoff * (2 ** (job.attempts - 1)) * random.uniform(0.5, 1.5)
+                print(f"⚠️ [Jobs:{self.name}] {job.job_id} attempt {job.attempts} failed "
+                      f"({type(e).__name__} {e}) → retry in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self._run_ms.observe((time.perf_counter() - start) * 1000)
+            self._completed.inc()
+            return
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "pending": self._pending,
+            "running_jobs": self._running_jobs,
+            "active_keys": len(self._active),
+            "submitted": self._submitted.value,
+            "deduped": self._deduped.value,
+            "rejected": self._rejected.value,
+            "completed": self._completed.value,
+            "retries": self._retries.value,
+            "failed": self._failed.value,
+            "lag_ms": self._lag_ms.snapshot(),
+            "run_ms": self._run_ms.snapshot(),
+        }
@@ -0,0 +1,143 @@
+# server/core/cache.py - 프로세스 내 TTL + LRU 캐시
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# ============================================================================
+# ✅ 캐시 미스 표식 (None 도 정상 값으로 저장할 수 있도록 별도 객체 사용)
+# ============================================================================
+MISSING = object()
+
+# OrderedDict 노드 + (expires_at, value) 튜플 + float 대략치
+_ENTRY_OVERHEAD = 160
+
+
+def approx_sizeof(key: Hashable, value: Any) -> int:
+    """max_bytes 계산용 기본 크기 추정 (컨테이너 내부까지 재귀하지 않음)"""
+    return sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD
+
+
+class TTLCache:
+    """
+    만료 시각(epoch 초)과 최대 개수를 갖는 thread-safe LRU 캐시
+
+    - 항목마다 만료 시각을 따로 지정할 수 있음 (예: JWT exp)
+    - maxsize 초과 시 가장 오래 사용되지 않은 항목부터 제거
+    - max_bytes 지정 시 sizeof(key, value) 합계가 넘지 않도록 같은 방식으로 제거
+    - refresh_on_get=True 면 hit 할 때마다 만료 시각을 default_ttl 만큼 연장 (사용 중인 항목은 유지)
+    - hit / miss / eviction 카운터 제공
+
+    ⚠️ 동기 의존성(FastAPI threadpool)과 event loop 양쪽에서 호출되므로
+       asyncio.Lock 이 아니라 threading.Lock 을 사용
+    """
+
+    def __init__(self, maxsize: int = 1024, default_ttl: float = 300.0,
+                 max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Hashable, Any], int] = approx_sizeof,
+                 refresh_on_get: bool = False):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self.refresh_on_get = refresh_on_get
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._sizes: dict = {}
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """값 반환 (없거나 만료되었으면 default)"""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            if self.refresh_on_get:
+                self._data[key] = (now + self.default_ttl, value)
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            expires_at: Optional[float] = None) -> None:
+        """
+        값 저장
+
+        Args:
+            ttl: 지금부터 유지할 초 (없으면 default_ttl)
+            expires_at: 절대 만료 시각(epoch 초). ttl 보다 우선
+        """
+        if expires_at is None:
+            expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (expires_at, value)
+            if self.max_bytes is not None:
+                size = self.sizeof(key, value)
+                self._sizes[key] = size
+                self.bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self.bytes > self.max_bytes and self._data
+            ):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> bool:
+        """lock 잡은 상태에서 호출"""
+        if self._data.pop(key, MISSING) is MISSING:
+            return False
+        self.bytes -= self._sizes.pop(key, 0)
+        return True
+
+    def invalidate(self, key: Hashable) -> bool:
+        """항목 제거. 존재했으면 True"""
+        with self._lock:
+            return self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """predicate(key, value) 가 참인 항목 모두 제거. 제거 개수 반환"""
+        with self._lock:
+            keys = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """모니터링용 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+            if self.max_bytes is not None:
+                stats["bytes"] = self.bytes
+                stats["max_bytes"] = self.max_bytes
+            return stats
@@ -5,7 +5,7 @@ from typing import Callable, Any
 from functools import partial
 
 # ============================================================================
-# ✅ CPU 바운드 작업용 Thread Pool (OCR, CEFR 분류 등)
+# ✅ CPU 바운드 작업용 Thread Pool (OCR 등, CEFR 분류는 cefr_service 전용 워커)
 # ============================================================================
 # ThreadPoolExecutor: GIL이 있지만 I/O 대기가 있는 작업에 적합
 # ProcessPoolExecutor: GIL 우회, 순수 CPU 작업에 적합 (pickle 가능한 객체만)
@@ -0,0 +1,177 @@
+# server/core/llm_callbacks.py - LLM 호출별 지연 / TTFT / 토큰 / 비용 계측 (LangChain callback)
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from server.core.metrics import registry
+
+# ============================================================================
+# ✅ 모델별 단가 (USD / 1M tokens, input·output) - LLM_PRICES 로 덮어쓰기 가능
+#    예: LLM_PRICES='{"gpt-4o": [2.5, 10.0]}'
+# ============================================================================
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+LLM_PRICES: Dict[str, Tuple[float, float]] = {
+    **DEFAULT_PRICES,
+    **{k: tuple(v) for k, v in json.loads(os.getenv("LLM_PRICES", "{}")).items()},
+}
+
+_TOKEN_BUCKETS = (10, 50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+_COST_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+
+UNKNOWN_SITE = "unknown"
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """단가표에 없는 모델 (로컬 Ollama 등) 은 0"""
+    price_in, price_out = LLM_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+def _usage(response) -> Optional[Tuple[int, int]]:
+    """LLMResult → (prompt_tokens, completion_tokens), 응답에 사용량이 없으면 None"""
+    for generations in response.generations or []:
+        for gen in generations:
+            usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    token_usage = (response.llm_output or {}).get("token_usage")
+    if token_usage:
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+    return None
+
+
+@dataclass
+class _Run:
+    site: str
+    model: str
+    started: float
+    first_token: Optional[float] = None
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """
+    chat model 호출 1건마다 call site / 모델 기준으로 기록
+
+    - latency_ms: 모델 시작 → 종료 (게이트웨이 슬롯 대기는 llm.<provider>.queue_ms 로 따로)
+    - ttft_ms: 첫 토큰까지 (스트리밍 호출만)
+    - prompt_tokens / completion_tokens / cost_usd: 응답의 usage 기준
+    - call site 와 모델은 게이트웨이가 metadata 로 넣어줌 (call_site / llm_model)
+    """
+
+    run_inline = True   # 기록만 하므로 비동기 호출에서도 executor 로 넘기지 않음
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[UUID, _Run] = {}
+        self._sites: Dict[Tuple[str, str], dict] = {}
+
+    # --------------------------------------------------
+    # 메트릭 (site, model) 단위
+    # --------------------------------------------------
+    def _metrics(self, site: str, model: str) -> dict:
+        key = (site, model)
+        metrics = self._sites.get(key)
+        if metrics is None:
+            prefix = f"llm_calls.{site}.{model}"
+            metrics = {
+                "calls": registry.counter(f"{prefix}.calls"),
+                "errors": registry.counter(f"{prefix}.errors"),
+                "cancelled": registry.counter(f"{prefix}.cancelled"),
+                "usage_missing": registry.counter(f"{prefix}.usage_missing"),
+                "cost_usd_total": registry.counter(f"{prefix}.cost_usd_total"),
+                "latency_ms": registry.histogram(f"{prefix}.latency_ms"),
+                "ttft_ms": registry.histogram(f"{prefix}.ttft_ms"),
+                "prompt_tokens": registry.histogram(f"{prefix}.prompt_tokens", buckets=_TOKEN_BUCKETS),
+                "completion_tokens": registry.histogram(f"{prefix}.completion_tokens", buckets=_TOKEN_BUCKETS),
+                "cost_usd": registry.histogram(f"{prefix}.cost_usd", buckets=_COST_BUCKETS),
+            }
+            with self._lock:
+                metrics = self._sites.setdefault(key, metrics)
+        return metrics
+
+    # --------------------------------------------------
+    # callback
+    # --------------------------------------------------
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[dict] = None,
+                            **kwargs: Any) -> None:
+        metadata = metadata or {}
+        model = metadata.get("llm_model") or metadata.get("ls_model_name") or "unknown"
+        run = _Run(metadata.get("call_site", UNKNOWN_SITE), model, time.perf_counter())
+        with self._lock:
+            self._runs[run_id] = run
+
+    def on_llm_new_token(self, token, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and run.first_token is None:
+            run.first_token = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        metrics = self._metrics(run.site, run.model)
+        metrics["calls"].inc()
+        metrics["latency_ms"].observe((time.perf_counter() - run.started) * 1000)
+        if run.first_token is not None:
+            metrics["ttft_ms"].observe((run.first_token - run.started) * 1000)
+
+        usage = _usage(response)
+        if usage is None:
+            metrics["usage_missing"].inc()
+            return
+        prompt_tokens, completion_tokens = usage
+        cost = estimate_cost(run.model, prompt_tokens, completion_tokens)
+        metrics["prompt_tokens"].observe(prompt_tokens)
+        metrics["completion_tokens"].observe(completion_tokens)
+        metrics["cost_usd"].observe(cost)
+        metrics["cost_usd_total"].inc(cost)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        metrics = self._metrics(run.site, run.model)
+        # hedging 에서 진 요청 / 클라이언트 연결 끊김은 오류와 따로 집계
+        metrics["errors" if isinstance(error, Exception) else "cancelled"].inc()
+
+    # --------------------------------------------------
+    # 조회 (/metrics)
+    # --------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            items = sorted(self._sites.items())
+            in_flight = len(self._runs)
+        sites: Dict[str, dict] = {}
+        for (site, model), m in items:
+            latency = m["latency_ms"].snapshot()
+            ttft = m["ttft_ms"].snapshot()
+            sites.setdefault(site, {})[model] = {
+                "calls": m["calls"].value,
+                "errors": m["errors"].value,
+                "cancelled": m["cancelled"].value,
+                "latency_ms": {k: latency.get(k) for k in ("count", "avg", "p50", "p95", "p99", "max")},
+                "ttft_ms": {k: ttft.get(k) for k in ("count", "avg", "p50", "p95")},
+                "prompt_tokens": m["prompt_tokens"].snapshot().get("sum", 0),
+                "completion_tokens": m["completion_tokens"].snapshot().get("sum", 0),
+                "usage_missing": m["usage_missing"].value,
+                "cost_usd": round(m["cost_usd_total"].value, 6),
+            }
+        return {
+            "in_flight": in_flight,
+            "total_cost_usd": round(sum(m["cost_usd_total"].value for _, m in items), 6),
+            "sites": sites,
+        }
+
+
+llm_usage = LLMUsageCallback()
@@ -0,0 +1,614 @@
+# server/core/llm_gateway.py - LLM 호출 공용 게이트웨이 (클라이언트 풀 / 타임아웃 / 동시성 제한 / 재시도 / hedging / circuit breaker)
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from server.core.llm_callbacks import UNKNOWN_SITE, llm_usage
+from server.core.metrics import registry
+
+# ============================================================================
+# ✅ 설정
+# ============================================================================
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))                  # 요청 1회 타임아웃 (초)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "120"))               # 재시도 포함 전체 기한 (초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))     # 첫 재시도 대기 (초), 이후 2배씩 + jitter
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))      # 동시성 슬롯 대기 상한 (초)
+LLM_HEDGE_AFTER_MS = float(os.getenv("LLM_HEDGE_AFTER_MS", "0"))     # 0 이면 hedging 끔 (ainvoke 만 해당)
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))   # 연속 실패 N 회면 circuit open
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))      # open 후 N 초 뒤 probe 1건 허용
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))   # provider 별 HTTP 연결 풀 크기
+
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    name: str
+    base_url: Optional[str] = None     # None 이면 SDK 기본값 (OPENAI_BASE_URL / api.openai.com)
+    api_key: Optional[str] = None      # None 이면 SDK 기본값 (OPENAI_API_KEY)
+    concurrency: int = 16              # 동시에 보내는 요청 수 상한 (초과분은 FIFO 대기)
+    stream_usage: bool = False         # 스트리밍 응답에도 토큰 사용량 포함 요청 (OpenAI stream_options)
+
+
+PROVIDERS: Dict[str, ProviderConfig] = {
+    "openai": ProviderConfig(
+        "openai",
+        concurrency=int(os.getenv("LLM_CONCURRENCY_OPENAI", "32")),
+        stream_usage=True,
+    ),
+    # 로컬 Ollama (OpenAI 호환 API) → GPU 하나를 공유하므로 동시성은 작게
+    "ollama": ProviderConfig(
+        "ollama",
+        base_url=os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434/v1"),
+        api_key="none",
+        concurrency=int(os.getenv("LLM_CONCURRENCY_OLLAMA", "2")),
+    ),
+}
+
+
+class LLMGatewayError(Exception):
+    pass
+
+
+class CircuitOpenError(LLMGatewayError):
+    """provider 가 연속 실패 중 → 요청을 보내지 않고 바로 실패"""
+
+
+class QueueTimeoutError(LLMGatewayError):
+    """동시성 슬롯을 LLM_QUEUE_TIMEOUT 안에 얻지 못함"""
+
+
+# ============================================================================
+# ✅ 재시도 대상 판별 (타임아웃 / 연결 오류 / 429 / 5xx)
+# ============================================================================
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = {"APITimeoutError", "APIConnectionError"}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, LLMGatewayError):
+        return False
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUS
+    return type(exc).__name__ in _RETRYABLE_NAMES
+
+
+# ============================================================================
+# ✅ 동시성 제한 (동기 / 비동기 호출이 같은 슬롯을 FIFO 로 공유)
+# ============================================================================
+@dataclass(eq=False)
+class _Waiter:
+    event: Optional[threading.Event] = None
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    future: Optional[asyncio.Future] = None
+    granted: bool = False
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
+
+
+class ConcurrencyLimiter:
+    """
+    provider 별 동시 요청 수 제한
+
+    - 슬롯이 없으면 도착 순서대로 대기 (release 시 다음 대기자에게 슬롯을 바로 넘김)
+    - acquire(): threadpool 의 동기 호출용, acquire_async(): event loop 용
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._waiters: Deque[_Waiter] = deque()
+        registry.gauge(f"llm.{name}.in_flight", lambda: self._in_use)
+        registry.gauge(f"llm.{name}.queued", lambda: len(self._waiters))
+
+    def _try_acquire(self) -> bool:
+        if self._in_use < self.limit and not self._waiters:
+            self._in_use += 1
+            return True
+        return False
+
+    def acquire(self, timeout: float) -> None:
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter(event=threading.Event())
+            self._waiters.append(waiter)
+        if waiter.event.wait(timeout):
+            return
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+        raise QueueTimeoutError(f"no LLM slot within {timeout}s")
+
+    async def acquire_async(self, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter(loop=loop, future=loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait((waiter.future,), timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+        raise QueueTimeoutError(f"no LLM slot within {timeout}s")
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+                return
+        # 취소되는 사이에 슬롯을 받은 경우 → 다음 대기자에게 넘김
+        self.release()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                if waiter.event is not None:
+                    waiter.event.set()
+                else:
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                return
+            self._in_use -= 1
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_flight": self._in_use, "queued": len(self._waiters)}
+
+
+# ============================================================================
+# ✅ Circuit breaker (연속 실패 → open → reset 후 probe 1건 → 성공 시 close)
+# ============================================================================
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = LLM_BREAKER_FAILURES,
+                 reset_after: float = LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = "closed"
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._opened = registry.counter(f"llm.{name}.circuit_opened")
+        self._rejected = registry.counter(f"llm.{name}.circuit_rejected")
+
+    def allow(self) -> None:
+        """요청 전 호출 → 보낼 수 없으면 CircuitOpenError"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_after:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+        self._rejected.inc()
+        raise CircuitOpenError("LLM provider circuit is open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self.state = "closed"
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._opened.inc()
+                print(f"🚨 [LLM] circuit opened after {self._failures} failures")
+
+    def record_cancel(self) -> None:
+        """probe 요청이 결과 없이 취소됨 → 다음 요청이 다시 probe"""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+# ============================================================================
+# ✅ Provider (HTTP 연결 풀 + 동시성 제한 + circuit breaker 공유)
+# ============================================================================
+class Provider:
+    def __init__(self, config: ProviderConfig):
+        self.config = config
+        self.name = config.name
+        limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+        self.timeout = httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+        self.http_client = httpx.Client(limits=limits, timeout=self.timeout)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        self.limiter = ConcurrencyLimiter(self.name, config.concurrency)
+        self.breaker = CircuitBreaker(self.name)
+
+    def build_client(self, model: str, **kwargs) -> ChatOpenAI:
+        if self.config.base_url is not None:
+            kwargs.setdefault("base_url", self.config.base_url)
+        if self.config.api_key is not None:
+            kwargs.setdefault("api_key", self.config.api_key)
+        if self.config.stream_usage:
+            kwargs.setdefault("stream_usage", True)
+        return ChatOpenAI(
+            model=model,
+            timeout=self.timeout,
+            max_retries=0,              # 재시도는 게이트웨이에서 (deadline / circuit 과 함께 관리)
+            http_client=self.http_client,
+            http_async_client=self.http_async_client,
+            **kwargs,
+        )
+
+    async def aclose(self) -> None:
+        self.http_client.close()
+        await self.http_async_client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.limiter.stats(),
+            "circuit": self.breaker.stats(),
+        }
+
+
+# ============================================================================
+# ✅ GatewayModel (ChatOpenAI 와 같은 invoke / ainvoke / astream / with_structured_output)
+# ============================================================================
+@dataclass
+class CallPolicy:
+    timeout: float = LLM_TIMEOUT
+    deadline: float = LLM_DEADLINE
+    max_retries: int = LLM_MAX_RETRIES
+    hedge_after_ms: float = LLM_HEDGE_AFTER_MS
+
+
+@dataclass
+class _ModelMetrics:
+    latency_ms: Any
+    queue_ms: Any
+    calls: Any
+    errors: Any
+    retries: Any
+    hedges: Any
+    hedge_wins: Any
+
+    @classmethod
+    def create(cls, provider: str, model: str) -> "_ModelMetrics":
+        prefix = f"llm.{provider}.{model}"
+        return cls(
+            latency_ms=registry.histogram(f"{prefix}.latency_ms"),
+            queue_ms=registry.histogram(f"llm.{provider}.queue_ms"),
+            calls=registry.counter(f"{prefix}.calls"),
+            errors=registry.counter(f"{prefix}.errors"),
+            retries=registry.counter(f"{prefix}.retries"),
+            hedges=registry.counter(f"{prefix}.hedges"),
+            hedge_wins=registry.counter(f"{prefix}.hedge_wins"),
+        )
+
+
+class GatewayModel:
+    """
+    LangChain chat model 을 감싸서 모든 호출을 provider 제한 아래에서 실행
+
+    - circuit breaker 확인 → 동시성 슬롯 대기 → 요청 (요청 1회 timeout)
+    - 재시도: 타임아웃 / 연결 오류 / 429 / 5xx 만, 지수 백오프 + jitter, deadline 안에서만
+    - hedging (ainvoke, hedge_after_ms > 0): 첫 요청이 늦으면 같은 요청을 하나 더 보내고 먼저 끝난 쪽 사용
+    - astream: 첫 chunk 전 실패만 재시도 (이미 보낸 토큰은 되돌릴 수 없음), 스트림 동안 슬롯 유지
+    - 모든 호출에 llm_usage callback + call_site metadata 를 붙여서 호출 위치별 지연/토큰/비용 집계
+    """
+
+    def __init__(self, inner, provider: Provider, model: str, policy: CallPolicy,
+                 metrics: Optional[_ModelMetrics] = None, call_site: Optional[str] = None):
+        self.inner = inner
+        self.provider = provider
+        self.model = model
+        self.policy = policy
+        self.call_site = call_site or UNKNOWN_SITE
+        self._metrics = metrics or _ModelMetrics.create(provider.name, model)
+
+    def __getattr__(self, name):
+        # model_name 등 나머지 속성은 원래 모델 그대로
+        return getattr(self.inner, name)
+
+    def __repr__(self) -> str:
+        return f"GatewayModel({self.provider.name}:{self.model} @ {self.call_site})"
+
+    def for_call_site(self, call_site: str) -> "GatewayModel":
+        """같은 클라이언트 / 제한을 공유하고 계측 이름만 다른 모델"""
+        return GatewayModel(self.inner, self.provider, self.model, self.policy, self._metrics, call_site)
+
+    def with_structured_output(self, schema, **kwargs) -> "GatewayModel":
+        return GatewayModel(self.inner.with_structured_output(schema, **kwargs),
+                            self.provider, self.model, self.policy, self._metrics, self.call_site)
+
+    # --------------------------------------------------
+    # 공통
+    # --------------------------------------------------
+    def _instrument(self, kwargs: dict) -> dict:
+        """호출 config 에 계측 callback 과 call site metadata 추가 (호출 측 config 는 유지)"""
+        config = dict(kwargs.get("config") or {})
+        callbacks = config.get("callbacks")
+        if callbacks is None or isinstance(callbacks, list):
+            config["callbacks"] = [*(callbacks or []), llm_usage]
+        config["metadata"] = {
+            **(config.get("metadata") or {}),
+            "call_site": self.call_site,
+            "llm_model": self.model,
+            "llm_provider": self.provider.name,
+        }
+        return {**kwargs, "config": config}
+
+    def _backoff(self, attempt: int) -> float:
+        return LLM_RETRY_BACKOFF * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+    def _record_error(self, exc: BaseException) -> None:
+        self._metrics.errors.inc()
+        if is_retryable(exc):
+            self.provider.breaker.record_failure()
+        elif not isinstance(exc, LLMGatewayError):
+            # 400 등 요청 자체의 문제 → provider 는 정상 응답한 것
+            self.provider.breaker.record_success()
+
+    def _should_retry(self, exc: BaseException, attempt: int, deadline: float, op: str) -> Optional[float]:
+        """재시도하면 대기 시간, 아니면 None"""
+        if not is_retryable(exc) or attempt > self.policy.max_retries:
+            return None
+        delay = self._backoff(attempt)
+        if time.monotonic() + delay >= deadline:
+            return None
+        self._metrics.retries.inc()
+        print(f"⚠️ [LLM:{self.provider.name}:{self.model}] {op} attempt {attempt} failed "
+              f"({type(exc).__name__} {exc}) → retry in {delay:.1f}s")
+        return delay
+
+    # --------------------------------------------------
+    # 동기
+    # --------------------------------------------------
+    def invoke(self, input, **kwargs):
+        kwargs = self._instrument(kwargs)
+        deadline = time.monotonic() + self.policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self._attempt(lambda: self.inner.invoke(input, **kwargs))
+            except Exception as e:
+                delay = self._should_retry(e, attempt, deadline, "invoke")
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    def _attempt(self, fn: Callable[[], Any]) -> Any:
+        self.provider.breaker.allow()
+        queued = time.perf_counter()
+        try:
+            self.provider.limiter.acquire(LLM_QUEUE_TIMEOUT)
+        except BaseException:
+            self.provider.breaker.record_cancel()
+            raise
+        start = time.perf_counter()
+        self._metrics.queue_ms.observe((start - queued) * 1000)
+        try:
+            self._metrics.calls.inc()
+            result = fn()
+        except Exception as e:
+            self._record_error(e)
+            raise
+        finally:
+            self.provider.limiter.release()
+        self.provider.breaker.record_success()
+        self._metrics.latency_ms.observe((time.perf_counter() - start) * 1000)
+        return result
+
+    # --------------------------------------------------
+    # 비동기
+    # --------------------------------------------------
+    async def ainvoke(self, input, **kwargs):
+        kwargs = self._instrument(kwargs)
+        deadline = time.monotonic() + self.policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = max(0.0, min(self.policy.timeout, deadline - time.monotonic()))
+            call = lambda: self._attempt_async(lambda: self.inner.ainvoke(input, **kwargs), timeout)
+            try:
+                if self.policy.hedge_after_ms > 0:
+                    return await self._hedged(call)
+                return await call()
+            except Exception as e:
+                delay = self._should_retry(e, attempt, deadline, "ainvoke")
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def _attempt_async(self, fn: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        self.provider.breaker.allow()
+        queued = time.perf_counter()
+        try:
+            await self.provider.limiter.acquire_async(LLM_QUEUE_TIMEOUT)
+        except BaseException:
+            self.provider.breaker.record_cancel()
+            raise
+        start = time.perf_counter()
+        self._metrics.queue_ms.observe((start - queued) * 1000)
+        try:
+            self._metrics.calls.inc()
+            result = await asyncio.wait_for(fn(), timeout)
+        except asyncio.CancelledError:
+            self.provider.breaker.record_cancel()
+            raise
+        except Exception as e:
+            self._record_error(e)
+            raise
+        finally:
+            self.provider.limiter.release()
+        self.provider.breaker.record_success()
+        self._metrics.latency_ms.observe((time.perf_counter() - start) * 1000)
+        return result
+
+    async def _hedged(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """hedge_after_ms 안에 끝나지 않으면 같은 요청을 하나 더 → 먼저 성공한 결과 사용, 나머지는 취소"""
+        primary = asyncio.ensure_future(call())
+        done, _ = await asyncio.wait((primary,), timeout=self.policy.hedge_after_ms / 1000)
+        if done:
+            return primary.result()
+
+        self._metrics.hedges.inc()
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._metrics.hedge_wins.inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, input, **kwargs):
+        kwargs = self._instrument(kwargs)
+        deadline = time.monotonic() + self.policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = max(0.0, min(self.policy.timeout, deadline - time.monotonic()))
+            self.provider.breaker.allow()
+            queued = time.perf_counter()
+            try:
+                await self.provider.limiter.acquire_async(LLM_QUEUE_TIMEOUT)
+            except BaseException:
+                self.provider.breaker.record_cancel()
+                raise
+            start = time.perf_counter()
+            self._metrics.queue_ms.observe((start - queued) * 1000)
+            self._metrics.calls.inc()
+
+            stream = self.inner.astream(input, **kwargs).__aiter__()
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), timeout)
+                break
+            except StopAsyncIteration:
+                self.provider.limiter.release()
+                self.provider.breaker.record_success()
+                return
+            except asyncio.CancelledError:
+                self.provider.limiter.release()
+                self.provider.breaker.record_cancel()
+                raise
+            except Exception as e:
+                self.provider.limiter.release()
+                self._record_error(e)
+                delay = self._should_retry(e, attempt, deadline, "astream")
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+        try:
+            yield first
+            async for chunk in stream:
+                yield chunk
+        except Exception as e:
+            self._record_error(e)
+            raise
+        except BaseException:
+            # 클라이언트 연결 끊김 등으로 스트림이 중간에 닫힘
+            self.provider.breaker.record_cancel()
+            raise
+        else:
+            self.provider.breaker.record_success()
+            self._metrics.latency_ms.observe((time.perf_counter() - start) * 1000)
+        finally:
+            self.provider.limiter.release()
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+
+
+# ============================================================================
+# ✅ 레지스트리 (provider / 모델 / 옵션 조합당 하나)
+# ============================================================================
+class LLMGateway:
+    def __init__(self, providers: Dict[str, ProviderConfig] = PROVIDERS):
+        self._configs = providers
+        self._providers: Dict[str, Provider] = {}
+        self._models: Dict[Tuple, GatewayModel] = {}
+        self._lock = threading.Lock()
+
+    def provider(self, name: str) -> Provider:
+        with self._lock:
+            if name not in self._providers:
+                if name not in self._configs:
+                    raise ValueError(f"Unknown LLM provider: {name}")
+                self._providers[name] = Provider(self._configs[name])
+            return self._providers[name]
+
+    def get(self, model: str, provider: str = "openai", timeout: Optional[float] = None,
+            max_retries: Optional[int] = None, hedge_after_ms: Optional[float] = None,
+            call_site: Optional[str] = None, **model_kwargs) -> GatewayModel:
+        """
+        공유 모델 반환 (같은 provider / model / 옵션이면 같은 클라이언트)
+
+        call_site: 계측에 쓰는 호출 위치 이름 (예: "chat.route", "podcast.host_agent")
+        model_kwargs 는 ChatOpenAI 에 그대로 전달 (temperature 등)
+        """
+        policy = CallPolicy(
+            timeout=LLM_TIMEOUT if timeout is None else timeout,
+            max_retries=LLM_MAX_RETRIES if max_retries is None else max_retries,
+            hedge_after_ms=LLM_HEDGE_AFTER_MS if hedge_after_ms is None else hedge_after_ms,
+        )
+        key = (provider, model, policy.timeout, policy.max_retries, policy.hedge_after_ms,
+               tuple(sorted(model_kwargs.items())))
+        p = self.provider(provider)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = GatewayModel(p.build_client(model, **model_kwargs), p, model, policy)
+            base = self._models[key]
+        return base.for_call_site(call_site) if call_site else base
+
+    async def aclose(self) -> None:
+        for p in list(self._providers.values()):
+            await p.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "providers": {name: p.stats() for name, p in self._providers.items()},
+            "models": sorted({f"{k[0]}:{k[1]}" for k in self._models}),
+            "metrics": registry.snapshot("llm."),
+        }
+
+
+llm_gateway = LLMGateway()
+
+
+def get_llm(model: str, provider: str = "openai", **kwargs) -> GatewayModel:
+    return llm_gateway.get(model, provider=provider, **kwargs)
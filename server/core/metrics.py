@@ -0,0 +1,121 @@
+# server/core/metrics.py - 프로세스 내 카운터/히스토그램 레지스트리
+import bisect
+import threading
+from typing import Callable, Dict, Sequence
+
+# ============================================================================
+# ✅ 기본 버킷 (밀리초). 마지막 버킷 이후는 +Inf 로 집계
+# ============================================================================
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """
+    고정 버킷 히스토그램 (thread-safe)
+
+    - p50/p95/p99 는 버킷 상한값으로 근사
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def _quantile(self, q: float) -> float:
+        target = q * self.count
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            seen += c
+            if seen >= target and c:
+                return self.buckets[idx] if idx < len(self.buckets) else self.max
+        return 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if not self.count:
+                return {"count": 0}
+            return {
+                "count": self.count,
+                "sum": round(self.total, 3),
+                "avg": round(self.total / self.count, 3),
+                "min": round(self.min, 3),
+                "max": round(self.max, 3),
+                "p50": self._quantile(0.50),
+                "p95": self._quantile(0.95),
+                "p99": self._quantile(0.99),
+                "buckets": {
+                    **{str(b): c for b, c in zip(self.buckets, self._counts)},
+                    "+Inf": self._counts[-1],
+                },
+            }
+
+
+class MetricsRegistry:
+    """
+    이름 → 카운터/히스토그램/게이지
+
+    사용 예:
+        registry.histogram("chat.write_behind.flush_ms").observe(12.3)
+        registry.counter("chat.write_behind.rows").inc(5)
+        registry.gauge("chat.write_behind.depth", lambda: len(queue))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def counter(self, name: str) -> Counter:
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter()
+            return self._counters[name]
+
+    def histogram(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS_MS) -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(buckets)
+            return self._histograms[name]
+
+    def gauge(self, name: str, fn: Callable[[], float]) -> None:
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self, prefix: str = "") -> dict:
+        with self._lock:
+            counters = {k: v for k, v in self._counters.items() if k.startswith(prefix)}
+            histograms = {k: v for k, v in self._histograms.items() if k.startswith(prefix)}
+            gauges = {k: v for k, v in self._gauges.items() if k.startswith(prefix)}
+        return {
+            "counters": {k: c.value for k, c in sorted(counters.items())},
+            "gauges": {k: fn() for k, fn in sorted(gauges.items())},
+            "histograms": {k: h.snapshot() for k, h in sorted(histograms.items())},
+        }
+
+
+# 모듈 전역 레지스트리 (/metrics 에서 노출)
+registry = MetricsRegistry()
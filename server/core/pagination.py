@@ -0,0 +1,75 @@
+# server/core/pagination.py - 키셋(커서) 페이지네이션 헬퍼
+import base64
+import json
+from typing import Optional, Tuple
+
+# ============================================================================
+# ✅ 커서 형식
+# ============================================================================
+# 클라이언트에는 불투명(opaque) 문자열만 노출하고, 내부적으로는
+# {"b": <id>} (이 id 보다 과거) 또는 {"a": <id>} (이 id 보다 최신) 을 base64url 로 인코딩
+# ============================================================================
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(before_id: Optional[int] = None, after_id: Optional[int] = None) -> str:
+    payload = {"b": before_id} if before_id is not None else {"a": after_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    커서 문자열 → (before_id, after_id)
+
+    Raises:
+        ValueError: 형식이 잘못된 커서
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        before_id, after_id = payload.get("b"), payload.get("a")
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if (before_id is None) == (after_id is None):
+        raise ValueError("Invalid cursor")
+    for value in (before_id, after_id):
+        if value is not None and not isinstance(value, int):
+            raise ValueError("Invalid cursor")
+    return before_id, after_id
+
+
+def resolve_page_args(cursor: Optional[str], before_id: Optional[int],
+                      after_id: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    쿼리 파라미터 정리: cursor 가 있으면 cursor 우선, before/after 는 동시에 사용 불가
+
+    Raises:
+        ValueError: 잘못된 조합
+    """
+    if cursor:
+        return decode_cursor(cursor)
+    if before_id is not None and after_id is not None:
+        raise ValueError("before_id and after_id are mutually exclusive")
+    return before_id, after_id
+
+
+def build_page(rows: list, limit: int, after_id: Optional[int]):
+    """
+    limit + 1 개로 조회한 결과를 (오래된 것부터 정렬된 페이지, next_cursor) 로 변환
+
+    - before/기본 방향: rows 는 id 내림차순 → 가장 오래된 id 기준 "b" 커서
+    - after 방향: rows 는 id 오름차순 → 가장 최신 id 기준 "a" 커서
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if after_id is not None:
+        next_cursor = encode_cursor(after_id=rows[-1].id) if has_more and rows else None
+        return rows, next_cursor
+
+    rows.reverse()
+    next_cursor = encode_cursor(before_id=rows[0].id) if has_more and rows else None
+    return rows, next_cursor
@@ -0,0 +1,281 @@
+# server/core/write_behind.py - 비동기 write-behind 배치 INSERT 큐
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from server.core.metrics import registry
+
+
+@dataclass
+class PendingRow:
+    model: Type[Any]
+    values: Dict[str, Any]
+    attempts: int = 0
+
+
+class WriteBehindQueue:
+    """
+    ORM 모델 row 를 모았다가 짧은 주기(또는 개수 임계치)마다 multi-row INSERT 로 저장
+
+    - enqueue() 는 thread-safe (동기 LangGraph 노드/threadpool 에서 호출 가능)
+    - 모델별로 묶어서 insert(Model) + 값 리스트 → MySQL 에서는 multi-row INSERT
+    - 연결 오류로 실패한 배치는 큐 앞쪽으로 되돌려 재시도 (max_retries 초과 시 버림 + rows_dropped)
+    - 데이터 오류(길이 초과 / 제약 위반 등)로 실패한 배치는 반씩 나눠 다시 저장
+      → 정상 row 는 저장, 혼자서도 실패하는 row 만 바로 버림 (rows_poisoned)
+      → conflict_handler 가 새 값을 돌려주면 버리지 않고 그 값으로 재시도 (예: 중복 번호 재할당)
+    - pending_rows() 로 아직 저장되지 않은 row (대기 + flush 중) 조회 → DB 에서 상태를 다시 읽을 때 합침
+    - stop() 은 남은 row 를 모두 flush 하고 종료 (서버 shutdown 훅에서 호출)
+
+    ⚠️ 저장 전까지는 DB 에 없으므로 DB 만 다시 조회하면 빠짐 → pending_rows() 와 합칠 것
+    """
+
+    def __init__(self, session_factory, name: str, flush_interval: float = 0.2,
+                 max_batch: int = 200, max_retries: int = 5, retry_backoff: float = 0.5,
+                 conflict_handler: Optional[
+                     Callable[["PendingRow", Exception], Awaitable[Optional[Dict[str, Any]]]]
+                 ] = None):
+        self.session_factory = session_factory
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.conflict_handler = conflict_handler
+
+        self._pending: Deque[PendingRow] = deque()
+        self._inflight: List[PendingRow] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        prefix = f"write_behind.{name}"
+        self._flush_ms = registry.histogram(f"{prefix}.flush_ms")
+        self._batch_rows = registry.histogram(f"{prefix}.batch_rows", buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+        self._rows_written = registry.counter(f"{prefix}.rows_written")
+        self._flush_failures = registry.counter(f"{prefix}.flush_failures")
+        self._rows_dropped = registry.counter(f"{prefix}.rows_dropped")
+        self._rows_poisoned = registry.counter(f"{prefix}.rows_poisoned")
+        self._rows_reassigned = registry.counter(f"{prefix}.rows_reassigned")
+        registry.gauge(f"{prefix}.depth", self.depth)
+
+    # --------------------------------------------------
+    # 상태
+    # --------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def pending_rows(self) -> List[Tuple[Type[Any], Dict[str, Any]]]:
+        """아직 커밋되지 않은 (model, values) 스냅샷 (flush 중인 배치 포함, thread-safe)"""
+        with self._lock:
+            return [(row.model, dict(row.values)) for row in (*self._inflight, *self._pending)]
+
+    # --------------------------------------------------
+    # 큐 적재 (thread-safe)
+    # --------------------------------------------------
+    def enqueue(self, model: Type[Any], values: Dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.append(PendingRow(model, values))
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake()
+
+    def _wake(self) -> None:
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # --------------------------------------------------
+    # 라이프사이클
+    # --------------------------------------------------
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name=f"write-behind-{self.name}")
+        print(f"✅ Write-behind queue '{self.name}' started")
+
+    async def stop(self) -> None:
+        """워커 중지 후 남은 row 전부 flush (재시도 포함)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while self._pending:
+            before = self.depth()
+            await self.flush()
+            if self.depth() >= before:
+                # 진전이 없으면 (DB 장애) 백오프 후 재시도, max_retries 초과분은 flush 에서 버려짐
+                await asyncio.sleep(self.retry_backoff)
+        print(f"✅ Write-behind queue '{self.name}' drained")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._pending:
+                ok = await self.flush()
+                if not ok:
+                    await asyncio.sleep(self.retry_backoff)
+                    break
+
+    # --------------------------------------------------
+    # flush
+    # --------------------------------------------------
+    def _take_batch(self) -> List[PendingRow]:
+        with self._lock:
+            n = min(self.max_batch, len(self._pending))
+            self._inflight = [self._pending.popleft() for _ in range(n)]
+            return list(self._inflight)
+
+    def _requeue(self, batch: List[PendingRow]) -> None:
+        retry = []
+        for row in batch:
+            row.attempts += 1
+            if row.attempts > self.max_retries:
+                self._rows_dropped.inc()
+                print(f"❌ [WriteBehind:{self.name}] dropped {row.model.__name__} row after {row.attempts} attempts")
+            else:
+                retry.append(row)
+        with self._lock:
+            self._pending.extendleft(reversed(retry))
+
+    @staticmethod
+    def _is_transient(e: Exception) -> bool:
+        """DB 연결 / 타임아웃 문제 → 배치를 나눠도 소용없으므로 통째로 재시도"""
+        return (
+            isinstance(e, (OperationalError, InterfaceError, OSError, asyncio.TimeoutError))
+            or getattr(e, "connection_invalidated", False)
+        )
+
+    async def _insert(self, rows: List[PendingRow]) -> None:
+        """rows 를 한 트랜잭션으로 저장 (모델별로 묶되, 처음 등장한 순서를 유지)"""
+        grouped: Dict[Type[Any], List[Dict[str, Any]]] = {}
+        for row in rows:
+            grouped.setdefault(row.model, []).append(row.values)
+
+        async with self.session_factory() as session:
+            for model, values in grouped.items():
+                await session.execute(insert(model), values)
+            await session.commit()
+
+    async def _reject(self, row: PendingRow, e: Exception) -> None:
+        """
+        혼자서도 실패하는 row 처리
+
+        - conflict_handler 가 새 값을 주면 그 값으로 큐 앞쪽에서 재시도 (attempts 증가 → max_retries 로 제한)
+        - 아니면 재시도해도 같으므로 바로 버림 (rows_poisoned)
+        """
+        if self.conflict_handler is not None:
+            try:
+                values = await self.conflict_handler(row, e)
+            except Exception as handler_error:
+                print(f"⚠️ [WriteBehind:{self.name}] conflict handler failed: "
+                      f"{type(handler_error).__name__} {handler_error}")
+                values = None
+            if values is not None:
+                self._rows_reassigned.inc()
+                self._requeue([PendingRow(row.model, values, row.attempts)])
+                return
+
+        self._rows_poisoned.inc()
+        print(f"❌ [WriteBehind:{self.name}] dropped poison {row.model.__name__} row: {type(e).__name__} {e}")
+
+    async def _isolate(self, batch: List[PendingRow], error: Exception) -> int:
+        """
+        데이터 오류로 실패한 배치를 반씩 나눠 다시 저장 → 저장한 row 수 반환
+
+        - 끝까지 실패하는 row 만 버림 (rows_poisoned), 나머지는 순서대로 저장
+        - 도중에 연결 오류가 나면 남은 row 는 재시도 큐로
+        """
+        if len(batch) == 1:
+            await self._reject(batch[0], error)
+            return 0
+
+        mid = len(batch) // 2
+        parts = [batch[:mid], batch[mid:]]
+        written = 0
+        while parts:
+            rows = parts.pop(0)
+            try:
+                await self._insert(rows)
+            except Exception as e:
+                if self._is_transient(e):
+                    self._requeue(rows + [row for part in parts for row in part])
+                    break
+                if len(rows) == 1:
+                    await self._reject(rows[0], e)
+                else:
+                    mid = len(rows) // 2
+                    parts[:0] = [rows[:mid], rows[mid:]]
+                continue
+            written += len(rows)
+        return written
+
+    async def flush(self) -> bool:
+        """한 배치 저장. 진전이 없으면 False (row 는 재시도 큐로 복귀)"""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch = self._take_batch()
+            if not batch:
+                return True
+
+            start = time.perf_counter()
+            try:
+                await self._insert(batch)
+                written = len(batch)
+            except Exception as e:
+                self._flush_failures.inc()
+                print(f"⚠️ [WriteBehind:{self.name}] flush failed ({len(batch)} rows): {type(e).__name__} {e}")
+                if self._is_transient(e):
+                    self._requeue(batch)
+                    return False
+                written = await self._isolate(batch, e)
+            finally:
+                with self._lock:
+                    self._inflight = []
+
+            self._flush_ms.observe((time.perf_counter() - start) * 1000)
+            self._batch_rows.observe(len(batch))
+            self._rows_written.inc(written)
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "depth": self.depth(),
+            "flush_ms": self._flush_ms.snapshot(),
+            "rows_written": self._rows_written.value,
+            "flush_failures": self._flush_failures.value,
+            "rows_dropped": self._rows_dropped.value,
+            "rows_poisoned": self._rows_poisoned.value,
+            "rows_reassigned": self._rows_reassigned.value,
+        }
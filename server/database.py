@@ -1,6 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # .env 불러오기 (.env 파일이 fastapi_server 루트에 있다면 상대 경로 맞춰줘야 함)
@@ -12,15 +17,137 @@ DB_HOST = os.getenv("DB_HOST", "capston-1.cef8coqs6xh4.us-east-1.rds.amazonaws.c
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "capston_1")
 
+# ============================================================================
+# ✅ 커넥션 풀 설정 (워커 수 × (size + overflow) ≤ RDS max_connections 로 맞출 것)
+# ============================================================================
+# 비동기(aiomysql) 풀: 요청 처리 경로의 주 풀
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# 동기(pymysql) 풀: create_tables, LangGraph 동기 노드 등 하위 호환 경로
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", "5"))
+DB_SYNC_MAX_OVERFLOW = int(os.getenv("DB_SYNC_MAX_OVERFLOW", "5"))
+# 공통
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))    # 초, RDS wait_timeout 보다 짧게
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))    # 풀에서 커넥션 대기 최대 초
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))  # TCP 연결 최대 초
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
 # MySQL 연결 URL
 DATABASE_URL = (
     f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     "?charset=utf8mb4"
 )
+ASYNC_DATABASE_URL = (
+    f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    "?charset=utf8mb4"
+)
+
+
+# ============================================================================
+# ✅ 풀 대기 시간 측정 (checkout 에 걸린 시간 = 풀에서 커넥션을 기다린 시간)
+# ============================================================================
+class PoolWaitStats:
+    """풀 checkout 대기 시간/타임아웃 누적 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.timeouts = 0
+
+    def record(self, elapsed_ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.last_ms = elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "wait_avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "wait_max_ms": round(self.max_ms, 3),
+                "wait_last_ms": round(self.last_ms, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+class _TimedPoolMixin:
+    """QueuePool._do_get 을 감싸서 대기 시간을 기록"""
+
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record_timeout()
+            raise
+        finally:
+            self.wait_stats.record((time.perf_counter() - start) * 1000)
+
+    def recreate(self):
+        # pool 재생성(dispose) 시에도 같은 통계 객체 유지
+        new_pool = super().recreate()
+        new_pool.wait_stats = self.wait_stats
+        return new_pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+
+# ============================================================================
+# ✅ 엔진 (워커 프로세스당 동기 1개 + 비동기 1개)
+# ============================================================================
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_pre_ping=True,
+    pool_size=DB_SYNC_POOL_SIZE,
+    max_overflow=DB_SYNC_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_timeout=DB_POOL_TIMEOUT,
+    connect_args={"connect_timeout": DB_CONNECT_TIMEOUT},
+    echo=DB_ECHO,
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_timeout=DB_POOL_TIMEOUT,
+    connect_args={"connect_timeout": DB_CONNECT_TIMEOUT},
+    echo=DB_ECHO,
+)
 
 # SQLAlchemy 설정
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,       # 커밋 후에도 객체 접근 가능
+)
 Base = declarative_base()
 
 # DB 세션 의존성
@@ -30,3 +157,43 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI 의존성으로 사용할 비동기 DB 세션"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def is_duplicate_key(e: BaseException) -> bool:
+    """UNIQUE 인덱스 중복으로 실패한 INSERT 인지 (MySQL 1062 / sqlite UNIQUE constraint failed)"""
+    if not isinstance(e, IntegrityError):
+        return False
+    args = getattr(e.orig, "args", ())
+    message = str(e.orig).lower()
+    return (bool(args) and args[0] == 1062) or "duplicate entry" in message or "unique constraint failed" in message
+
+
+# ============================================================================
+# ✅ 풀 텔레메트리 (읽기 전용)
+# ============================================================================
+def _pool_snapshot(pool) -> dict:
+    stats = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(wait_stats.snapshot())
+    return stats
+
+
+def pool_stats() -> dict:
+    """동기/비동기 풀별 checked-out, idle, overflow, 대기 시간 통계"""
+    return {
+        "sync": _pool_snapshot(engine.pool),
+        "async": _pool_snapshot(async_engine.sync_engine.pool),
+    }
@@ -1,13 +1,13 @@
 # server/test/controller/test_controller.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
-from server.auth_manager import get_current_user
-from server.database import get_db
+from server.auth_manager import get_current_user_async, CurrentUser
+from server.database import get_async_db
 from server.level_test.service.test_service import process_test_message, analyze_test_result
-from server.level_test.repository.log_repository import get_recent_logs
-from server.models import User
+from server.level_test.repository.log_repository_async import get_logs_page
+from server.core.pagination import MAX_PAGE_SIZE, resolve_page_args
 from fastapi import Header
 
 
@@ -27,31 +27,47 @@ async def get_token(Authorization: str = Header(...)):
 @router.get("/test/logs")
 async def get_test_logs(
     level_test_num: Optional[int] = None,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    레벨 테스트 로그를 가져옵니다.
-    - level_test_num 파라미터 있음: 해당 level_test_num의 최근 10개 로그
-    - level_test_num 파라미터 없음: 모든 level_test_num의 최근 10개 로그
+    레벨 테스트 로그를 가져옵니다. (id 기준 커서 페이지네이션)
+    - level_test_num 파라미터 있음: 해당 level_test_num의 로그
+    - level_test_num 파라미터 없음: 모든 level_test_num의 로그
+    - cursor: 이전 응답의 next_cursor (before_id/after_id 보다 우선)
+    - before_id / after_id: 해당 id 이전/이후 로그
+    - 아무것도 없으면 최근 size개
     """
-    logs = get_recent_logs(
+    try:
+        before_id, after_id = resolve_page_args(cursor, before_id, after_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logs, next_cursor = await get_logs_page(
         db=db,
         user_id=user.id,
         level_test_num=level_test_num,
-        limit=10
+        before_id=before_id,
+        after_id=after_id,
+        limit=size
     )
 
     return {
         "logs": [
             {
+                "id": log.id,
                 "dialog_num": log.diolog_num,
                 "user_question": log.user_question,
                 "ai_response": log.ai_response,
                 "created_at": log.created_at.isoformat() if log.created_at else None
             }
             for log in logs
-        ]
+        ],
+        "next_cursor": next_cursor
     }
 
 
@@ -59,8 +75,8 @@ async def get_test_logs(
 @router.post("/test")
 async def test_endpoint(
     request: TestRequest,
-    user: User = Depends(get_current_user),  # ✅ Authorization 헤더에서 User 자동 주입
-    db: Session = Depends(get_db), 
+    user: CurrentUser = Depends(get_current_user_async),  # ✅ Authorization 헤더에서 User 자동 주입
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(get_token)           # ✅ DB 세션 주입
 ):
     """어휘력 테스트 문장 1회 입력 (qwen:4b로 처리)"""
@@ -0,0 +1,88 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional
+from server.models import LevelTestLog, User
+from server.core.pagination import build_page
+
+async def get_user_by_login_id(db: AsyncSession, login_id: str):
+    # ✅ AsyncSession 에서는 lazy load 불가 → ranks 를 함께 로딩
+    result = await db.execute(
+        select(User)
+        .options(selectinload(User.ranks))
+        .where(User.login_id == login_id)
+    )
+    return result.scalars().first()
+
+async def get_last_log(db: AsyncSession, user_id: int):
+    result = await db.execute(
+        select(LevelTestLog)
+        .where(LevelTestLog.user_id == user_id)
+        .order_by(LevelTestLog.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+async def get_recent_logs(db: AsyncSession, user_id: int, level_test_num: Optional[int] = None, limit: int = 10):
+    """
+    특정 유저의 레벨 테스트 로그를 가져옵니다. (비동기)
+    - level_test_num이 있으면: 해당 level_test_num의 최근 로그
+    - level_test_num이 없으면: 모든 level_test_num의 최근 로그
+    """
+    stmt = select(LevelTestLog).where(LevelTestLog.user_id == user_id)
+    if level_test_num is not None:
+        stmt = stmt.where(LevelTestLog.level_test_num == level_test_num)
+    stmt = stmt.order_by(LevelTestLog.created_at.desc()).limit(limit)
+
+    result = await db.execute(stmt)
+    logs = list(result.scalars().all())
+    logs.reverse()
+    return logs
+
+async def get_logs_page(db: AsyncSession, user_id: int, level_test_num: Optional[int] = None,
+                        before_id: Optional[int] = None, after_id: Optional[int] = None,
+                        limit: int = 10):
+    """
+    레벨 테스트 로그 키셋 페이지 조회 (PK 기준, OFFSET 없음)
+
+    Returns:
+        (오래된 것부터 정렬된 logs, next_cursor | None)
+    """
+    stmt = select(LevelTestLog).where(LevelTestLog.user_id == user_id)
+    if level_test_num is not None:
+        stmt = stmt.where(LevelTestLog.level_test_num == level_test_num)
+
+    if after_id is not None:
+        stmt = stmt.where(LevelTestLog.id > after_id).order_by(LevelTestLog.id.asc())
+    else:
+        if before_id is not None:
+            stmt = stmt.where(LevelTestLog.id < before_id)
+        stmt = stmt.order_by(LevelTestLog.id.desc())
+
+    result = await db.execute(stmt.limit(limit + 1))
+    return build_page(list(result.scalars().all()), limit, after_id)
+
+async def get_all_logs_by_level(db: AsyncSession, user_id: int, level_test_num: int):
+    result = await db.execute(
+        select(LevelTestLog)
+        .where(LevelTestLog.user_id == user_id,
+               LevelTestLog.level_test_num == level_test_num)
+        .order_by(LevelTestLog.created_at.asc())
+    )
+    return list(result.scalars().all())
+
+async def save_level_test_log(db: AsyncSession, user_id: int, user_question: str, ai_response: str,
+                              level_test_num: int, dialog_num: int):
+    new_log = LevelTestLog(
+        user_id=user_id,
+        user_question=user_question,
+        ai_response=ai_response,
+        level_test_num=level_test_num,
+        diolog_num=dialog_num,
+        created_at=datetime.utcnow()
+    )
+    db.add(new_log)
+    await db.commit()
+    await db.refresh(new_log)
+    return new_log
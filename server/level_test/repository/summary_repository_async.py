@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from server.models import LevelTestSummary
+
+async def get_summaries_by_level(db: AsyncSession, user_id: int, level_test_num: int):
+    result = await db.execute(
+        select(LevelTestSummary)
+        .where(LevelTestSummary.user_id == user_id,
+               LevelTestSummary.level_test_num == level_test_num)
+        .order_by(LevelTestSummary.summary_num.asc())
+    )
+    return list(result.scalars().all())
+
+async def get_last_summary(db: AsyncSession, user_id: int, level_test_num: int):
+    result = await db.execute(
+        select(LevelTestSummary)
+        .where(LevelTestSummary.user_id == user_id,
+               LevelTestSummary.level_test_num == level_test_num)
+        .order_by(LevelTestSummary.summary_num.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+async def save_summary(db: AsyncSession, user_id: int, level_test_num: int,
+                       summary_num: int, summary_text: str):
+    new_summary = LevelTestSummary(
+        user_id=user_id,
+        level_test_num=level_test_num,
+        summary_num=summary_num,
+        summary_text=summary_text,
+        created_at=datetime.utcnow()
+    )
+    db.add(new_summary)
+    await db.commit()
+    await db.refresh(new_summary)
+    return new_summary
@@ -1,19 +1,20 @@
-from langchain_openai import ChatOpenAI
-from server.level_test.repository.log_repository import (
+from server.level_test.repository.log_repository_async import (
     get_user_by_login_id, get_last_log,
     get_recent_logs, get_all_logs_by_level,
     save_level_test_log
 )
-from server.level_test.repository.summary_repository import (
+from server.level_test.repository.summary_repository_async import (
     get_summaries_by_level, get_last_summary, save_summary
 )
+from server.auth_manager import auth_manager
 from datetime import datetime
 import httpx
 import os
+from server.core.llm_gateway import get_llm
 
-test_llm = ChatOpenAI(model="qwen:4b", base_url="http://127.0.0.1:11434/v1", api_key="none")
-summary_llm = ChatOpenAI(model="gpt-4o-mini")
-result_llm = ChatOpenAI(model="gpt-4o")
+test_llm = get_llm("qwen:4b", provider="ollama", call_site="level_test.question")
+summary_llm = get_llm("gpt-4o-mini", call_site="level_test.summary")
+result_llm = get_llm("gpt-4o", call_site="level_test.result")
 
 # Spring Boot API URL
 SPRING_BOOT_URL = os.getenv("SPRING_BOOT_URL", "https://semiconical-shela-loftily.ngrok-free.dev")
@@ -21,7 +22,7 @@ SPRING_BOOT_URL = os.getenv("SPRING_BOOT_URL", "https://semiconical-shela-loftil
 
 async def evaluate_level(db, user_id: int, level_test_num: int, current_level: str = "Beginner") -> str:
     """최근 10개 대화를 기반으로 CEFR 레벨 평가 (사용자 응답만 평가)"""
-    last_ten = get_recent_logs(db, user_id, level_test_num, 10)
+    last_ten = await get_recent_logs(db, user_id, level_test_num, 10)
 
     if not last_ten:
         print("⚠️ 평가할 대화 내용이 없습니다. 현재 레벨 유지")
@@ -116,6 +117,8 @@ async def update_user_rank_in_spring(user_id: int, rank_title: str, token: str)
             )
             if response.status_code == 200:
                 print(f"✅ User {user_id} rank updated to {rank_title}")
+                # ✅ 캐시된 rank_title 이 낡지 않도록 identity 캐시 무효화
+                auth_manager.invalidate_user(user_id=user_id)
                 return True
             else:
                 print(f"❌ Failed to update rank: {response.status_code} - {response.text}")
@@ -128,12 +131,12 @@ async def update_user_rank_in_spring(user_id: int, rank_title: str, token: str)
 
 async def process_test_message(db, login_id: str, message: str, token: str):
 
-    user = get_user_by_login_id(db, login_id)
+    user = await get_user_by_login_id(db, login_id)
     if not user:
         raise ValueError("User not found")
 
     user_id = user.id
-    last_log = get_last_log(db, user_id)
+    last_log = await get_last_log(db, user_id)
 
     # 대화 번호 계산
     if not last_log:
@@ -145,11 +148,11 @@ async def process_test_message(db, login_id: str, message: str, token: str):
             level_test_num, dialog_num = last_log.level_test_num, last_log.diolog_num + 1
 
     # summary + recent logs 불러오기
-    summaries = get_summaries_by_level(db, user_id, level_test_num)
+    summaries = await get_summaries_by_level(db, user_id, level_test_num)
     summary_context = "\n".join([s.summary_text for s in summaries])
 
     remainder = (dialog_num - 1) % 10
-    recent_logs = get_recent_logs(db, user_id, level_test_num, remainder)
+    recent_logs = await get_recent_logs(db, user_id, level_test_num, remainder)
     dialogue_context = "\n".join(
         [f"User: {l.user_question}\nAI: {l.ai_response}" for l in recent_logs]
     )
@@ -173,7 +176,7 @@ async def process_test_message(db, login_id: str, message: str, token: str):
     ai_reply = response.content.strip()
 
     # 로그 저장
-    save_level_test_log(db, user_id, message, ai_reply, level_test_num, dialog_num)
+    await save_level_test_log(db, user_id, message, ai_reply, level_test_num, dialog_num)
 
     current_level = user.ranks.title if user.ranks else "Beginner"
     level_changed = False
@@ -182,14 +185,14 @@ async def process_test_message(db, login_id: str, message: str, token: str):
     # 10번째마다 요약 + 레벨 평가
     if dialog_num % 10 == 0:
 
-        last_ten = get_recent_logs(db, user_id, level_test_num, 10)
+        last_ten = await get_recent_logs(db, user_id, level_test_num, 10)
         text = "\n".join([f"User: {x.user_question}\nAI: {x.ai_response}" for x in last_ten])
         prompt = f"Summarize the following 10 exchanges concisely:\n{text}"
         summary_text = summary_llm.invoke(prompt).content.strip()
 
-        last_summary = get_last_summary(db, user_id, level_test_num)
+        last_summary = await get_last_summary(db, user_id, level_test_num)
         next_summary_num = (last_summary.summary_num + 1) if last_summary else 1
-        save_summary(db, user_id, level_test_num, next_summary_num, summary_text)
+        await save_summary(db, user_id, level_test_num, next_summary_num, summary_text)
 
         # ⭐ 10개 단위 레벨 평가 (현재 레벨 전달)
         previous_level = user.ranks.title if user.ranks else "Beginner"
@@ -200,7 +203,7 @@ async def process_test_message(db, login_id: str, message: str, token: str):
             if success:
                 current_level = evaluated_level
                 level_changed = True
-                db.refresh(user)
+                await db.refresh(user, attribute_names=["rank_id", "ranks"])
 
     # 100번째일 때도 evaluated_level 보내기
     if dialog_num % 100 == 0:
@@ -224,9 +227,9 @@ async def process_test_message(db, login_id: str, message: str, token: str):
 
 
 async def analyze_test_result(db, login_id: str, level_test_num: int):
-    user = get_user_by_login_id(db, login_id)
+    user = await get_user_by_login_id(db, login_id)
 
-    logs = get_all_logs_by_level(db, user.id, level_test_num)
+    logs = await get_all_logs_by_level(db, user.id, level_test_num)
     history_text = "\n".join(
         [f"User: {x.user_question}\nAI: {x.ai_response}" for x in logs]
     )
@@ -9,6 +9,17 @@ from server.chat.controller.chat_controller import router as chat_router
 from server.level_test.controller.test_controller import router as test_router
 from server.ocr.controller import ocr_controller
 from server.highlight.controller.highlight_controller import router as highlight_router
+from server.auth_manager import auth_manager
+from server.database import pool_stats
+from server.chat.service.conversation_state import conversation_states
+from server.chat.repository.chat_write_behind import CHAT_WRITE_BEHIND, chat_write_behind
+from server.chat.service.route_classifier import local_router
+from server.chat.service.cefr_service import cefr_batcher
+from server.chat.service.chat_jobs import CHAT_ANALYSIS_BACKGROUND, chat_jobs
+from server.chat.service.supervisor_graph_async import speculation_stats
+from server.core.metrics import registry
+from server.core.llm_gateway import llm_gateway
+from server.core.llm_callbacks import llm_usage
 
 app = FastAPI(title="LangGraph Chat API")
 
@@ -41,6 +52,24 @@ app.include_router(test_router, prefix="/api", tags=["level-test"])
 app.include_router(ocr_controller.router)
 app.include_router(highlight_router)
 
+# ============================================================================
+# ⭐ 라이프사이클 (write-behind 큐 / 백그라운드 작업 시작, 종료 시 flush)
+# ============================================================================
+@app.on_event("startup")
+async def on_startup():
+    if CHAT_WRITE_BEHIND:
+        await chat_write_behind.start()
+    if CHAT_ANALYSIS_BACKGROUND:
+        await chat_jobs.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # 작업이 만든 row 가 write-behind 큐로 들어가므로 작업 큐를 먼저 정리
+    await chat_jobs.stop()
+    await chat_write_behind.stop()
+    await llm_gateway.aclose()
+
 # ============================================================================
 # Health Check
 # ============================================================================
@@ -66,6 +95,34 @@ async def health_check():
         "service": "FastAPI LangGraph Chat API"
     }
 
+# ============================================================================
+# Metrics (프로세스 내 캐시/풀 통계, 읽기 전용)
+# ============================================================================
+@app.get("/metrics")
+async def metrics():
+    return {
+        "auth": {
+            "jwt_cache": auth_manager.cache_stats(),
+            "jwt_negative_cache": auth_manager.negative_cache_stats(),
+            "identity_cache": auth_manager.identity_cache_stats(),
+        },
+        "db_pools": pool_stats(),
+        "chat": {
+            "conversation_state": conversation_states.stats(),
+            "write_behind": chat_write_behind.stats(),
+            "background_jobs": chat_jobs.stats(),
+            "router": local_router.stats(),
+            "cefr": cefr_batcher.stats(),
+            "stages": registry.snapshot("chat.stage.")["histograms"],
+            "prompt_tokens": registry.snapshot("chat.prompt_tokens.")["histograms"],
+            "speculative": speculation_stats(),
+        },
+        "llm": {
+            **llm_gateway.stats(),
+            "calls": llm_usage.stats(),
+        },
+    }
+
 # ============================================================================
 # CORS Test
 # ============================================================================
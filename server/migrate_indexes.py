@@ -0,0 +1,291 @@
+# migrate_indexes.py - models.py 에 선언된 컬럼/인덱스를 기존 테이블에 적용 + EXPLAIN 점검
+#
+# 사용법 (저장소 루트에서):
+#   python -m server.migrate_indexes            # 누락된 컬럼 추가 → 누락된 인덱스 생성 → 중복/대체된 인덱스 제거
+#   python -m server.migrate_indexes --dry-run  # 추가/생성/제거할 컬럼과 인덱스만 출력
+#   python -m server.migrate_indexes --explain  # 핫 쿼리들이 인덱스를 타는지 (filesort 없이) EXPLAIN 으로 확인
+import argparse
+import sys
+
+from sqlalchemy import Index, func, inspect, select, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import aliased
+
+from server.database import Base, engine
+from server.models import *
+
+
+def apply_columns(dry_run: bool = False) -> int:
+    """
+    선언되어 있지만 DB 에 없는 컬럼 추가 (ALTER TABLE ... ADD COLUMN). 추가(예정) 개수 반환
+
+    ⚠️ NOT NULL 컬럼은 server_default 가 있어야 기존 row 를 채울 수 있음 (없으면 건너뜀)
+    """
+    inspector = inspect(engine)
+    added = 0
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                print(f"⚠️ {table.name}.{column.name}: NOT NULL 인데 server_default 없음 → 수동 마이그레이션 필요")
+                continue
+
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT '{column.server_default.arg}'"
+            ddl += " NULL" if column.nullable else " NOT NULL"
+
+            if dry_run:
+                print(f"📝 [dry-run] {ddl}")
+            else:
+                print(f"📦 {ddl}")
+                with engine.begin() as conn:
+                    conn.execute(text(ddl))
+            added += 1
+
+    return added
+
+
+def _duplicate_groups(table, columns) -> int:
+    """UNIQUE 인덱스를 만들 수 없게 하는 중복 값 그룹 수"""
+    dup = select(*columns).group_by(*columns).having(func.count() > 1).subquery()
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(dup)).scalar_one()
+
+
+def apply_indexes(dry_run: bool = False) -> int:
+    """
+    선언되어 있지만 DB 에 없는 인덱스 생성. 생성(예정) 개수 반환
+
+    ⚠️ UNIQUE 인덱스는 기존 중복 row 가 있으면 만들지 않음 (정리 후 다시 실행)
+    """
+    inspector = inspect(engine)
+    created = 0
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            print(f"⚠️ {table.name}: 테이블 없음 (create_tables 먼저 실행)")
+            continue
+
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in existing:
+                continue
+            cols = ", ".join(c.name for c in index.columns)
+            if index.unique:
+                duplicates = _duplicate_groups(table, list(index.columns))
+                if duplicates:
+                    print(f"⚠️ {table.name}.{index.name} ({cols}): 중복 값 {duplicates}개 그룹 → 정리 후 다시 실행")
+                    continue
+            if dry_run:
+                print(f"📝 [dry-run] {table.name}.{index.name} ({cols})")
+            else:
+                print(f"📦 Creating {table.name}.{index.name} ({cols})...")
+                index.create(bind=engine)
+            created += 1
+
+    return created
+
+
+def drop_redundant_indexes(dry_run: bool = False) -> int:
+    """
+    선언되지 않은 인덱스 중 (DB 에 만들어진) 선언된 인덱스의 앞부분과 컬럼이 같은 것 제거. 제거(예정) 개수 반환
+
+    - 주로 MySQL 이 FK 컬럼에 자동으로 만든 인덱스 (예: chat_log.chat_order)
+    - 이름이 바뀐 인덱스의 이전 버전 (예: ix_chat_log_order_chatnum → ux_chat_log_order_chatnum)
+    - InnoDB 보조 인덱스는 끝에 PK 를 포함하므로 (chat_order) 는 (chat_order, id) 와 같은 내용
+    - 선언된 인덱스가 FK 를 대신하므로 제거해도 제약은 유지됨 (apply_indexes 이후에 실행)
+    """
+    inspector = inspect(engine)
+    dropped = 0
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = inspector.get_indexes(table.name)
+        existing_names = {ix["name"] for ix in existing}
+        declared = {ix.name: [c.name for c in ix.columns] for ix in table.indexes}
+        # 아직 생성되지 않은 (예: 중복 때문에 건너뛴 UNIQUE) 인덱스는 대체 인덱스로 보지 않음
+        #    dry-run 은 apply_indexes 가 실제로 만들지 않았으므로 선언 기준으로 출력
+        created = declared if dry_run else {
+            name: cols for name, cols in declared.items() if name in existing_names
+        }
+        pk = [c.name for c in table.primary_key.columns]
+        for index in existing:
+            name, cols = index["name"], index["column_names"]
+            if name in declared or index.get("unique"):
+                continue
+            cols = cols[:-len(pk)] if pk and cols[-len(pk):] == pk and len(cols) > len(pk) else cols
+            covered_by = next(
+                (other for other, other_cols in created.items() if other_cols[:len(cols)] == cols), None
+            )
+            if covered_by is None:
+                continue
+            if dry_run:
+                print(f"📝 [dry-run] drop {table.name}.{name} ({', '.join(cols)}) → covered by {covered_by}")
+            else:
+                print(f"🧹 Dropping {table.name}.{name} ({', '.join(cols)}) → covered by {covered_by}...")
+                Index(name, *(table.c[c] for c in index["column_names"])).drop(bind=engine)
+            dropped += 1
+
+    return dropped
+
+
+# ============================================================================
+# ✅ 레포지토리/서비스의 핫 쿼리 형태 (값은 형태 확인용 샘플)
+# ============================================================================
+def _hot_queries(user_id: int, chat_order_id: int, level_test_num: int):
+    rolled = aliased(ChatSummary)
+    return {
+        "chat_order: last order by user": (
+            select(ChatOrder).where(ChatOrder.user_id == user_id)
+            .order_by(ChatOrder.chat_order.desc()).limit(1)
+        ),
+        "chat_order: max(chat_order) by user": (
+            select(func.max(ChatOrder.chat_order)).where(ChatOrder.user_id == user_id)
+        ),
+        "chat_log: last chatNum in order": (
+            select(ChatLog).where(ChatLog.chat_order_id == chat_order_id)
+            .order_by(ChatLog.chatNum.desc()).limit(1)
+        ),
+        "chat_log: recent window in order": (
+            select(ChatLog).where(ChatLog.chat_order_id == chat_order_id)
+            .order_by(ChatLog.id.desc()).limit(10)
+        ),
+        "chat_log: keyset page in order": (
+            select(ChatLog).where(ChatLog.chat_order_id == chat_order_id, ChatLog.id < 2**31 - 1)
+            .order_by(ChatLog.id.desc()).limit(11)
+        ),
+        # 유저 전체 로그 페이지 (chat_order 없음): 커서가 속한 대화 → 대화 목록 → 대화별 keyset page
+        "chat_log: user-wide page cursor anchor": (
+            select(ChatOrder.chat_order).join(ChatLog, ChatLog.chat_order_id == ChatOrder.id)
+            .where(ChatLog.id == 1, ChatOrder.user_id == user_id)
+        ),
+        "chat_log: user-wide page orders (older)": (
+            select(ChatOrder.id, ChatOrder.chat_order)
+            .where(ChatOrder.user_id == user_id, ChatOrder.chat_order <= 2**31 - 1)
+            .order_by(ChatOrder.chat_order.desc())
+        ),
+        "chat_log: user-wide page orders (newer)": (
+            select(ChatOrder.id, ChatOrder.chat_order)
+            .where(ChatOrder.user_id == user_id, ChatOrder.chat_order >= 0)
+            .order_by(ChatOrder.chat_order.asc())
+        ),
+        "chat_log: keyset page after cursor in order": (
+            select(ChatLog).where(ChatLog.chat_order_id == chat_order_id, ChatLog.id > 0)
+            .order_by(ChatLog.id.asc()).limit(11)
+        ),
+        "chat_summary: summaries not yet rolled up in order": (
+            select(ChatSummary)
+            .where(ChatSummary.chat_order_id == chat_order_id, ChatSummary.level == 0,
+                   ChatSummary.summary_num > (
+                       select(func.coalesce(func.max(rolled.summary_num), 0))
+                       .where(rolled.chat_order_id == chat_order_id, rolled.level == 1)
+                       .scalar_subquery()
+                   ))
+            .order_by(ChatSummary.id.desc()).limit(50)
+        ),
+        "chat_summary: latest rollup in order": (
+            select(ChatSummary).where(ChatSummary.chat_order_id == chat_order_id, ChatSummary.level == 1)
+            .order_by(ChatSummary.id.desc()).limit(1)
+        ),
+        "level_test_log: last log by user": (
+            select(LevelTestLog).where(LevelTestLog.user_id == user_id)
+            .order_by(LevelTestLog.created_at.desc()).limit(1)
+        ),
+        "level_test_log: recent logs by (user, level_test_num)": (
+            select(LevelTestLog)
+            .where(LevelTestLog.user_id == user_id, LevelTestLog.level_test_num == level_test_num)
+            .order_by(LevelTestLog.created_at.desc()).limit(10)
+        ),
+        "level_test_log: keyset page by user": (
+            select(LevelTestLog).where(LevelTestLog.user_id == user_id, LevelTestLog.id < 2**31 - 1)
+            .order_by(LevelTestLog.id.desc()).limit(11)
+        ),
+        "level_test_log: keyset page by (user, level_test_num)": (
+            select(LevelTestLog)
+            .where(LevelTestLog.user_id == user_id, LevelTestLog.level_test_num == level_test_num,
+                   LevelTestLog.id < 2**31 - 1)
+            .order_by(LevelTestLog.id.desc()).limit(11)
+        ),
+        "level_test_log: keyset page after cursor by (user, level_test_num)": (
+            select(LevelTestLog)
+            .where(LevelTestLog.user_id == user_id, LevelTestLog.level_test_num == level_test_num,
+                   LevelTestLog.id > 0)
+            .order_by(LevelTestLog.id.asc()).limit(11)
+        ),
+        "level_test_summary: summaries by (user, level_test_num)": (
+            select(LevelTestSummary)
+            .where(LevelTestSummary.user_id == user_id,
+                   LevelTestSummary.level_test_num == level_test_num)
+            .order_by(LevelTestSummary.summary_num.asc())
+        ),
+    }
+
+
+_SORT_EXTRAS = ("using filesort", "using temporary")
+
+
+def explain_hot_queries(user_id: int, chat_order_id: int, level_test_num: int) -> bool:
+    """
+    모든 핫 쿼리가 인덱스를 사용하면 True
+
+    ❌ type=ALL / key 없음 / Extra 에 Using filesort · Using temporary (인덱스 순서로 정렬하지 못함)
+    """
+    ok = True
+    dialect = mysql.dialect()
+
+    with engine.connect() as conn:
+        for name, stmt in _hot_queries(user_id, chat_order_id, level_test_num).items():
+            sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            rows = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+            for row in rows:
+                key = row.get("key")
+                access = row.get("type")
+                extra = row.get("Extra") or ""
+                uses_index = key is not None and access != "ALL"
+                if any(sort in extra.lower() for sort in _SORT_EXTRAS):
+                    uses_index = False
+                # 빈 테이블 / 상수 최적화는 인덱스 없이도 문제 없음
+                if "no matching row" in extra.lower() or "impossible where" in extra.lower():
+                    uses_index = True
+                mark = "✅" if uses_index else "❌"
+                print(f"{mark} {name}: table={row.get('table')} type={access} key={key} extra={extra}")
+                ok = ok and uses_index
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply columns and composite indexes declared in models.py")
+    parser.add_argument("--dry-run", action="store_true", help="생성하지 않고 출력만")
+    parser.add_argument("--explain", action="store_true", help="핫 쿼리 EXPLAIN 점검")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--chat-order-id", type=int, default=1)
+    parser.add_argument("--level-test-num", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.explain:
+        ok = explain_hot_queries(args.user_id, args.chat_order_id, args.level_test_num)
+        print("✅ All hot queries use an index." if ok
+              else "❌ Some hot queries do not use an index (or sort outside it).")
+        sys.exit(0 if ok else 1)
+
+    # 새 인덱스가 새 컬럼을 참조할 수 있으므로 컬럼 먼저
+    columns = apply_columns(dry_run=args.dry_run)
+    count = apply_indexes(dry_run=args.dry_run)
+    # 선언된 인덱스가 생긴 뒤에 제거해야 FK 가 항상 인덱스를 가짐
+    dropped = drop_redundant_indexes(dry_run=args.dry_run)
+    print(f"✅ Done! {columns} column(s), {count} index(es) {'to apply' if args.dry_run else 'applied'}, "
+          f"{dropped} redundant index(es) {'to drop' if args.dry_run else 'dropped'}.")
+
+
+if __name__ == "__main__":
+    main()
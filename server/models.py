@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index
 from datetime import datetime
 from sqlalchemy.orm import relationship
 from server.database import Base
@@ -20,6 +20,7 @@ class ChatOrder(Base):
     detail = Column(String(1000), nullable=True)
 
     __table_args__ = (
+        # ✅ (user_id = ? ORDER BY chat_order DESC) 조회도 이 유니크 인덱스가 커버
         UniqueConstraint("user_id", "chat_order", name="uq_user_chat_order"),
     )
 
@@ -39,6 +40,15 @@ class ChatLog(Base):
     userChat = Column(String(2000), nullable=False)
     aiChat = Column(String(4000), nullable=False)
 
+    __table_args__ = (
+        # ✅ 마지막 chatNum 조회 (chat_order = ? ORDER BY chatNum DESC)
+        #    UNIQUE → 여러 워커가 같은 chatNum 을 저장하면 나중 INSERT 가 실패 (상태 다시 읽고 새 번호로 재시도)
+        Index("ux_chat_log_order_chatnum", "chat_order", "chatNum", unique=True),
+        # ✅ 최근 로그 윈도우 / 키셋 페이지 (chat_order = ? ORDER BY id)
+        #    FK(chat_order) 인덱스를 겸함 → MySQL 이 자동 생성한 FK 인덱스는 migrate_indexes 가 제거
+        Index("ix_chat_log_order_id", "chat_order", "id"),
+    )
+
     chat_order_rel = relationship("ChatOrder", back_populates="logs")
 
 
@@ -47,8 +57,14 @@ class ChatSummary(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     chat_order_id = Column("chat_order", Integer, ForeignKey("chat_order.id"), nullable=False)
-    summary_num = Column(Integer, nullable=False)
+    summary_num = Column(Integer, nullable=False)   # level 0: 10턴 단위 번호 / level 1: 포함된 마지막 번호
     detail = Column(String(4000), nullable=False)
+    level = Column(Integer, nullable=False, default=0, server_default="0")  # 0: 10턴 요약, 1: rollup
+
+    __table_args__ = (
+        # ✅ 최근 요약 / 최신 rollup 로드 (chat_order = ? AND level = ? ORDER BY id DESC)
+        Index("ix_chat_summary_order_level_id", "chat_order", "level", "id"),
+    )
 
     chat_order_rel = relationship("ChatOrder", back_populates="summaries")
 
@@ -90,6 +106,17 @@ class LevelTestLog(Base):
     diolog_num = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # ✅ 레벨 테스트별 최근 로그 (user_id = ? AND level_test_num = ? ORDER BY created_at)
+        Index("ix_level_test_log_user_num_created", "user_id", "level_test_num", "created_at"),
+        # ✅ 유저의 마지막 로그 (user_id = ? ORDER BY created_at DESC)
+        Index("ix_level_test_log_user_created", "user_id", "created_at"),
+        # ✅ 키셋 페이지 (user_id = ? AND level_test_num = ? ORDER BY id)
+        Index("ix_level_test_log_user_num_id", "user_id", "level_test_num", "id"),
+        # ✅ 키셋 페이지 - 전체 레벨 테스트 (user_id = ? ORDER BY id), FK(user_id) 인덱스를 겸함
+        Index("ix_level_test_log_user_id", "user_id", "id"),
+    )
+
 class Ranks(Base):
     __tablename__ = "ranks"
 
@@ -109,3 +136,8 @@ class LevelTestSummary(Base):
     summary_num = Column(Integer, nullable=False)   # ✅ 1, 2, 3... (10문장 단위)
     summary_text = Column(String(2000), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # ✅ 레벨 테스트 요약 (user_id = ? AND level_test_num = ? ORDER BY summary_num)
+        Index("ix_level_test_summary_user_num", "user_id", "level_test_num", "summary_num"),
+    )
@@ -0,0 +1,90 @@
+# tests/test_audio_assembly.py - TTS 오디오 조립 디코딩 (WAV 헤더 / 샘플 형식)
+import io
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from server.chat.service.audio_assembly import assemble_wavs, decode_wav
+
+RATE = 24000
+# KSDATAFORMAT_SUBTYPE_PCM
+_PCM_GUID = struct.pack("<HHI", 1, 0x0000, 0x00100000) + bytes([0x80, 0x00, 0x00, 0xAA, 0x00, 0x38, 0x9B, 0x71])
+
+
+def _samples(frames: int = 480, channels: int = 1) -> np.ndarray:
+    t = np.arange(frames)
+    tone = (np.sin(2 * np.pi * 440 * t / RATE) * 12000).astype(np.int16)
+    return np.repeat(tone[:, None], channels, axis=1)
+
+
+def _pcm_wav(samples: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _extensible_wav(samples: np.ndarray) -> bytes:
+    """WAVE_FORMAT_EXTENSIBLE(0xFFFE) 헤더의 16-bit PCM"""
+    channels = samples.shape[1]
+    block_align = 2 * channels
+    fmt = struct.pack(
+        "<HHIIHHHHI", 0xFFFE, channels, RATE, RATE * block_align, block_align, 16,
+        22, 16, 0x4 if channels == 1 else 0x3,
+    ) + _PCM_GUID
+    data = samples.astype("<i2").tobytes()
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _wav_24bit(samples: np.ndarray) -> bytes:
+    """16-bit 샘플을 24-bit 로 (하위 8 bit 는 0)"""
+    widened = (samples.astype("<i4") << 8).astype("<i4").tobytes()
+    raw = b"".join(widened[i:i + 3] for i in range(0, len(widened), 4))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(3)
+        wav.setframerate(RATE)
+        wav.writeframes(raw)
+    return buffer.getvalue()
+
+
+def test_decode_extensible_header_falls_back():
+    pytest.importorskip("pydub")
+    samples = _samples()
+    data = _extensible_wav(samples)
+    with pytest.raises(wave.Error):
+        wave.open(io.BytesIO(data), "rb")
+
+    clip = decode_wav(data)
+
+    assert clip.rate == RATE
+    assert clip.channels == 1
+    np.testing.assert_array_equal(clip.samples, samples)
+
+
+def test_decode_24bit_keeps_high_bits():
+    samples = _samples(channels=2)
+
+    clip = decode_wav(_wav_24bit(samples))
+
+    assert clip.rate == RATE
+    np.testing.assert_array_equal(clip.samples, samples)
+
+
+def test_assemble_mixed_headers():
+    pytest.importorskip("pydub")
+    samples = _samples()
+
+    out = assemble_wavs([_pcm_wav(samples), _extensible_wav(samples)], fmt="wav")
+
+    with wave.open(io.BytesIO(out), "rb") as wav:
+        assert wav.getframerate() == RATE
+        frames = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    assert np.count_nonzero(frames) == 2 * np.count_nonzero(samples)